@@ -0,0 +1,33 @@
+import importlib
+
+# Public names resolve on first access, so `import ci_model` stays cheap and only
+# pulls in NumPy, pandas or SciPy when a vectorized entry point is actually used
+_EXPORTS = {
+    'calculate_ci_model': 'ci_model.core',
+    'calculate_ci_model_v2': 'ci_model.core',
+    'calculate_dashboard': 'ci_model.core',
+    'INPUT_KEYS': 'ci_model.core',
+    'OUTPUT_KEYS': 'ci_model.core',
+    'DASHBOARD_DEFAULTS': 'ci_model.core',
+    'DASHBOARD_OUTPUTS': 'ci_model.core',
+    'calculate_ci_model_batch': 'ci_model.batch',
+    'calculate_dashboard_batch': 'ci_model.batch',
+    'calculate_v2_batch': 'ci_model.batch',
+    'MODELS': 'ci_model.batch',
+    'Scenario': 'ci_model.records',
+    'Result': 'ci_model.records',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module 'ci_model' has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
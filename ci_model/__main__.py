@@ -0,0 +1,3 @@
+from ci_model.cli import main
+
+main()
@@ -0,0 +1,192 @@
+# Historical price backtests. Monthly price series from local CSV files replace the constant
+# price inputs (lcfs_price, q45_price, cms_charge), and each scenario's revenue and cash position
+# are replayed month by month: over the whole history, and over every window of a fixed length.
+import os
+from functools import lru_cache
+
+import numpy as np
+
+from ci_model.batch import calculate_dashboard_batch
+
+PRICES_PATH = os.environ.get(
+    'CI_MODEL_PRICES', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'prices')
+)
+
+# Dashboard inputs that a price series can replace; all of them leave CapEx unchanged
+PRICE_SERIES = ['lcfs_price', 'q45_price', 'cms_charge']
+DATE_COLUMNS = ['month', 'date']
+
+
+def read_prices(source, name=None):
+    # One CSV (path or file object): a `month`/`date` column and one column per series named
+    # after the input it replaces, or a single `price` column named by the file (lcfs_price.csv).
+    # Several rows in a month (daily or weekly prices) are averaged.
+    import pandas as pd
+    df = pd.read_csv(source)
+    df.columns = [str(c).strip().lower() for c in df.columns]
+    date = next((c for c in DATE_COLUMNS if c in df), None)
+    if date is None:
+        raise ValueError(f"Price file needs a {' or '.join(DATE_COLUMNS)} column")
+    stem = os.path.splitext(os.path.basename(name or getattr(source, 'name', None) or str(source)))[0].lower()
+    if 'price' in df and stem in PRICE_SERIES:
+        df = df.rename(columns={'price': stem})
+    series = [c for c in PRICE_SERIES if c in df]
+    if not series:
+        raise ValueError(f"Price file has none of the columns {', '.join(PRICE_SERIES)}")
+    months = pd.to_datetime(df[date]).dt.to_period('M')
+    return df[series].apply(pd.to_numeric, errors='coerce').groupby(months.values).mean().sort_index()
+
+
+def combine_prices(frames):
+    # Outer-join monthly frames (a series in a later frame wins), fill gaps with the last known
+    # price and keep the months from which every series has a value
+    import pandas as pd
+    prices = None
+    for df in frames:
+        prices = df if prices is None else df.combine_first(prices)
+    if prices is None:
+        return pd.DataFrame(columns=PRICE_SERIES)
+    prices = prices.reindex(pd.period_range(prices.index.min(), prices.index.max(), freq='M')).ffill().dropna()
+    prices.index.name = 'month'
+    return prices[[c for c in PRICE_SERIES if c in prices]]
+
+
+@lru_cache(maxsize=8)
+def _read_dir(files):
+    return combine_prices(read_prices(path) for path, _ in files)
+
+
+def load_prices(root=None):
+    # Every *.csv under root (default data/prices or CI_MODEL_PRICES), in name order; empty
+    # when there are none. Cached until a file is added, removed or changed.
+    root = root or PRICES_PATH
+    paths = sorted(os.path.join(root, f) for f in os.listdir(root) if f.endswith('.csv')) if os.path.isdir(root) else []
+    return _read_dir(tuple((p, os.path.getmtime(p)) for p in paths))
+
+
+def monthly_cash(inputs, prices, model=calculate_dashboard_batch, max_cells=2_000_000):
+    # inputs: scalars or equal-length columns; prices: {input: monthly values}. Returns CapEx (n,)
+    # and the monthly credit revenue and operating cash (revenue + CMS savings - OpEx), (n, months),
+    # from the model evaluated at each month's prices with the annual amounts spread evenly.
+    columns = {k: np.asarray(v) for k, v in inputs.items()}
+    n = max([v.size for v in columns.values() if v.ndim] or [1])
+    series = {k: np.asarray(v, dtype=float)[None, :] for k, v in prices.items()}
+    months = len(next(iter(series.values()))[0]) if series else 0
+    capex = np.broadcast_to(model(inputs)['total_capex'], (n,)).astype(float)
+    revenue = np.empty((n, months))
+    cash = np.empty((n, months))
+    rows = max(1, max_cells // max(months, 1))
+    for start in range(0, n, rows):
+        stop = min(start + rows, n)
+        chunk = {k: v[start:stop, None] if v.ndim else v for k, v in columns.items()}
+        results = model({**chunk, **series})
+        shape = (stop - start, months)
+        revenue[start:stop] = np.broadcast_to(results['total_revenue'], shape) / 12
+        cash[start:stop] = revenue[start:stop] + np.broadcast_to(results['cms_savings'] - results['opex'], shape) / 12
+    return capex, revenue, cash
+
+
+def _months_to(cumulative, target):
+    # First month (1-based) at which cumulative reaches target along the last axis, else inf
+    reached = cumulative >= target
+    return np.where(reached.any(axis=-1), reached.argmax(axis=-1) + 1, np.inf)
+
+
+def backtest(inputs, prices, horizon=60, rolling=12, model=calculate_dashboard_batch, max_cells=2_000_000):
+    # Replays each scenario against a monthly price history (DataFrame from load_prices; price
+    # inputs without a series keep the scenario's value). CapEx is spent at the start of the first
+    # month. Window results cover every `horizon`-month window, one column per start month.
+    months = prices.index
+    capex, revenue, cash = monthly_cash(inputs, {k: prices[k].to_numpy() for k in prices}, model, max_cells)
+    n, t = cash.shape
+    if not t:
+        raise ValueError("Price history has no months")
+    horizon = min(horizon, t)
+    rolling = min(rolling, t)
+
+    # Operating cash and revenue to date, with a leading zero for "before the first month"
+    cumulative = np.zeros((n, t + 1))
+    np.cumsum(cash, axis=1, out=cumulative[:, 1:])
+    cumulative_revenue = np.zeros((n, t + 1))
+    np.cumsum(revenue, axis=1, out=cumulative_revenue[:, 1:])
+    position = cumulative - capex[:, None]
+
+    # Trailing `rolling`-month revenue, from the first month with a full window
+    trailing = cumulative_revenue[:, rolling:] - cumulative_revenue[:, :-rolling]
+
+    # Largest fall of the cash position from a running peak, and the months it spans
+    peak = np.maximum.accumulate(position, axis=1)
+    drawdown = peak - position
+    trough = drawdown.argmax(axis=1)
+    max_drawdown = drawdown[np.arange(n), trough]
+    before = np.arange(t + 1) <= trough[:, None]
+    peak_at = np.where(before, position, -np.inf).argmax(axis=1)
+    has_drawdown = max_drawdown > 0
+
+    # Every window: months from its start until its operating cash covers CapEx, in row chunks
+    # so the (rows, windows, horizon) comparison stays within max_cells
+    windows = t - horizon + 1
+    window_payback = np.empty((n, windows))
+    rows = max(1, max_cells // max(windows * horizon, 1))
+    for start in range(0, n, rows):
+        stop = min(start + rows, n)
+        ahead = np.lib.stride_tricks.sliding_window_view(cumulative[start:stop, 1:], horizon, axis=1)
+        window_payback[start:stop] = _months_to(
+            ahead - cumulative[start:stop, :windows, None], capex[start:stop, None, None]
+        )
+    window_revenue = cumulative_revenue[:, horizon:] - cumulative_revenue[:, :windows]
+    worst_payback = window_payback.argmax(axis=1)
+    worst_revenue = window_revenue.argmin(axis=1)
+
+    return {
+        'months': months,
+        'capex': capex,
+        'revenue': revenue,
+        'cash_position': position[:, 1:],
+        'total_revenue': cumulative_revenue[:, -1],
+        'final_position': position[:, -1],
+        'payback_months': _months_to(position[:, 1:], 0),
+        'rolling_revenue': trailing,
+        'rolling_mean': trailing.mean(axis=1),
+        'rolling_std': trailing.std(axis=1),
+        'rolling_min': trailing.min(axis=1),
+        'rolling_max': trailing.max(axis=1),
+        # Month positions (into months) of the first and last month of the worst decline; -1 if none
+        'max_drawdown': max_drawdown,
+        'drawdown_start': np.where(has_drawdown, peak_at, -1),
+        'drawdown_end': np.where(has_drawdown, trough - 1, -1),
+        'horizon': horizon,
+        'window_payback': window_payback,
+        'window_revenue': window_revenue,
+        'worst_window_payback': window_payback[np.arange(n), worst_payback],
+        'worst_payback_start': worst_payback,
+        'worst_window_revenue': window_revenue[np.arange(n), worst_revenue],
+        'worst_revenue_start': worst_revenue,
+    }
+
+
+def summarize(result):
+    # One row per scenario: the scalar columns of a backtest, with month positions as labels
+    import pandas as pd
+    months = np.asarray(result['months'].astype(str))
+
+    def label(i):
+        return np.where(i >= 0, months[np.maximum(i, 0)], None)
+
+    return pd.DataFrame({
+        'capex': result['capex'],
+        'total_revenue': result['total_revenue'],
+        'final_position': result['final_position'],
+        'payback_months': result['payback_months'],
+        'rolling_mean': result['rolling_mean'],
+        'rolling_std': result['rolling_std'],
+        'rolling_min': result['rolling_min'],
+        'rolling_max': result['rolling_max'],
+        'max_drawdown': result['max_drawdown'],
+        'drawdown_start': label(result['drawdown_start']),
+        'drawdown_end': label(result['drawdown_end']),
+        'worst_window_payback': result['worst_window_payback'],
+        'worst_payback_start': label(result['worst_payback_start']),
+        'worst_window_revenue': result['worst_window_revenue'],
+        'worst_revenue_start': label(result['worst_revenue_start']),
+    })
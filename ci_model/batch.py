@@ -0,0 +1,190 @@
+from functools import lru_cache
+
+import numpy as np
+
+from ci_model.categories import load_categories
+from ci_model.core import BASELINE_CI, DASHBOARD_DEFAULTS, DASHBOARD_FLAGS, INPUT_KEYS
+
+
+def _columns(inputs, keys):
+    # Accepts a dict of scalars/arrays or a DataFrame with one row per scenario
+    cols = np.broadcast_arrays(*[np.asarray(inputs[k], dtype=float) for k in keys])
+    return dict(zip(keys, cols))
+
+
+def _ratio(num, den):
+    # num / den where den > 0, float('inf') otherwise (same as the scalar model)
+    num, den = np.broadcast_arrays(num, den)
+    return np.divide(num, den, out=np.full(num.shape, np.inf), where=den > 0)
+
+
+def calculate_ci_model_batch(inputs):
+    x = _columns(inputs, INPUT_KEYS)
+
+    ci_reduction = (
+        -x['solar_ci'] * (x['solar_pct'] / 100)
+        - x['dryer_ci'] * (x['dryer_pct'] / 100)
+        - x['chp_ci'] * (x['chp_pct'] / 100)
+        - x['boiler_ci'] * (x['boiler_pct'] / 100)
+        + x['ccs_ci']
+    )
+    total_ci = BASELINE_CI + ci_reduction
+    tons_co2_avoided = (BASELINE_CI - total_ci) * x['capacity_mgy'] * 3780 / 1000
+
+    lcfs_revenue = tons_co2_avoided * x['lcfs_price']
+    q45_revenue = tons_co2_avoided * x['q45_price']
+    total_revenue = lcfs_revenue + q45_revenue
+
+    annual_demand_charge = x['monthly_demand_charge'] * 12
+    demand_savings = annual_demand_charge * (x['solar_pct'] / 100) * (x['demand_reduction_pct'] / 100)
+
+    total_capex = (
+        x['solar_cost_per_kw'] * x['solar_kw'] / 100
+        + x['dryer_cost_per_unit'] * x['dryer_units']
+        + x['chp_cost_per_mmbtu'] * x['chp_mmbtu']
+        + x['boiler_cost_per_mmbtu'] * x['boiler_mmbtu']
+        + x['ccs_capex']
+    )
+    total_opex = total_capex * (x['opex_pct'] / 100)
+    total_cost = total_capex + total_opex - demand_savings
+
+    return {
+        'CI': total_ci,
+        'Tons CO2': tons_co2_avoided,
+        'LCFS': lcfs_revenue,
+        '45Q': q45_revenue,
+        'Revenue': total_revenue,
+        'CapEx': total_capex,
+        'OpEx': total_opex,
+        'Demand Savings': demand_savings,
+        'Total Cost': total_cost,
+        'Payback': _ratio(total_cost, total_revenue),
+        'Abatement Cost': _ratio(total_cost, tons_co2_avoided),
+    }
+
+
+def dashboard_columns(inputs):
+    # Missing keys fall back to the dashboard defaults
+    merged = {k: inputs[k] if k in inputs else v for k, v in DASHBOARD_DEFAULTS.items()}
+    x = _columns(merged, list(DASHBOARD_DEFAULTS))
+    for k in DASHBOARD_FLAGS:
+        x[k] = x[k] != 0
+    return x
+
+
+def calculate_dashboard_batch(inputs):
+    x = dashboard_columns(inputs)
+    baseline_ci = x['baseline_ci']
+    ccs_enabled = x['ccs_enabled']
+
+    solar_capex = x['solar_capex'] * (1 - x['itc_pct'] / 100)
+
+    ci_reduction = (
+        x['solar_pct'] * x['solar_ci'] + x['dryer_pct'] * x['dryer_ci']
+        + x['chp_pct'] * x['chp_ci'] + x['boiler_pct'] * x['boiler_ci']
+    ) / 100 + np.where(ccs_enabled, x['ccs_ci'], 0)
+
+    ng_penalty = np.where(x['use_ng'], (x['ng_boiler_pct'] + x['ng_dryer_pct']) / 2 * x['ng_ci'] / 100, 0)
+    rng_offset = np.where(x['use_rng'], x['rng_pct'] * (baseline_ci - x['rng_ci']) / 100, 0)
+    cp_offset = np.where(x['use_cp'], x['cp_pct'] * (baseline_ci - x['cp_ci']) / 100, 0)
+
+    final_ci = baseline_ci - ci_reduction + ng_penalty - rng_offset - cp_offset
+    tons_avoided = (baseline_ci - final_ci) * x['capacity_mgy'] * x['mj_per_gal'] / 1000
+    lcfs_revenue = tons_avoided * x['lcfs_price']
+    q45_revenue = np.where(ccs_enabled, tons_avoided * x['q45_price'], 0)
+    total_revenue = lcfs_revenue + q45_revenue
+    cms_savings = x['cms_charge'] * 12 * x['solar_pct'] * x['solar_offset'] / 10000
+    if 'cms_savings_hourly' in inputs and inputs['cms_savings_hourly'] is not None:
+        # Set when the 8760-hour simulation replaces the flat formula; NaN rows keep the formula
+        hourly = np.asarray(inputs['cms_savings_hourly'], dtype=float)
+        cms_savings = np.where(np.isnan(hourly), cms_savings, hourly)
+    total_capex = (
+        solar_capex + x['dryer_capex'] + x['chp_capex'] + x['boiler_capex']
+        + np.where(ccs_enabled, x['ccs_capex'], 0)
+    )
+    opex = total_capex * (x['opex_pct'] / 100)
+    net_cost = total_capex + opex - cms_savings
+
+    return {
+        'final_ci': final_ci,
+        'tons_avoided': tons_avoided,
+        'lcfs_revenue': lcfs_revenue,
+        'q45_revenue': q45_revenue,
+        'total_revenue': total_revenue,
+        'cms_savings': cms_savings,
+        'total_capex': total_capex,
+        'opex': opex,
+        'net_cost': net_cost,
+        'payback': _ratio(net_cost, total_revenue),
+        'cost_per_ton': _ratio(net_cost, tons_avoided),
+    }
+
+
+def category_codes(values, impact):
+    # Option names -> integer codes into impact; unknown names (and None) map to -1
+    values = np.asarray(values)
+    if values.dtype.kind in 'iu':
+        if values.size and (values.min() < -1 or values.max() >= len(impact)):
+            raise ValueError(f"category codes must be between -1 and {len(impact) - 1}")
+        return values
+    options = {name: i for i, name in enumerate(impact)}
+    return np.array([options.get(v, -1) for v in values.ravel()]).reshape(values.shape)
+
+
+@lru_cache(maxsize=32)
+def _impact_array(impacts):
+    return np.array(impacts + (0.0,))
+
+
+def impact_lookup(codes, impact):
+    # Code -1 falls through to the trailing 0, like impact.get(name, 0)
+    return _impact_array(tuple(impact.values()))[codes]
+
+
+V2_NUMERIC_INPUTS = [
+    'capacity_mgy', 'solar_pct', 'dryer_pct', 'chp_pct', 'capex_solar', 'capex_dryers',
+    'capex_chp', 'capex_ccs', 'opex_pct', 'lcfs_credit', 'q45_credit',
+]
+
+
+def calculate_v2_batch(inputs):
+    baseline_ci = BASELINE_CI
+    x = _columns(inputs, V2_NUMERIC_INPUTS)
+    # Names or integer codes; the impact tables come from data/categories.csv
+    impacts = load_categories()
+    ci_fuel, ci_ccs_scope, ci_sequestration = (
+        impact_lookup(category_codes(inputs[k], impacts[k]), impacts[k])
+        for k in ['chp_fuel', 'ccs_scope', 'sequestration_type']
+    )
+
+    final_ci = (
+        baseline_ci - 0.25 * x['solar_pct'] - 0.10 * x['dryer_pct'] - 0.15 * x['chp_pct']
+        + ci_fuel + ci_ccs_scope + ci_sequestration
+    )
+    tons_co2_avoided = (baseline_ci - final_ci) * x['capacity_mgy'] * 3780 / 1000
+
+    lcfs_revenue = tons_co2_avoided * x['lcfs_credit']
+    q45_revenue = tons_co2_avoided * x['q45_credit']
+    total_revenue = lcfs_revenue + q45_revenue
+    total_capex = x['capex_solar'] + x['capex_dryers'] + x['capex_chp'] + x['capex_ccs']
+    total_opex = total_capex * (x['opex_pct'] / 100)
+    total_cost = total_capex + total_opex
+
+    return {
+        'final_ci': final_ci,
+        'tons_co2_avoided': tons_co2_avoided,
+        'lcfs_revenue': lcfs_revenue,
+        'q45_revenue': q45_revenue,
+        'total_capex': total_capex,
+        'total_opex': total_opex,
+        'total_cost': total_cost,
+        'payback_years': _ratio(total_cost, total_revenue),
+        'cost_per_ton': _ratio(total_cost, tons_co2_avoided),
+    }
+
+
+MODELS = {
+    'v2': calculate_v2_batch,
+    'v3': calculate_ci_model_batch,
+    'dashboard': calculate_dashboard_batch,
+}
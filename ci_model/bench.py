@@ -0,0 +1,159 @@
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(REPO_ROOT, 'benchmarks', 'baseline.json')
+DASHBOARD_APP = os.path.join(REPO_ROOT, 'ci_model_web_app_v5-3.py')
+
+
+def _random_inputs(n, seed=0):
+    import numpy as np
+    from ci_model.core import INPUT_KEYS
+    rng = np.random.default_rng(seed)
+    return {k: rng.uniform(0, 100, n) for k in INPUT_KEYS}
+
+
+def _measure(name, fn, scenarios, repeats, warmup=1):
+    import numpy as np
+    for _ in range(warmup):
+        fn()
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    # Peak memory comes from a separate traced run so tracing does not skew the timings
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    ms = np.array(times) * 1000
+    p50 = float(np.percentile(ms, 50))
+    return {
+        'name': name,
+        'scenarios': scenarios,
+        'repeats': repeats,
+        'p50_ms': p50,
+        'p90_ms': float(np.percentile(ms, 90)),
+        'p99_ms': float(np.percentile(ms, 99)),
+        'mean_ms': float(ms.mean()),
+        'scenarios_per_s': scenarios / (p50 / 1000) if p50 else float('inf'),
+        'peak_mb': peak / 2**20,
+    }
+
+
+def bench_scalar(calls=10_000):
+    from ci_model.core import INPUT_KEYS, calculate_ci_model
+    inputs = dict.fromkeys(INPUT_KEYS, 50.0)
+    result = _measure('scalar_calculate_ci_model', lambda: calculate_ci_model(inputs), 1, calls)
+    return result
+
+
+def bench_batch(n, chunk_size=1_000_000, repeats=None):
+    from ci_model.batch import calculate_ci_model_batch
+    if n <= chunk_size:
+        inputs = _random_inputs(n)
+        fn = lambda: calculate_ci_model_batch(inputs)
+    else:
+        # Very large batches run as a sequence of chunks of the same pre-generated inputs
+        inputs = _random_inputs(chunk_size)
+        rounds, rest = divmod(n, chunk_size)
+        tail = {k: v[:rest] for k, v in inputs.items()}
+
+        def fn():
+            for _ in range(rounds):
+                calculate_ci_model_batch(inputs)
+            if rest:
+                calculate_ci_model_batch(tail)
+    repeats = repeats or max(3, min(200, 10_000_000 // max(n, 1)))
+    return _measure(f'batch_{n}', fn, n, repeats)
+
+
+def bench_sweep(resolution=500, repeats=10):
+    import numpy as np
+    from ci_model.core import DASHBOARD_DEFAULTS
+    from ci_model.sweep import sweep_2d
+    x = np.linspace(0, 100, resolution)
+    y = np.linspace(0, 300, resolution)
+    fn = lambda: sweep_2d(DASHBOARD_DEFAULTS, 'solar_pct', x, 'lcfs_price', y, 'payback')
+    return _measure(f'sweep_{resolution}x{resolution}', fn, resolution * resolution, repeats)
+
+
+def bench_streamlit_rerun(repeats=10, app=DASHBOARD_APP):
+    # Drives the full v5 script headlessly through Streamlit's app testing harness
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(app, default_timeout=120)
+    at.run()
+    if at.exception:
+        raise RuntimeError(f"{app} raised during the benchmark: {at.exception}")
+    return _measure('streamlit_rerun_v5', at.run, 1, repeats, warmup=0)
+
+
+def run_benchmarks(sizes=(1_000, 100_000, 10_000_000), include_ui=True, log=sys.stderr):
+    import numpy as np
+    benches = [bench_scalar] + [lambda n=n: bench_batch(n) for n in sizes] + [bench_sweep]
+    if include_ui:
+        benches.append(bench_streamlit_rerun)
+    results = []
+    for bench in benches:
+        result = bench()
+        results.append(result)
+        print(f"  {result['name']:<28} p50 {result['p50_ms']:10.3f} ms  p99 {result['p99_ms']:10.3f} ms  "
+              f"{result['scenarios_per_s']:>14,.0f} scenarios/s  peak {result['peak_mb']:8.1f} MB", file=log)
+    return {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+        },
+        'results': results,
+    }
+
+
+def compare(report, baseline, threshold=0.2):
+    # A benchmark regresses when its median latency is more than threshold slower than baseline
+    previous = {r['name']: r for r in baseline['results']}
+    regressions = []
+    for result in report['results']:
+        base = previous.get(result['name'])
+        if base and result['p50_ms'] > base['p50_ms'] * (1 + threshold):
+            regressions.append({
+                'name': result['name'],
+                'baseline_p50_ms': base['p50_ms'],
+                'p50_ms': result['p50_ms'],
+                'slowdown': result['p50_ms'] / base['p50_ms'],
+            })
+    return regressions
+
+
+def main(args):
+    print("Running benchmarks", file=sys.stderr)
+    report = run_benchmarks(args.sizes, include_ui=not args.no_ui)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved baseline to {args.baseline}", file=sys.stderr)
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one", file=sys.stderr)
+        return 0
+    with open(args.baseline) as f:
+        regressions = compare(report, json.load(f), args.threshold)
+    for r in regressions:
+        print(f"REGRESSION {r['name']}: p50 {r['p50_ms']:.3f} ms vs baseline {r['baseline_p50_ms']:.3f} ms "
+              f"({r['slowdown']:.2f}x)", file=sys.stderr)
+    if not regressions:
+        print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}", file=sys.stderr)
+    return 1 if regressions else 0
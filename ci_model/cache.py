@@ -0,0 +1,129 @@
+import hashlib
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+def _canonical(value, h):
+    # Feed a normalized form of value into the hash: 1, 1.0 and True hash alike,
+    # dict keys are sorted and arrays hash their dtype, shape and raw bytes
+    if isinstance(value, dict):
+        h.update(b'{')
+        for k in sorted(value, key=str):
+            h.update(str(k).encode() + b'=')
+            _canonical(value[k], h)
+        h.update(b'}')
+    elif isinstance(value, (list, tuple)):
+        h.update(b'[')
+        for v in value:
+            _canonical(v, h)
+            h.update(b',')
+        h.update(b']')
+    elif isinstance(value, np.ndarray) and value.ndim > 0:
+        h.update(f'{value.dtype.str}{value.shape}'.encode())
+        h.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, (bool, int, float, np.number, np.bool_)):
+        h.update(repr(float(value) + 0.0).encode())
+    else:
+        h.update(repr(value).encode())
+
+
+def scenario_key(inputs, namespace=''):
+    h = hashlib.blake2b(namespace.encode(), digest_size=16)
+    _canonical(inputs, h)
+    return h.hexdigest()
+
+
+def _sizeof(value):
+    if isinstance(value, np.ndarray):
+        return value.nbytes + 112
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_sizeof(k) + _sizeof(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_sizeof(v) for v in value)
+    return sys.getsizeof(value)
+
+
+def _freeze(value):
+    # Cached arrays are shared between callers, so make them read-only
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+    elif isinstance(value, dict):
+        for v in value.values():
+            _freeze(v)
+    return value
+
+
+class ResultCache:
+    def __init__(self, max_entries=1024, max_bytes=256 * 2**20):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+
+    def put(self, key, value):
+        size = _sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self.bytes -= self._entries.pop(key)[1]
+            if size > self.max_bytes:
+                return value
+            self._entries[key] = (_freeze(value), size)
+            self.bytes += size
+            while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+        return value
+
+    def get_or_compute(self, inputs, compute, namespace=''):
+        key = scenario_key(inputs, namespace)
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = self.put(key, compute())
+        return value
+
+    def clear(self):
+        # Counters restart with the store, so stats() afterwards describes only the new contents
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+
+# Shared by every session served from the same process
+MODEL_CACHE = ResultCache(
+    max_entries=int(os.environ.get('CI_MODEL_CACHE_ENTRIES', 1024)),
+    max_bytes=int(os.environ.get('CI_MODEL_CACHE_MB', 256)) * 2**20,
+)
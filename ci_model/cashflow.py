@@ -0,0 +1,117 @@
+import numpy as np
+
+
+def _escalation(rate_pct, years):
+    # Multiplier for years 1..years, with year 1 at today's prices
+    return (1 + np.asarray(rate_pct, dtype=float)[..., None] / 100) ** np.arange(years)
+
+
+def cash_flows(capex, opex, revenue, cms_savings, years=20, credit_escalator=0.0, opex_escalator=0.0,
+               cms_escalator=0.0):
+    # One row per scenario, one column per year; year 0 holds the CapEx outlay
+    capex, opex, revenue, cms_savings = np.broadcast_arrays(
+        *[np.atleast_1d(np.asarray(a, dtype=float)) for a in (capex, opex, revenue, cms_savings)]
+    )
+    flows = np.empty(capex.shape + (years + 1,))
+    flows[..., 0] = -capex
+    flows[..., 1:] = (
+        revenue[..., None] * _escalation(credit_escalator, years)
+        + cms_savings[..., None] * _escalation(cms_escalator, years)
+        - opex[..., None] * _escalation(opex_escalator, years)
+    )
+    return flows
+
+
+def discount_factors(rate_pct, years):
+    return (1 + np.asarray(rate_pct, dtype=float)[..., None] / 100) ** -np.arange(years + 1)
+
+
+def npv(flows, rate_pct):
+    return np.sum(flows * discount_factors(rate_pct, flows.shape[-1] - 1), axis=-1)
+
+
+def _npv_and_slope(flows, r):
+    # Horner's rule in v = 1 / (1 + r): one multiply-add per year instead of a power per cell
+    v = 1 / (1 + r)
+    value = flows[..., -1].copy()
+    slope = np.zeros_like(value)
+    for t in range(flows.shape[-1] - 2, -1, -1):
+        slope = slope * v + value
+        value = value * v + flows[..., t]
+    return value, -slope * v * v
+
+
+def irr(flows, low=-99.0, high=1000.0, tol=1e-10, max_iter=100):
+    # Newton steps safeguarded by a per-scenario bisection bracket, iterating only on the
+    # scenarios that have not converged yet. Returns % per year; NaN where NPV does not
+    # change sign over [low, high].
+    shape = flows.shape[:-1]
+    flows = flows.reshape(-1, flows.shape[-1])
+    lo = np.full(len(flows), low / 100)
+    hi = np.full(len(flows), high / 100)
+    f_lo, _ = _npv_and_slope(flows, lo)
+    f_hi, _ = _npv_and_slope(flows, hi)
+    increasing = f_hi > f_lo
+    result = np.full(len(flows), np.nan)
+
+    active = np.flatnonzero(np.sign(f_lo) != np.sign(f_hi))
+    r = np.full(len(active), 0.1)
+    lo, hi, increasing = lo[active], hi[active], increasing[active]
+    for _ in range(max_iter):
+        if not len(active):
+            break
+        f, df = _npv_and_slope(flows[active], r)
+        below = (f > 0) != increasing
+        lo = np.where(below, r, lo)
+        hi = np.where(below, hi, r)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            step = r - f / df
+        new = np.where(np.isfinite(step) & (step > lo) & (step < hi), step, (lo + hi) / 2)
+        done = (np.abs(new - r) < tol) | (f == 0)
+        # An exact root at the current guess is r itself, not the next candidate
+        result[active[done]] = np.where(f == 0, r, new)[done]
+        keep = ~done
+        active, r, lo, hi, increasing = active[keep], new[keep], lo[keep], hi[keep], increasing[keep]
+    result[active] = r
+    return (result * 100).reshape(shape)
+
+
+def discounted_payback(flows, rate_pct):
+    # Years until cumulative discounted cash turns non-negative, interpolated within the year
+    cumulative = np.cumsum(flows * discount_factors(rate_pct, flows.shape[-1] - 1), axis=-1)
+    positive = cumulative >= 0
+    year = np.argmax(positive, axis=-1)
+    reached = positive.any(axis=-1)
+    prev = np.take_along_axis(cumulative, np.maximum(year - 1, 0)[..., None], axis=-1)[..., 0]
+    curr = np.take_along_axis(cumulative, year[..., None], axis=-1)[..., 0]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fraction = np.where(year > 0, -prev / (curr - prev), 0.0)
+    return np.where(reached, np.maximum(year - 1, 0) + fraction, np.inf)
+
+
+def lcoa(capex, opex, cms_savings, tons, years=20, discount_rate=8.0, opex_escalator=0.0, cms_escalator=0.0):
+    # Levelized cost of abatement: PV of net costs (credits excluded) / PV of tons avoided
+    costs = -cash_flows(capex, opex, 0.0, cms_savings, years, 0.0, opex_escalator, cms_escalator)
+    df = discount_factors(discount_rate, years)
+    pv_tons = np.atleast_1d(np.asarray(tons, dtype=float)) * df[..., 1:].sum(axis=-1)
+    pv_costs = np.sum(costs * df, axis=-1)
+    return np.divide(pv_costs, pv_tons, out=np.full(pv_costs.shape, np.inf), where=pv_tons > 0)
+
+
+def evaluate_cashflows(results, years=20, discount_rate=8.0, credit_escalator=0.0, opex_escalator=0.0,
+                       cms_escalator=0.0):
+    # results: outputs of calculate_dashboard_batch (scalars or arrays)
+    flows = cash_flows(
+        results['total_capex'], results['opex'], results['total_revenue'], results['cms_savings'],
+        years, credit_escalator, opex_escalator, cms_escalator,
+    )
+    return {
+        'cash_flows': flows,
+        'npv': npv(flows, discount_rate),
+        'irr': irr(flows),
+        'discounted_payback': discounted_payback(flows, discount_rate),
+        'lcoa': lcoa(
+            results['total_capex'], results['opex'], results['cms_savings'], results['tons_avoided'],
+            years, discount_rate, opex_escalator, cms_escalator,
+        ),
+    }
@@ -0,0 +1,27 @@
+import csv
+import os
+from functools import lru_cache
+
+CATEGORIES_PATH = os.environ.get(
+    'CI_MODEL_CATEGORIES',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'categories.csv'),
+)
+
+# Categorical inputs of the v2 model (ci_model_web_app_.py), in table order
+CATEGORY_INPUTS = ['chp_fuel', 'ccs_scope', 'sequestration_type']
+
+
+@lru_cache(maxsize=8)
+def _read_categories(path, mtime):
+    tables = {name: {} for name in CATEGORY_INPUTS}
+    with open(path, newline='') as f:
+        for row in csv.DictReader(f):
+            tables.setdefault(row['input'].strip(), {})[row['option'].strip()] = float(row['ci_impact'])
+    return tables
+
+
+def load_categories(path=None):
+    # {input: {option: CI impact}}; an option's integer code is its position in the table.
+    # Read on first use and cached until the file changes on disk; treat the result as read-only.
+    path = path or CATEGORIES_PATH
+    return _read_categories(path, os.path.getmtime(path))
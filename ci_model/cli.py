@@ -0,0 +1,229 @@
+import argparse
+import os
+import sys
+import time
+
+# Heavy dependencies are imported inside the commands so `--help` and `profiles list` start fast
+MODEL_NAMES = ['dashboard', 'v2', 'v3']
+
+
+def read_scenarios(path):
+    import pandas as pd
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+def write_results(df, path):
+    if path.endswith('.parquet'):
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+
+
+def evaluate_frame(model, df, executor=None, progress=None):
+    # With a ShardedExecutor, large frames are evaluated across its worker processes
+    import numpy as np
+    import pandas as pd
+    from ci_model.batch import MODELS
+    if executor is None:
+        results = MODELS[model](df)
+    else:
+        results = executor.evaluate(model, {k: df[k].to_numpy() for k in df}, progress)
+    return pd.DataFrame({k: np.broadcast_to(v, (len(df),)) for k, v in results.items()}, index=df.index)
+
+
+class ShardReporter:
+    # Progress callback for ShardedExecutor: one line per shard and busy time per worker
+    def __init__(self, log=sys.stderr):
+        self.log = log
+        self.workers = {}
+
+    def __call__(self, info):
+        rows = info['stop'] - info['start']
+        stats = self.workers.setdefault(info['pid'], {'shards': 0, 'scenarios': 0, 'seconds': 0.0})
+        stats['shards'] += 1
+        stats['scenarios'] += rows
+        stats['seconds'] += info['seconds']
+        print(f"  shard {info['shard'] + 1} ({rows:,} rows) done by pid {info['pid']} in {info['seconds']:.3f}s "
+              f"– {info['done']:,}/{info['total']:,} scenarios, {info['done'] / info['elapsed']:,.0f} scenarios/s",
+              file=self.log)
+
+    def summary(self):
+        for pid, stats in sorted(self.workers.items()):
+            print(f"  worker {pid}: {stats['shards']} shards, {stats['scenarios']:,} scenarios, "
+                  f"{stats['seconds']:.2f}s busy", file=self.log)
+
+
+def run(args):
+    import pandas as pd
+    from ci_model.parallel import ShardedExecutor
+    start = time.perf_counter()
+    scenarios = read_scenarios(args.scenarios)
+    n = len(scenarios)
+    executor = ShardedExecutor(args.workers, max_rows=args.chunk_size)
+    print(f"Loaded {n:,} scenarios from {args.scenarios} in {time.perf_counter() - start:.2f}s; "
+          f"sharding across {executor.workers} workers", file=sys.stderr)
+
+    eval_start = time.perf_counter()
+    reporter = ShardReporter()
+    try:
+        results = evaluate_frame(args.model, scenarios, executor, reporter)
+    finally:
+        executor.shutdown()
+    eval_seconds = time.perf_counter() - eval_start
+
+    output = pd.concat([scenarios, results], axis=1)
+    write_results(output, args.output)
+    if args.save is not None and n:
+        save_results(args.save, args.model, scenarios, results, args.name)
+
+    print(f"Evaluated {n:,} scenarios in {eval_seconds:.2f}s ({n / max(eval_seconds, 1e-9):,.0f} scenarios/s); "
+          f"wrote {args.output}", file=sys.stderr)
+    reporter.summary()
+
+
+def save_results(path, model, scenarios, results, name=None):
+    # Bulk insert into the SQLite scenario store; an optional `plant` column tags each row and
+    # v2 categorical columns are stored as their integer codes
+    from ci_model.batch import category_codes
+    from ci_model.categories import load_categories
+    from ci_model.store import ScenarioStore
+    plant = scenarios['plant'].to_numpy(dtype=object) if 'plant' in scenarios else None
+    inputs = {k: scenarios[k].to_numpy() for k in scenarios if k != 'plant'}
+    if model == 'v2':
+        inputs.update({k: category_codes(inputs[k], impact) for k, impact in load_categories().items() if k in inputs})
+    start = time.perf_counter()
+    store = ScenarioStore(path or None)
+    ids = store.save_batch(inputs, results, model=model, plant=plant, name=name)
+    print(f"Saved {len(ids):,} scenarios to {store.path} in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+
+
+def stream(args):
+    from ci_model.stream import stream_evaluate
+    stream_evaluate(args.scenarios, args.output_dir, args.model, args.chunk_size, args.format, args.restart,
+                    workers=args.workers)
+
+
+def profiles_import(args):
+    from ci_model.profiles import import_csv
+    entry = import_csv(args.csv, args.plant, args.kind, args.root)
+    print(f"Stored {entry['hours']} hours for {entry['plant']}/{entry['kind']} in {entry['file']}", file=sys.stderr)
+
+
+def profiles_list(args):
+    from ci_model.profiles import list_profiles
+    for key, entry in sorted(list_profiles(args.root).items()):
+        print(f"{key}\t{entry['hours']} h\t{entry['file']}")
+
+
+def bench(args):
+    from ci_model import bench
+    args.baseline = args.baseline or bench.BASELINE_PATH
+    return bench.main(args)
+
+
+def profile_summary(args):
+    import json
+    from ci_model.instrument import PROFILE_LOG, summarize_log
+    print(json.dumps(summarize_log(args.log or PROFILE_LOG), indent=2))
+
+
+def backtest(args):
+    import pandas as pd
+    from ci_model.backtest import backtest as run_backtest, combine_prices, load_prices, read_prices, summarize
+    prices = combine_prices([read_prices(path) for path in args.prices]) if args.prices else load_prices()
+    if prices.empty:
+        print("No price history: pass --prices files or add CSVs to data/prices (CI_MODEL_PRICES)", file=sys.stderr)
+        return 1
+    scenarios = read_scenarios(args.scenarios)
+    start = time.perf_counter()
+    result = run_backtest({k: scenarios[k].to_numpy() for k in scenarios if k != 'plant'}, prices,
+                          args.horizon, args.rolling)
+    summary = summarize(result).set_index(scenarios.index)
+    write_results(pd.concat([scenarios, summary], axis=1), args.output)
+    print(f"Backtested {len(scenarios):,} scenarios over {len(prices)} months ({prices.index[0]} to "
+          f"{prices.index[-1]}) in {time.perf_counter() - start:.2f}s; wrote {args.output}", file=sys.stderr)
+
+
+def serve(args):
+    from ci_model import server
+    server.main(args)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m ci_model', description="Headless CI model batch runner")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help="Evaluate a scenarios file (CSV or Parquet)")
+    run_parser.add_argument('scenarios', help="Input file with one scenario per row")
+    run_parser.add_argument('-o', '--output', required=True, help="Results file (.csv or .parquet)")
+    run_parser.add_argument('--model', choices=MODEL_NAMES, default='v3',
+                            help="v3 = calculate_ci_model inputs, dashboard = v4.7/v5 inputs, v2 = ci_model_web_app_.py inputs")
+    run_parser.add_argument('--workers', type=int, default=os.cpu_count(), help="Process pool size (default: all cores)")
+    run_parser.add_argument('--chunk-size', type=int, default=1_000_000,
+                            help="Largest shard; shards are sized from measured throughput below it")
+    run_parser.add_argument('--save', nargs='?', const='', default=None, metavar='DB',
+                            help="Also save scenarios and results to the SQLite store (default: data/scenarios.db or CI_MODEL_STORE)")
+    run_parser.add_argument('--name', help="Name recorded with --save")
+    run_parser.set_defaults(func=run)
+
+    stream_parser = commands.add_parser('stream', help="Evaluate a scenarios file chunk by chunk with bounded memory")
+    stream_parser.add_argument('scenarios', help="CSV, Parquet or Arrow IPC file with one scenario per row")
+    stream_parser.add_argument('-o', '--output-dir', required=True, help="Directory for part files and progress manifest")
+    stream_parser.add_argument('--model', choices=MODEL_NAMES, default='v3')
+    stream_parser.add_argument('--chunk-size', type=int, default=500_000, help="Scenarios per chunk")
+    stream_parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                               help="Processes sharing each chunk (default: all cores)")
+    stream_parser.add_argument('--format', choices=['parquet', 'csv'], default='parquet', help="Part file format")
+    stream_parser.add_argument('--restart', action='store_true', help="Ignore saved progress and start over")
+    stream_parser.set_defaults(func=stream)
+
+    profiles_parser = commands.add_parser('profiles', help="Manage the memory-mapped hourly profile store")
+    profiles_commands = profiles_parser.add_subparsers(dest='profiles_command', required=True)
+    import_parser = profiles_commands.add_parser('import', help="Convert an 8760-row CSV into the store")
+    import_parser.add_argument('csv', help="CSV with one row per hour; the last numeric column is used")
+    import_parser.add_argument('--plant', required=True)
+    import_parser.add_argument('--kind', required=True, help="Profile type, e.g. load, solar, grid_ci")
+    import_parser.add_argument('--root', help="Store directory (default: data/profiles or CI_MODEL_PROFILES)")
+    import_parser.set_defaults(func=profiles_import)
+    list_parser = profiles_commands.add_parser('list', help="List stored profiles")
+    list_parser.add_argument('--root', help="Store directory (default: data/profiles or CI_MODEL_PROFILES)")
+    list_parser.set_defaults(func=profiles_list)
+
+    bench_parser = commands.add_parser('bench', help="Run the benchmark suite and compare against a baseline")
+    bench_parser.add_argument('-o', '--output', help="Write the JSON report here")
+    bench_parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 100_000, 10_000_000],
+                              help="Batch sizes to benchmark")
+    bench_parser.add_argument('--baseline', default=None, help="Baseline JSON (default: benchmarks/baseline.json)")
+    bench_parser.add_argument('--save-baseline', action='store_true', help="Store this run as the new baseline")
+    bench_parser.add_argument('--threshold', type=float, default=0.2, help="Allowed p50 slowdown before flagging")
+    bench_parser.add_argument('--no-ui', action='store_true', help="Skip the headless Streamlit rerun benchmark")
+    bench_parser.set_defaults(func=bench)
+
+    profile_parser = commands.add_parser('profile-summary', help="Summarize a rerun profiling log (JSON lines)")
+    profile_parser.add_argument('log', nargs='?', default=None, help="Log path (default: CI_MODEL_PROFILE_LOG)")
+    profile_parser.set_defaults(func=profile_summary)
+
+    backtest_parser = commands.add_parser('backtest', help="Replay dashboard scenarios against historical prices")
+    backtest_parser.add_argument('scenarios', help="Input file with one dashboard scenario per row")
+    backtest_parser.add_argument('-o', '--output', required=True, help="Summary file (.csv or .parquet)")
+    backtest_parser.add_argument('--prices', nargs='+', help="Price CSVs (default: data/prices or CI_MODEL_PRICES)")
+    backtest_parser.add_argument('--horizon', type=int, default=60, help="Window length in months")
+    backtest_parser.add_argument('--rolling', type=int, default=12, help="Rolling revenue window in months")
+    backtest_parser.set_defaults(func=backtest)
+
+    serve_parser = commands.add_parser('serve', help="Serve the models over HTTP (JSON and Arrow) with micro-batching")
+    serve_parser.add_argument('--host', default='127.0.0.1', help="Bind address (default: localhost only)")
+    serve_parser.add_argument('--port', type=int, default=8765, help="Port (0 picks a free one)")
+    serve_parser.add_argument('--max-batch', type=int, default=256, help="Most single requests coalesced into one call")
+    serve_parser.add_argument('--max-wait-ms', type=float, default=2.0, help="Longest a request waits for its batch to fill")
+    serve_parser.add_argument('--max-body-mb', type=float, default=256, help="Largest accepted request body")
+    serve_parser.set_defaults(func=serve)
+
+    args = parser.parse_args(argv)
+    sys.exit(args.func(args))
+
+
+if __name__ == '__main__':
+    main()
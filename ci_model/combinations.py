@@ -0,0 +1,48 @@
+import numpy as np
+
+from ci_model.batch import calculate_v2_batch
+from ci_model.categories import CATEGORY_INPUTS, load_categories
+from ci_model.core import V2_OUTPUTS
+
+# Lower is better for these outputs; the rest rank highest first
+ASCENDING_OUTPUTS = ['final_ci', 'total_capex', 'total_opex', 'total_cost', 'payback_years', 'cost_per_ton']
+
+
+def combination_total(ranges=None):
+    # Rows evaluate_combinations would evaluate: every categorical option times every range value
+    categories = load_categories()
+    sizes = [len(categories[k]) for k in CATEGORY_INPUTS]
+    sizes += [np.asarray(v).size for v in (ranges or {}).values()]
+    return int(np.prod(sizes, dtype=np.int64))
+
+
+def evaluate_combinations(base, ranges=None, rank_by='cost_per_ton', top=None, max_rows=20_000_000):
+    # Every option of every categorical input (fuel × scope × sequestration, from the tables)
+    # crossed with every value of each continuous range, in one vectorized pass. Each axis is
+    # shaped to its own dimension and the model broadcasts them into the full cross product.
+    if rank_by not in V2_OUTPUTS:
+        raise ValueError(f"rank_by must be one of {V2_OUTPUTS}")
+    categories = load_categories()
+    axes = {k: np.arange(len(categories[k])) for k in CATEGORY_INPUTS}
+    axes.update({k: np.asarray(v, dtype=float).ravel() for k, v in (ranges or {}).items()})
+    shape = tuple(len(v) for v in axes.values())
+    total = int(np.prod(shape))
+    if total > max_rows:
+        raise ValueError(f"{total:,} combinations exceed max_rows={max_rows:,}; narrow the ranges")
+
+    inputs = dict(base)
+    for i, (k, values) in enumerate(axes.items()):
+        inputs[k] = values.reshape([-1 if j == i else 1 for j in range(len(shape))])
+    results = {k: np.broadcast_to(v, shape).ravel() for k, v in calculate_v2_batch(inputs).items()}
+
+    # NaN/inf rank last either way
+    key = results[rank_by] if rank_by in ASCENDING_OUTPUTS else -results[rank_by]
+    order = np.argsort(np.where(np.isfinite(key), key, np.inf), kind='stable')[:top]
+    index = np.unravel_index(order, shape)
+    ranked = {}
+    for i, (k, values) in enumerate(axes.items()):
+        ranked[k] = np.array(list(categories[k]))[index[i]] if k in categories else values[index[i]]
+    ranked.update({k: v[order] for k, v in results.items()})
+    ranked['rank'] = np.arange(1, len(order) + 1)
+    ranked['combinations'] = total
+    return ranked
@@ -0,0 +1,172 @@
+# Model core shared by the Streamlit apps, the CLI and batch jobs. Pure Python: importing it
+# pulls in neither Streamlit nor NumPy; the vectorized versions live in ci_model.batch.
+
+from functools import lru_cache
+
+from ci_model.categories import load_categories
+
+BASELINE_CI = 65
+
+# Input keys of calculate_ci_model in ci_model_web_app_v3-2.py
+INPUT_KEYS = [
+    'capacity_mgy',
+    'solar_pct', 'solar_ci', 'solar_cost_per_kw', 'solar_kw',
+    'dryer_pct', 'dryer_ci', 'dryer_cost_per_unit', 'dryer_units',
+    'chp_pct', 'chp_ci', 'chp_cost_per_mmbtu', 'chp_mmbtu',
+    'boiler_pct', 'boiler_ci', 'boiler_cost_per_mmbtu', 'boiler_mmbtu',
+    'ccs_ci', 'ccs_capex',
+    'opex_pct', 'lcfs_price', 'q45_price',
+    'monthly_demand_charge', 'demand_reduction_pct',
+]
+
+OUTPUT_KEYS = [
+    'CI', 'Tons CO2', 'LCFS', '45Q', 'Revenue', 'CapEx', 'OpEx',
+    'Demand Savings', 'Total Cost', 'Payback', 'Abatement Cost',
+]
+
+
+def calculate_ci_model(inputs):
+    baseline_ci = BASELINE_CI
+
+    ci_reductions = {
+        'solar': -inputs['solar_ci'] * (inputs['solar_pct'] / 100),
+        'dryer': -inputs['dryer_ci'] * (inputs['dryer_pct'] / 100),
+        'chp': -inputs['chp_ci'] * (inputs['chp_pct'] / 100),
+        'boiler_elec': -inputs['boiler_ci'] * (inputs['boiler_pct'] / 100),
+        'ccs': inputs['ccs_ci']
+    }
+
+    total_ci = baseline_ci + sum(ci_reductions.values())
+    tons_co2_avoided = (baseline_ci - total_ci) * inputs['capacity_mgy'] * 3780 / 1000
+
+    lcfs_revenue = tons_co2_avoided * inputs['lcfs_price']
+    q45_revenue = tons_co2_avoided * inputs['q45_price']
+    total_revenue = lcfs_revenue + q45_revenue
+
+    annual_demand_charge = inputs['monthly_demand_charge'] * 12
+    demand_savings = annual_demand_charge * (inputs['solar_pct'] / 100) * (inputs['demand_reduction_pct'] / 100)
+
+    capex = {
+        'solar': inputs['solar_cost_per_kw'] * inputs['solar_kw'] / 100,
+        'dryer': inputs['dryer_cost_per_unit'] * inputs['dryer_units'],
+        'chp': inputs['chp_cost_per_mmbtu'] * inputs['chp_mmbtu'],
+        'boiler_elec': inputs['boiler_cost_per_mmbtu'] * inputs['boiler_mmbtu'],
+        'ccs': inputs['ccs_capex']
+    }
+
+    total_capex = sum(capex.values())
+    total_opex = total_capex * (inputs['opex_pct'] / 100)
+    total_cost = total_capex + total_opex - demand_savings
+
+    payback = total_cost / total_revenue if total_revenue > 0 else float('inf')
+    abatement_cost = total_cost / tons_co2_avoided if tons_co2_avoided > 0 else float('inf')
+
+    return {
+        'CI': total_ci,
+        'Tons CO2': tons_co2_avoided,
+        'LCFS': lcfs_revenue,
+        '45Q': q45_revenue,
+        'Revenue': total_revenue,
+        'CapEx': total_capex,
+        'OpEx': total_opex,
+        'Demand Savings': demand_savings,
+        'Total Cost': total_cost,
+        'Payback': payback,
+        'Abatement Cost': abatement_cost
+    }
+
+
+# Inputs of the v4.7/v5 dashboards with their default widget values
+DASHBOARD_DEFAULTS = {
+    'capacity_mgy': 110,
+    'baseline_ci': 65.0,
+    'mj_per_gal': 3780.0,
+    'lcfs_price': 125,
+    'q45_price': 85,
+    'ng_ci': 78.4,
+    'rng_ci': 15.0,
+    'cp_ci': 10.0,
+    'tax_rate': 21.0,
+    'opex_pct': 3.0,
+    'itc_pct': 30.0,
+    'cms_charge': 50000.0,
+    'solar_offset': 40,
+    'solar_ci': 25.0,
+    'dryer_ci': 10.0,
+    'chp_ci': 15.0,
+    'boiler_ci': 12.0,
+    'ccs_ci': 25.0,
+    'solar_capex': 5000000,
+    'dryer_capex': 3000000,
+    'chp_capex': 10000000,
+    'boiler_capex': 5000000,
+    'ccs_capex': 20000000,
+    'solar_pct': 100,
+    'dryer_pct': 100,
+    'chp_pct': 100,
+    'boiler_pct': 100,
+    'ccs_enabled': True,
+    'use_ng': True,
+    'ng_boiler_pct': 50,
+    'ng_dryer_pct': 50,
+    'use_rng': True,
+    'rng_pct': 30,
+    'use_cp': True,
+    'cp_pct': 25,
+}
+
+DASHBOARD_FLAGS = ['ccs_enabled', 'use_ng', 'use_rng', 'use_cp']
+
+DASHBOARD_OUTPUTS = [
+    'final_ci', 'tons_avoided', 'lcfs_revenue', 'q45_revenue', 'total_revenue', 'cms_savings',
+    'total_capex', 'opex', 'net_cost', 'payback', 'cost_per_ton',
+]
+
+
+@lru_cache(maxsize=1)
+def _dashboard_graph():
+    # Built once: the dependency order is the expensive part, evaluation is stateless
+    from ci_model.graph import dashboard_graph
+    return dashboard_graph()
+
+
+def calculate_dashboard(inputs):
+    # Scalar v4.7/v5 dashboard model; missing inputs fall back to DASHBOARD_DEFAULTS
+    values = _dashboard_graph().evaluate({**DASHBOARD_DEFAULTS, **inputs})
+    return {k: values[k] for k in DASHBOARD_OUTPUTS}
+
+
+V2_OUTPUTS = [
+    'final_ci', 'tons_co2_avoided', 'lcfs_revenue', 'q45_revenue', 'total_capex', 'total_opex',
+    'total_cost', 'payback_years', 'cost_per_ton',
+]
+
+
+def calculate_ci_model_v2(capacity_mgy, solar_pct, dryer_pct, chp_pct, chp_fuel, ccs_scope, sequestration_type,
+                          capex_solar, capex_dryers, capex_chp, capex_ccs, opex_pct, lcfs_credit, q45_credit):
+    baseline_ci = BASELINE_CI
+    ci_solar = -0.25 * solar_pct
+    ci_dryers = -0.10 * dryer_pct
+    ci_chp = -0.15 * chp_pct
+
+    # Categorical CI impacts come from data/categories.csv
+    impacts = load_categories()
+    ci_fuel = impacts['chp_fuel'].get(chp_fuel, 0)
+    ci_ccs_scope = impacts['ccs_scope'].get(ccs_scope, 0)
+    ci_sequestration = impacts['sequestration_type'].get(sequestration_type, 0)
+
+    final_ci = baseline_ci + ci_solar + ci_dryers + ci_chp + ci_fuel + ci_ccs_scope + ci_sequestration
+    tons_co2_avoided = (baseline_ci - final_ci) * capacity_mgy * 3780 / 1000
+
+    lcfs_revenue = tons_co2_avoided * lcfs_credit
+    q45_revenue = tons_co2_avoided * q45_credit
+
+    total_revenue = lcfs_revenue + q45_revenue
+    total_capex = capex_solar + capex_dryers + capex_chp + capex_ccs
+    total_opex = total_capex * (opex_pct / 100)
+    total_cost = total_capex + total_opex
+
+    payback_years = total_cost / total_revenue if total_revenue > 0 else float('inf')
+    cost_per_ton = total_cost / tons_co2_avoided if tons_co2_avoided > 0 else float('inf')
+
+    return final_ci, tons_co2_avoided, lcfs_revenue, q45_revenue, total_capex, total_opex, total_cost, payback_years, cost_per_ton
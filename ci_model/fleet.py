@@ -0,0 +1,36 @@
+import numpy as np
+
+from ci_model.batch import DASHBOARD_DEFAULTS, _ratio, calculate_dashboard_batch
+from ci_model.plants import PLANT_KEYS, load_plants
+
+FLEET_OUTPUTS = ['final_ci', 'tons_avoided', 'total_revenue', 'total_capex', 'net_cost', 'payback', 'cost_per_ton']
+
+
+def fleet_inputs(package, plants):
+    # Plant columns always come from the registry; strategy inputs come from the
+    # package, then the plant's default mix, then the dashboard defaults
+    columns = {}
+    for key, default in DASHBOARD_DEFAULTS.items():
+        if key in PLANT_KEYS:
+            values = [p.get(key, package.get(key, default)) for p in plants]
+        elif key in package:
+            columns[key] = package[key]
+            continue
+        else:
+            values = [p.get(key, default) for p in plants]
+        columns[key] = np.array(values, dtype=float)
+    return columns
+
+
+def evaluate_fleet(package, plants=None, model=calculate_dashboard_batch):
+    plants = list(load_plants().values()) if plants is None else list(plants)
+    inputs = fleet_inputs(package, plants)
+    results = model(inputs)
+
+    per_plant = {'name': [p['name'] for p in plants], 'capacity_mgy': inputs['capacity_mgy']}
+    per_plant.update({k: np.broadcast_to(results[k], (len(plants),)) for k in FLEET_OUTPUTS})
+
+    total = {k: float(np.sum(per_plant[k])) for k in ['capacity_mgy', 'tons_avoided', 'total_revenue', 'total_capex', 'net_cost']}
+    total['payback'] = float(_ratio(total['net_cost'], total['total_revenue']))
+    total['cost_per_ton'] = float(_ratio(total['net_cost'], total['tons_avoided']))
+    return {'plants': per_plant, 'total': total}
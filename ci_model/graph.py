@@ -0,0 +1,153 @@
+import inspect
+
+
+class Graph:
+    # Nodes are plain functions; their parameter names are the inputs or nodes they depend on
+    def __init__(self, nodes):
+        self.nodes = dict(nodes)
+        self.deps = {name: list(inspect.signature(fn).parameters) for name, fn in self.nodes.items()}
+        self.order = self._topological_order()
+        self.values = {}
+        self.recomputed = []
+
+    def _topological_order(self):
+        order, state = [], {}
+
+        def visit(name):
+            if state.get(name) == 'done':
+                return
+            if state.get(name) == 'visiting':
+                raise ValueError(f"Dependency cycle at node: {name}")
+            state[name] = 'visiting'
+            for dep in self.deps[name]:
+                if dep in self.nodes:
+                    visit(dep)
+            state[name] = 'done'
+            order.append(name)
+
+        for name in self.nodes:
+            visit(name)
+        return order
+
+    def update(self, inputs):
+        changed = {k for k, v in inputs.items() if k not in self.values or self.values[k] != v}
+        self.values.update(inputs)
+        self.recomputed = []
+        for name in self.order:
+            if name in self.values and not changed.intersection(self.deps[name]):
+                continue
+            value = self.nodes[name](*[self.values[d] for d in self.deps[name]])
+            self.recomputed.append(name)
+            # Downstream nodes only rerun when this node's value actually moved
+            if name not in self.values or value != self.values[name]:
+                changed.add(name)
+            self.values[name] = value
+        return self.values
+
+    def evaluate(self, inputs):
+        # Every node from scratch into a new dict; leaves the graph's own values alone, so one
+        # graph can serve concurrent callers
+        values = {**self.values, **inputs}
+        for name in self.order:
+            values[name] = self.nodes[name](*[values[d] for d in self.deps[name]])
+        return values
+
+
+# Derived quantities of the v5 dashboard (ci_model_web_app_v5-3.py)
+DASHBOARD_NODES = {}
+
+
+def _node(fn):
+    DASHBOARD_NODES[fn.__name__] = fn
+    return fn
+
+
+@_node
+def solar_capex_net(solar_capex, itc_pct):
+    return solar_capex * (1 - itc_pct / 100)
+
+
+@_node
+def ci_reduction(solar_pct, solar_ci, dryer_pct, dryer_ci, chp_pct, chp_ci, boiler_pct, boiler_ci,
+                 ccs_enabled, ccs_ci):
+    reduction = (solar_pct * solar_ci + dryer_pct * dryer_ci + chp_pct * chp_ci + boiler_pct * boiler_ci) / 100
+    return reduction + (ccs_ci if ccs_enabled else 0)
+
+
+@_node
+def ng_penalty(use_ng, ng_boiler_pct, ng_dryer_pct, ng_ci):
+    return ((ng_boiler_pct + ng_dryer_pct) / 2) * ng_ci / 100 if use_ng else 0
+
+
+@_node
+def rng_offset(use_rng, rng_pct, baseline_ci, rng_ci):
+    return rng_pct * (baseline_ci - rng_ci) / 100 if use_rng else 0
+
+
+@_node
+def cp_offset(use_cp, cp_pct, baseline_ci, cp_ci):
+    return cp_pct * (baseline_ci - cp_ci) / 100 if use_cp else 0
+
+
+@_node
+def final_ci(baseline_ci, ci_reduction, ng_penalty, rng_offset, cp_offset):
+    return baseline_ci - ci_reduction + ng_penalty - rng_offset - cp_offset
+
+
+@_node
+def tons_avoided(baseline_ci, final_ci, capacity_mgy, mj_per_gal):
+    return (baseline_ci - final_ci) * capacity_mgy * mj_per_gal / 1000
+
+
+@_node
+def lcfs_revenue(tons_avoided, lcfs_price):
+    return tons_avoided * lcfs_price
+
+
+@_node
+def q45_revenue(tons_avoided, q45_price, ccs_enabled):
+    return tons_avoided * q45_price if ccs_enabled else 0
+
+
+@_node
+def total_revenue(lcfs_revenue, q45_revenue):
+    return lcfs_revenue + q45_revenue
+
+
+@_node
+def cms_savings(cms_charge, solar_pct, solar_offset, cms_savings_hourly):
+    # cms_savings_hourly is set when the 8760-hour simulation replaces the flat formula
+    if cms_savings_hourly is not None:
+        return cms_savings_hourly
+    return cms_charge * 12 * solar_pct * solar_offset / 10000
+
+
+@_node
+def total_capex(solar_capex_net, dryer_capex, chp_capex, boiler_capex, ccs_capex, ccs_enabled):
+    return solar_capex_net + dryer_capex + chp_capex + boiler_capex + (ccs_capex if ccs_enabled else 0)
+
+
+@_node
+def opex(total_capex, opex_pct):
+    return total_capex * (opex_pct / 100)
+
+
+@_node
+def net_cost(total_capex, opex, cms_savings):
+    return total_capex + opex - cms_savings
+
+
+@_node
+def payback(net_cost, total_revenue):
+    return net_cost / total_revenue if total_revenue > 0 else float("inf")
+
+
+@_node
+def cost_per_ton(net_cost, tons_avoided):
+    return net_cost / tons_avoided if tons_avoided > 0 else float("inf")
+
+
+def dashboard_graph():
+    graph = Graph(DASHBOARD_NODES)
+    graph.values['cms_savings_hourly'] = None
+    return graph
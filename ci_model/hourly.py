@@ -0,0 +1,91 @@
+import numpy as np
+
+from ci_model.core import DASHBOARD_DEFAULTS
+
+HOURS = 8760
+MONTH_DAYS = [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+MONTH_START = np.r_[0, np.cumsum(MONTH_DAYS[:-1])] * 24
+
+
+def read_profile(path_or_buffer):
+    # One value per hour; the last numeric column of a CSV with 8760 rows
+    import pandas as pd
+    df = pd.read_csv(path_or_buffer)
+    profile = df.select_dtypes('number').iloc[:, -1].to_numpy(dtype=float)
+    if len(profile) != HOURS:
+        raise ValueError(f"Expected {HOURS} hourly values, got {len(profile)}")
+    return profile
+
+
+def synthetic_solar_profile(latitude=37.0):
+    # Clear-sky shape in kW per kW installed: half-sine between sunrise and sunset,
+    # with day length and peak output following the season
+    day = np.arange(HOURS) // 24
+    hour = np.arange(HOURS) % 24 + 0.5
+    declination = np.radians(23.44) * np.sin(2 * np.pi * (284 + day + 1) / 365)
+    cos_h = -np.tan(np.radians(latitude)) * np.tan(declination)
+    half_day = np.degrees(np.arccos(np.clip(cos_h, -1, 1))) / 15
+    phase = (hour - (12 - half_day)) / (2 * half_day)
+    elevation = np.cos(np.radians(latitude) - declination)
+    return np.where((phase > 0) & (phase < 1), np.sin(np.pi * phase) * elevation, 0.0)
+
+
+def monthly_peaks(load):
+    return np.maximum.reduceat(load, MONTH_START, axis=-1)
+
+
+def demand_rate(load, monthly_charge):
+    # $/kW-month that reproduces the flat monthly CMS charge for the profile without solar
+    return np.asarray(monthly_charge, dtype=float) / monthly_peaks(load).mean()
+
+
+def simulate_demand_charges(load, solar_profile, solar_kw, rate, chunk_size=256):
+    # load and solar_profile: 8760-hour arrays; solar_kw and rate: scalars or one per scenario.
+    # Scenarios are processed chunk_size at a time so the hourly matrix stays small.
+    load = np.asarray(load, dtype=float)
+    solar_profile = np.asarray(solar_profile, dtype=float)
+    solar_kw, rate = np.broadcast_arrays(np.atleast_1d(np.asarray(solar_kw, dtype=float)),
+                                         np.atleast_1d(np.asarray(rate, dtype=float)))
+    peaks_without = monthly_peaks(load)
+    peaks_with = np.empty(solar_kw.shape + (12,))
+    for start in range(0, len(solar_kw), chunk_size):
+        kw = solar_kw[start:start + chunk_size, None]
+        net_load = np.maximum(load - kw * solar_profile, 0)
+        peaks_with[start:start + chunk_size] = monthly_peaks(net_load)
+
+    charges_without = rate[:, None] * peaks_without
+    charges_with = rate[:, None] * peaks_with
+    return {
+        'peaks_without': peaks_without,
+        'peaks_with': peaks_with,
+        'charges_without': charges_without,
+        'charges_with': charges_with,
+        'annual_savings': (charges_without - charges_with).sum(axis=-1),
+    }
+
+
+def hourly_cms_savings(load, solar_profile, solar_kw, monthly_charge, chunk_size=256):
+    return simulate_demand_charges(
+        load, solar_profile, solar_kw, demand_rate(load, monthly_charge), chunk_size
+    )['annual_savings']
+
+
+def cms_savings_curve(load, solar_profile, solar_kw, max_pct=200, chunk_size=256):
+    # Annual hourly CMS savings per $1 of monthly demand charge at every whole solar adoption
+    # percentage from 0 to max_pct of solar_kw. The demand rate, and so the savings, scale
+    # linearly with the charge, so this one curve prices any scenario of the plant.
+    pct = np.arange(max_pct + 1, dtype=float)
+    return pct, hourly_cms_savings(load, solar_profile, solar_kw * pct / 100, 1.0, chunk_size)
+
+
+def with_hourly_cms(model, curve):
+    # Dashboard batch model whose CMS savings come from the hourly simulation: each scenario's
+    # cms_charge times the curve at its solar_pct (interpolated, clamped to the curve's range)
+    pct, per_dollar = curve
+
+    def evaluate(inputs):
+        solar_pct = inputs['solar_pct'] if 'solar_pct' in inputs else DASHBOARD_DEFAULTS['solar_pct']
+        cms_charge = inputs['cms_charge'] if 'cms_charge' in inputs else DASHBOARD_DEFAULTS['cms_charge']
+        savings = np.asarray(cms_charge, dtype=float) * np.interp(solar_pct, pct, per_dollar)
+        return model({**inputs, 'cms_savings_hourly': savings})
+    return evaluate
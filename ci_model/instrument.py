@@ -0,0 +1,101 @@
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+PROFILE_LOG = os.environ.get(
+    'CI_MODEL_PROFILE_LOG',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'rerun_profile.jsonl'),
+)
+
+_log_lock = threading.Lock()
+
+
+class RerunProfiler:
+    # Times named sections of one script rerun. Use section() as a context manager or call
+    # lap(name) after each block of a linear script to close the block that just ran.
+    # Memory tracing starts tracemalloc for the whole process and every thread in it, so it is
+    # for a dedicated profiling server, not something a single session should switch on.
+    def __init__(self, session_id, enabled=True, trace_memory=True, log_path=PROFILE_LOG):
+        self.session_id = session_id
+        self.enabled = enabled
+        self.trace_memory = enabled and trace_memory
+        self.log_path = log_path
+        self.sections = []
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self._start = self._last = time.perf_counter()
+        self._last_memory = self._memory()
+
+    def _memory(self):
+        if not self.trace_memory:
+            return 0
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        return current
+
+    def _record(self, name, start, start_memory):
+        now = time.perf_counter()
+        entry = {'name': name, 'ms': (now - start) * 1000}
+        if self.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            entry['alloc_kb'] = (current - start_memory) / 1024
+            entry['peak_kb'] = (peak - start_memory) / 1024
+        self.sections.append(entry)
+        self._last = now
+        self._last_memory = self._memory()
+
+    @contextmanager
+    def section(self, name):
+        if not self.enabled:
+            yield
+            return
+        start, start_memory = time.perf_counter(), self._memory()
+        try:
+            yield
+        finally:
+            self._record(name, start, start_memory)
+
+    def lap(self, name):
+        if self.enabled:
+            self._record(name, self._last, self._last_memory)
+
+    def finish(self):
+        if not self.enabled:
+            return None
+        record = {
+            'session_id': self.session_id,
+            'timestamp': time.time(),
+            'total_ms': (time.perf_counter() - self._start) * 1000,
+            'sections': self.sections,
+        }
+        if self.log_path:
+            with _log_lock, open(self.log_path, 'a') as f:
+                f.write(json.dumps(record) + '\n')
+        return record
+
+
+def summarize_log(path=PROFILE_LOG):
+    # p50/p99 rerun latency overall and per section across all sessions in the log
+    import numpy as np
+    totals, sections, sessions = [], {}, set()
+    with open(path) as f:
+        for line in f:
+            record = json.loads(line)
+            sessions.add(record['session_id'])
+            totals.append(record['total_ms'])
+            for s in record['sections']:
+                sections.setdefault(s['name'], []).append(s['ms'])
+
+    def stats(values):
+        values = np.array(values)
+        return {'count': len(values), 'p50_ms': float(np.percentile(values, 50)),
+                'p99_ms': float(np.percentile(values, 99))}
+
+    return {
+        'sessions': len(sessions),
+        'rerun': stats(totals) if totals else None,
+        'sections': {name: stats(values) for name, values in sections.items()},
+    }
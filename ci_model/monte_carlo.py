@@ -0,0 +1,115 @@
+import numpy as np
+from scipy.special import ndtr
+
+from ci_model.batch import calculate_dashboard_batch
+
+PERCENTILES = {'P10': 0.10, 'P50': 0.50, 'P90': 0.90}
+
+# Default uncertainty for the dashboard: credit prices and per-strategy CI reductions
+DEFAULT_DISTRIBUTIONS = {
+    'lcfs_price': ('normal', 125, 30),
+    'q45_price': ('normal', 85, 10),
+    'solar_ci': ('triangular', 20.0, 25.0, 30.0),
+    'dryer_ci': ('triangular', 8.0, 10.0, 12.0),
+    'chp_ci': ('triangular', 12.0, 15.0, 18.0),
+    'boiler_ci': ('triangular', 9.0, 12.0, 15.0),
+    'ccs_ci': ('triangular', 20.0, 25.0, 30.0),
+}
+
+DEFAULT_CORRELATIONS = {('lcfs_price', 'q45_price'): 0.5}
+
+
+def _transform(spec, z):
+    kind, *params = spec
+    if kind == 'normal':
+        mean, sd = params
+        return mean + sd * z
+    if kind == 'lognormal':
+        median, sigma = params
+        return median * np.exp(sigma * z)
+    u = ndtr(z)
+    if kind == 'uniform':
+        low, high = params
+        return low + (high - low) * u
+    if kind == 'triangular':
+        low, mode, high = params
+        if high == low:
+            return np.full_like(z, low, dtype=float)
+        split = (mode - low) / (high - low)
+        return np.where(
+            u < split,
+            low + np.sqrt(u * (high - low) * (mode - low)),
+            high - np.sqrt((1 - u) * (high - low) * (high - mode)),
+        )
+    raise ValueError(f"Unknown distribution: {kind}")
+
+
+def correlation_matrix(keys, correlations):
+    corr = np.eye(len(keys))
+    for (a, b), rho in (correlations or {}).items():
+        i, j = keys.index(a), keys.index(b)
+        corr[i, j] = corr[j, i] = rho
+    return corr
+
+
+def _factor(corr):
+    # Cholesky where the matrix is positive definite; a correlation of exactly +-1 is only
+    # semi-definite, so fall back to the eigendecomposition (clipping rounding noise)
+    try:
+        return np.linalg.cholesky(corr)
+    except np.linalg.LinAlgError:
+        w, v = np.linalg.eigh(corr)
+        if w.min() < -1e-8:
+            raise ValueError("Correlations are inconsistent (matrix is not positive semi-definite)") from None
+        return v * np.sqrt(np.clip(w, 0, None))
+
+
+def sample_inputs(distributions, n, rng, correlations=None):
+    # Gaussian copula: correlated standard normals mapped through each marginal
+    keys = list(distributions)
+    factor = _factor(correlation_matrix(keys, correlations))
+    z = rng.standard_normal((n, len(keys))) @ factor.T
+    return {k: _transform(distributions[k], z[:, i]) for i, k in enumerate(keys)}
+
+
+def percentiles(values):
+    q = np.quantile(values, list(PERCENTILES.values()), method='inverted_cdf')
+    return dict(zip(PERCENTILES, q.tolist()))
+
+
+def run_monte_carlo(base, distributions=None, correlations=None, seed=0, batch_size=100_000,
+                    max_draws=1_000_000, tol=0.001, metrics=('payback', 'cost_per_ton'),
+                    model=calculate_dashboard_batch):
+    if max_draws < 1 or batch_size < 1:
+        raise ValueError("max_draws and batch_size must be at least 1")
+    distributions = DEFAULT_DISTRIBUTIONS if distributions is None else distributions
+    correlations = DEFAULT_CORRELATIONS if correlations is None else correlations
+    rng = np.random.default_rng(seed)
+
+    chunks = {m: [] for m in metrics}
+    previous = None
+    converged = False
+    draws = 0
+    while draws < max_draws:
+        n = min(batch_size, max_draws - draws)
+        inputs = dict(base)
+        inputs.update(sample_inputs(distributions, n, rng, correlations))
+        outputs = model(inputs)
+        for m in metrics:
+            chunks[m].append(outputs[m])
+        draws += n
+
+        # Stop once P10/P50/P90 of every metric moved less than tol between batches
+        current = np.array([list(percentiles(np.concatenate(chunks[m])).values()) for m in metrics])
+        if previous is not None and np.allclose(current, previous, rtol=tol, atol=0):
+            converged = True
+            break
+        previous = current
+
+    values = {m: np.concatenate(chunks[m]) for m in metrics}
+    return {
+        'draws': draws,
+        'converged': converged,
+        'percentiles': {m: percentiles(values[m]) for m in metrics},
+        'values': values,
+    }
@@ -0,0 +1,120 @@
+import numpy as np
+from scipy.optimize import Bounds, LinearConstraint, milp
+
+from ci_model.plants import PLANT_KEYS
+
+STRATEGIES = ['solar', 'dryer', 'chp', 'boiler']
+
+# Inputs of the v4 dashboard (ci_model_web_app_v4-2.py) with their default widget values
+OPTIMIZER_DEFAULTS = {
+    'capacity_mgy': 110,
+    'baseline_ci': 65,
+    'ci_goal': -3.0,
+    'solar_ci': 0.25, 'solar_capex': 5000000, 'itc_pct': 30.0,
+    'dryer_ci': 0.10, 'dryer_capex': 3000000,
+    'chp_ci': 0.15, 'chp_capex': 10000000,
+    'boiler_ci': 0.12, 'boiler_capex': 5000000,
+    'ccs_ci': 25.0, 'ccs_capex': 20000000,
+    'cms_charge': 50000, 'solar_offset': 40,
+    'opex_pct': 3.0, 'lcfs_price': 125, 'q45_price': 85,
+}
+
+
+def annuity_factor(discount_rate, years):
+    return float(np.sum((1 + discount_rate / 100) ** -np.arange(1, years + 1)))
+
+
+def optimize_strategy(params=None, objective='net_cost', min_pct=0.0, discount_rate=8.0, years=20,
+                      allowed=None):
+    p = dict(OPTIMIZER_DEFAULTS, **(params or {}))
+    allowed = set(STRATEGIES + ['ccs'] if allowed is None else allowed)
+    n = len(STRATEGIES)
+
+    # Variables: adopt y (n strategies + CCS, binary), adoption fraction x (n, 0-1) and
+    # w = x * y_ccs (n), which linearizes the 45Q revenue earned only when CCS is on
+    ny, ix, iw = n + 1, n + 1, 2 * n + 1
+    nvar = 3 * n + 1
+    ci = np.array([p[s + '_ci'] for s in STRATEGIES], dtype=float)  # CI reduction at 100 % adoption
+    capex = np.array([p[s + '_capex'] for s in STRATEGIES] + [p['ccs_capex']], dtype=float)
+    capex[0] *= 1 - p['itc_pct'] / 100
+    opex = p['opex_pct'] / 100
+    cms = p['cms_charge'] * 12 * p['solar_offset'] / 100
+    tons_per_ci = p['capacity_mgy'] * 3780 / 1000
+
+    rows, lower, upper = [], [], []
+
+    def constrain(coefs, lo, hi):
+        row = np.zeros(nvar)
+        for i, c in coefs:
+            row[i] = c
+        rows.append(row)
+        lower.append(lo)
+        upper.append(hi)
+
+    for i in range(n):
+        constrain([(ix + i, 1), (i, -1)], -np.inf, 0)                  # x <= y
+        constrain([(ix + i, 1), (i, -min_pct / 100)], 0, np.inf)       # x >= min_pct * y
+        constrain([(iw + i, 1), (ix + i, -1)], -np.inf, 0)             # w <= x
+        constrain([(iw + i, 1), (n, -1)], -np.inf, 0)                  # w <= y_ccs
+        constrain([(iw + i, 1), (ix + i, -1), (n, -1)], -1, np.inf)    # w >= x + y_ccs - 1
+    # final_ci = baseline - sum(ci * x) - ccs_ci * y_ccs <= ci_goal
+    constrain([(ix + i, ci[i]) for i in range(n)] + [(n, p['ccs_ci'])], p['baseline_ci'] - p['ci_goal'], np.inf)
+
+    cost = np.zeros(nvar)
+    if objective == 'net_cost':
+        cost[:ny] = capex * (1 + opex)
+        cost[ix] -= cms
+    elif objective == 'npv':
+        # Minimize -NPV with level annual revenue, CMS savings and O&M over the project life
+        af = annuity_factor(discount_rate, years)
+        cost[:ny] = capex * (1 + af * opex)
+        cost[ix] -= af * cms
+        cost[ix:ix + n] -= af * tons_per_ci * p['lcfs_price'] * ci
+        cost[iw:iw + n] -= af * tons_per_ci * p['q45_price'] * ci
+        cost[n] -= af * tons_per_ci * (p['lcfs_price'] + p['q45_price']) * p['ccs_ci']
+    else:
+        raise ValueError(f"Unknown objective: {objective}")
+
+    upper_bounds = np.ones(nvar)
+    for i, s in enumerate(STRATEGIES + ['ccs']):
+        if s not in allowed:
+            upper_bounds[i] = 0
+    integrality = np.r_[np.ones(ny), np.zeros(2 * n)]
+    res = milp(cost, integrality=integrality, bounds=Bounds(np.zeros(nvar), upper_bounds),
+               constraints=LinearConstraint(np.array(rows), lower, upper))
+    if res.x is None:
+        # Report the lowest CI the allowed strategies can reach so the UI can explain the gap
+        best = p['baseline_ci'] - sum(ci[i] for i, s in enumerate(STRATEGIES) if s in allowed)
+        best -= p['ccs_ci'] if 'ccs' in allowed else 0
+        return {'status': 'infeasible', 'message': res.message, 'min_final_ci': float(best)}
+
+    y = np.round(res.x[:ny]).astype(bool)
+    x = np.clip(res.x[ix:ix + n], 0, 1) * y[:n] + 0.0
+    ci_reduction = float(ci @ x + p['ccs_ci'] * y[n])
+    final_ci = p['baseline_ci'] - ci_reduction
+    tons = ci_reduction * tons_per_ci
+    revenue = tons * p['lcfs_price'] + (tons * p['q45_price'] if y[n] else 0)
+    total_capex = float(capex @ y)
+    net_cost = float(total_capex * (1 + opex) - cms * x[0])
+    af = annuity_factor(discount_rate, years)
+    return {
+        'status': 'optimal',
+        'adopt': dict(zip(STRATEGIES + ['ccs'], y.tolist())),
+        'pct': dict(zip(STRATEGIES, (x * 100).tolist())),
+        'final_ci': final_ci,
+        'total_capex': total_capex,
+        'net_cost': net_cost,
+        'total_revenue': revenue,
+        'payback': net_cost / revenue if revenue > 0 else float('inf'),
+        'npv': float(-total_capex + af * (revenue + cms * x[0] - total_capex * opex)),
+    }
+
+
+def optimize_fleet(plants, params=None, **kwargs):
+    # One small MILP per plant; plant columns override the shared strategy parameters
+    results = {}
+    for plant in plants:
+        plant_params = dict(params or {})
+        plant_params.update({k: plant[k] for k in PLANT_KEYS if k in plant})
+        results[plant['name']] = optimize_strategy(plant_params, **kwargs)
+    return results
@@ -0,0 +1,201 @@
+# Multi-core evaluation of one scenario batch. The batch is split into row shards that a
+# persistent process pool evaluates. Numeric input columns and every output column live in
+# shared memory, so each worker reads its rows in place and writes its results straight into
+# the output buffer. Only shard bounds and timings cross the process boundary. Shard sizes adapt
+# to the measured throughput: each shard takes about target_seconds, and the tail is split
+# evenly across workers.
+import atexit
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Segments this worker has mapped, by name; only the current batch's are kept open
+_segments = {}
+
+
+def _model(model):
+    # Model name (a key of ci_model.batch.MODELS) or a picklable batch function
+    if isinstance(model, str):
+        from ci_model.batch import MODELS
+        return MODELS[model]
+    return model
+
+
+def _attach(name, keep):
+    if name not in _segments:
+        for stale in [k for k in _segments if k not in keep]:
+            _segments.pop(stale).close()
+        _segments[name] = shared_memory.SharedMemory(name=name)
+    return _segments[name]
+
+
+def _run_shard(model, n, input_segment, input_keys, output_segment, output_keys, scalars, objects, start, stop):
+    began = time.perf_counter()
+    keep = {input_segment, output_segment}
+    x = np.ndarray((len(input_keys), n), buffer=_attach(input_segment, keep).buf) if input_keys else None
+    y = np.ndarray((len(output_keys), n), buffer=_attach(output_segment, keep).buf)
+    inputs = {**scalars, **objects, **{k: x[i, start:stop] for i, k in enumerate(input_keys)}}
+    results = _model(model)(inputs)
+    for j, k in enumerate(output_keys):
+        y[j, start:stop] = results[k]
+    # Drop the views before the segments can be closed for the next batch
+    del x, y, inputs, results
+    return start, stop, os.getpid(), time.perf_counter() - began
+
+
+def _segment(nbytes):
+    return shared_memory.SharedMemory(create=True, size=max(nbytes, 8))
+
+
+def _start_method():
+    # Forking a threaded process (the Streamlit server) is unsafe; forkserver where available
+    methods = multiprocessing.get_all_start_methods()
+    return 'forkserver' if 'forkserver' in methods else 'spawn'
+
+
+class ShardedExecutor:
+    def __init__(self, workers=None, min_parallel=100_000, min_rows=4096, max_rows=1_000_000,
+                 target_seconds=0.25, mp_context=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.min_parallel = min_parallel
+        self.min_rows = min_rows
+        self.max_rows = max_rows
+        self.target_seconds = target_seconds
+        self.mp_context = mp_context or _start_method()
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self):
+        # Started on first use and kept for later calls, so workers stay warm (imports done,
+        # segments mapped) between batches
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context(self.mp_context))
+            return self._pool
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+                self._pool = None
+
+    def model(self, model, progress=None):
+        # Drop-in replacement for a batch function, e.g. sweep_2d(..., model=executor.model('dashboard'))
+        return partial(self.evaluate, model, progress=progress)
+
+    def _shard_rows(self, remaining, rate):
+        rows = self.min_rows * 4 if rate is None else rate * self.target_seconds
+        rows = min(rows, self.max_rows, math.ceil(remaining / self.workers))
+        return int(max(rows, self.min_rows))
+
+    def evaluate(self, model, inputs, progress=None):
+        # inputs: scalars and arrays that broadcast together, as for the batch functions.
+        # Outputs have the broadcast shape. Batches under min_parallel scenarios (or a single
+        # worker) run inline. progress(info) is called in this process after every shard.
+        arrays = {k: np.asarray(v) for k, v in inputs.items()}
+        shape = np.broadcast_shapes(*(a.shape for a in arrays.values()))
+        n = math.prod(shape)
+        if self.workers <= 1 or n < self.min_parallel:
+            return _model(model)(inputs)
+
+        scalars = {k: inputs[k] for k, a in arrays.items() if not a.ndim}
+        numeric = [k for k, a in arrays.items() if a.ndim and a.dtype.kind in 'biuf']
+        objects = {k: np.broadcast_to(a, shape).ravel() for k, a in arrays.items() if a.ndim and k not in numeric}
+        # One row through the model gives the output keys
+        first = _model(model)({**scalars, **{k: a.reshape(-1)[:1] for k, a in arrays.items() if a.ndim}})
+        output_keys = list(first)
+
+        input_segment = _segment(8 * len(numeric) * n)
+        output_segment = _segment(8 * len(output_keys) * n)
+        try:
+            x = np.ndarray((len(numeric), n), buffer=input_segment.buf)
+            for i, k in enumerate(numeric):
+                x[i].reshape(shape)[...] = arrays[k]
+            del x
+            self._run(model, n, input_segment.name, numeric, output_segment.name, output_keys, scalars, objects,
+                      progress)
+            y = np.ndarray((len(output_keys), n), buffer=output_segment.buf)
+            # One copy out of the segment, so it can be released when this call returns
+            results = {k: y[j].reshape(shape).copy() for j, k in enumerate(output_keys)}
+            del y
+            return results
+        finally:
+            input_segment.close()
+            input_segment.unlink()
+            output_segment.close()
+            output_segment.unlink()
+
+    def _run(self, model, n, input_segment, input_keys, output_segment, output_keys, scalars, objects, progress):
+        pool = self._get_pool()
+        began = time.perf_counter()
+        pending = {}
+        next_start, done, shard, rate = 0, 0, 0, None
+
+        def submit():
+            nonlocal next_start, shard
+            rows = self._shard_rows(n - next_start, rate)
+            start, stop = next_start, min(next_start + rows, n)
+            future = pool.submit(_run_shard, model, n, input_segment, input_keys, output_segment, output_keys,
+                                 scalars, {k: v[start:stop] for k, v in objects.items()}, start, stop)
+            pending[future] = shard
+            next_start, shard = stop, shard + 1
+
+        try:
+            # Two shards in flight per worker, so none idles while the next one is sized
+            while next_start < n and len(pending) < 2 * self.workers:
+                submit()
+            while pending:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    index = pending.pop(future)
+                    start, stop, pid, seconds = future.result()
+                    done += stop - start
+                    shard_rate = (stop - start) / max(seconds, 1e-9)
+                    rate = shard_rate if rate is None else 0.5 * rate + 0.5 * shard_rate
+                    if progress is not None:
+                        progress({
+                            'shard': index, 'start': start, 'stop': stop, 'pid': pid, 'seconds': seconds,
+                            'done': done, 'total': n, 'elapsed': time.perf_counter() - began,
+                        })
+                while next_start < n and len(pending) < 2 * self.workers:
+                    submit()
+        except BrokenProcessPool:
+            # A worker died (e.g. out of memory); start a fresh pool on the next call
+            with self._lock:
+                self._pool = None
+            raise
+        except BaseException:
+            # Let shards already running finish before their segments are unlinked
+            for future in pending:
+                future.cancel()
+            wait(pending)
+            raise
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def get_executor(workers=None):
+    # Process-wide executor (one pool for the CLI or every Streamlit session); shut down at exit
+    global _default
+    with _default_lock:
+        if _default is None or (workers and workers != _default.workers):
+            if _default is not None:
+                _default.shutdown()
+            _default = ShardedExecutor(workers)
+        return _default
+
+
+@atexit.register
+def _shutdown_default():
+    if _default is not None:
+        _default.shutdown()
@@ -0,0 +1,84 @@
+import numpy as np
+
+from ci_model.batch import calculate_v2_batch
+from ci_model.categories import CATEGORY_INPUTS, load_categories
+
+NO_OPTION = "None"
+
+
+def pareto_front(ci, cost):
+    # Sort-based skyline for minimizing both: after ordering by CI (ties by cost), a point is
+    # non-dominated only if its cost is strictly below every cost seen before it
+    order = np.lexsort((cost, ci))
+    sorted_cost = cost[order]
+    best_before = np.minimum.accumulate(np.r_[np.inf, sorted_cost[:-1]])
+    return order[sorted_cost < best_before]
+
+
+def _decisions(index, levels):
+    # Decode a flat combination index into adoption levels and categorical codes.
+    # CHP states: off, or (fuel, level > 0); CCS states: off, or (scope, sequestration).
+    n_levels = len(levels)
+    n_fuels, n_scopes, n_seq = (len(load_categories()[k]) for k in CATEGORY_INPUTS)
+    solar, dryer, chp_state, ccs_state = np.unravel_index(
+        index, (n_levels, n_levels, 1 + n_fuels * (n_levels - 1), 1 + n_scopes * n_seq)
+    )
+    chp_on = chp_state > 0
+    ccs_on = ccs_state > 0
+    return {
+        'solar_pct': levels[solar],
+        'dryer_pct': levels[dryer],
+        'chp_pct': np.where(chp_on, levels[1 + (chp_state - 1) % (n_levels - 1)], 0),
+        'chp_fuel': np.where(chp_on, (chp_state - 1) // (n_levels - 1), -1),
+        'ccs_scope': np.where(ccs_on, (ccs_state - 1) // n_seq, -1),
+        'sequestration_type': np.where(ccs_on, (ccs_state - 1) % n_seq, -1),
+    }
+
+
+def combination_count(pct_step):
+    n_levels = len(np.arange(0, 100 + pct_step, pct_step))
+    n_fuels, n_scopes, n_seq = (len(load_categories()[k]) for k in CATEGORY_INPUTS)
+    return n_levels ** 2 * (1 + n_fuels * (n_levels - 1)) * (1 + n_scopes * n_seq)
+
+
+def enumerate_pareto(base, pct_step=10, chunk_size=1_000_000):
+    levels = np.arange(0, 100 + pct_step, pct_step, dtype=float)
+    levels = levels[levels <= 100]
+    total = combination_count(pct_step)
+
+    front_index = np.empty(0, dtype=np.int64)
+    front_ci = np.empty(0)
+    front_cost = np.empty(0)
+    for start in range(0, total, chunk_size):
+        index = np.arange(start, min(start + chunk_size, total))
+        d = _decisions(index, levels)
+        inputs = dict(base)
+        inputs.update(d)
+        # A strategy that is switched off contributes neither CI impact nor CapEx
+        inputs['capex_solar'] = np.where(d['solar_pct'] > 0, base['capex_solar'], 0)
+        inputs['capex_dryers'] = np.where(d['dryer_pct'] > 0, base['capex_dryers'], 0)
+        inputs['capex_chp'] = np.where(d['chp_pct'] > 0, base['capex_chp'], 0)
+        inputs['capex_ccs'] = np.where(d['ccs_scope'] >= 0, base['capex_ccs'], 0)
+        results = calculate_v2_batch(inputs)
+
+        keep = pareto_front(results['final_ci'], results['total_cost'])
+        front_index = np.r_[front_index, index[keep]]
+        front_ci = np.r_[front_ci, results['final_ci'][keep]]
+        front_cost = np.r_[front_cost, results['total_cost'][keep]]
+        keep = pareto_front(front_ci, front_cost)
+        front_index, front_ci, front_cost = front_index[keep], front_ci[keep], front_cost[keep]
+
+    d = _decisions(front_index, levels)
+    categories = load_categories()
+    names = lambda key: [list(categories[key])[c] if c >= 0 else NO_OPTION for c in d[key]]
+    return {
+        'solar_pct': d['solar_pct'],
+        'dryer_pct': d['dryer_pct'],
+        'chp_pct': d['chp_pct'],
+        'chp_fuel': names('chp_fuel'),
+        'ccs_scope': names('ccs_scope'),
+        'sequestration_type': names('sequestration_type'),
+        'final_ci': front_ci,
+        'net_cost': front_cost,
+        'combinations': total,
+    }
@@ -0,0 +1,30 @@
+import csv
+import os
+from functools import lru_cache
+
+PLANTS_PATH = os.environ.get(
+    'CI_MODEL_PLANTS', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'plants.csv')
+)
+
+# Registry columns that describe the plant itself rather than a strategy choice
+PLANT_KEYS = ['capacity_mgy', 'baseline_ci', 'cms_charge']
+
+
+@lru_cache(maxsize=8)
+def _read_plants(path, mtime):
+    plants = {}
+    with open(path, newline='') as f:
+        for row in csv.DictReader(f):
+            name = row.pop('name').strip()
+            plants[name] = {'name': name, **{k: float(v) for k, v in row.items() if v not in ('', None)}}
+    return plants
+
+
+def load_plants(path=None):
+    # Read on first use and cached until the file changes on disk
+    path = path or PLANTS_PATH
+    return _read_plants(path, os.path.getmtime(path))
+
+
+def plant_label(plant):
+    return f"{plant['name']} ({plant['capacity_mgy']:g} MGY)"
@@ -0,0 +1,72 @@
+import json
+import os
+import re
+from functools import lru_cache
+
+PROFILES_PATH = os.environ.get(
+    'CI_MODEL_PROFILES', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'profiles')
+)
+INDEX = 'index.json'
+PROFILE_KINDS = ['load', 'solar', 'grid_ci']
+
+
+def _mtime(path):
+    return os.path.getmtime(path) if os.path.exists(path) else None
+
+
+@lru_cache(maxsize=8)
+def _read_index(path, mtime):
+    if mtime is None:
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def load_index(root=None):
+    path = os.path.join(root or PROFILES_PATH, INDEX)
+    return _read_index(path, _mtime(path))
+
+
+@lru_cache(maxsize=None)
+def _open(path, mtime):
+    # Read-only memory map: every process maps the same pages instead of holding a copy
+    import numpy as np
+    return np.load(path, mmap_mode='r')
+
+
+def get_profile(plant, kind, root=None):
+    root = root or PROFILES_PATH
+    entry = load_index(root).get(f'{plant}/{kind}')
+    if entry is None:
+        return None
+    path = os.path.join(root, entry['file'])
+    return _open(path, _mtime(path))
+
+
+def list_profiles(root=None):
+    return load_index(root)
+
+
+def import_csv(csv_path, plant, kind, root=None):
+    # One-time conversion of an 8760-row CSV into the binary store
+    import numpy as np
+    from ci_model.hourly import read_profile
+    root = root or PROFILES_PATH
+    os.makedirs(root, exist_ok=True)
+    profile = read_profile(csv_path)
+    name = re.sub(r'[^A-Za-z0-9_.-]+', '_', f'{plant}__{kind}') + '.npy'
+    tmp = os.path.join(root, name + '.tmp')
+    with open(tmp, 'wb') as f:
+        np.save(f, profile)
+    os.replace(tmp, os.path.join(root, name))
+
+    index = dict(load_index(root))
+    index[f'{plant}/{kind}'] = {
+        'plant': plant, 'kind': kind, 'file': name, 'hours': len(profile),
+        'dtype': str(profile.dtype), 'source': os.path.basename(str(csv_path)),
+    }
+    index_path = os.path.join(root, INDEX)
+    with open(index_path + '.tmp', 'w') as f:
+        json.dump(index, f, indent=2)
+    os.replace(index_path + '.tmp', index_path)
+    return index[f'{plant}/{kind}']
@@ -0,0 +1,160 @@
+# Compact typed scenarios and results. A record holds one scenario or result in fixed float
+# slots (no per-instance dict); batches use a NumPy structured array with the same fields.
+# Both convert to and from the legacy forms: the v3 input/output dicts of calculate_ci_model
+# and the positional 9-tuple of calculate_ci_model_v2. Pure Python until a dtype is asked for.
+
+from ci_model.core import INPUT_KEYS, OUTPUT_KEYS, V2_OUTPUTS
+
+# Field name -> unit. Order is the slot / column order.
+SCENARIO_UNITS = {
+    'capacity_mgy': 'Mgal/yr',
+    'solar_pct': '%', 'solar_ci': 'gCO2e/MJ', 'solar_cost_per_kw': '$/kW', 'solar_kw': 'kW',
+    'dryer_pct': '%', 'dryer_ci': 'gCO2e/MJ', 'dryer_cost_per_unit': '$/unit', 'dryer_units': 'units',
+    'chp_pct': '%', 'chp_ci': 'gCO2e/MJ', 'chp_cost_per_mmbtu': '$/MMBtu', 'chp_mmbtu': 'MMBtu',
+    'boiler_pct': '%', 'boiler_ci': 'gCO2e/MJ', 'boiler_cost_per_mmbtu': '$/MMBtu', 'boiler_mmbtu': 'MMBtu',
+    'ccs_ci': 'gCO2e/MJ', 'ccs_capex': '$',
+    'opex_pct': '%', 'lcfs_price': '$/t', 'q45_price': '$/t',
+    'monthly_demand_charge': '$/month', 'demand_reduction_pct': '%',
+}
+
+RESULT_UNITS = {
+    'final_ci': 'gCO2e/MJ',
+    'tons_co2_avoided': 't/yr',
+    'lcfs_revenue': '$/yr',
+    'q45_revenue': '$/yr',
+    'total_revenue': '$/yr',
+    'total_capex': '$',
+    'total_opex': '$/yr',
+    'demand_savings': '$/yr',
+    'total_cost': '$',
+    'payback_years': 'yr',
+    'cost_per_ton': '$/t',
+}
+
+# calculate_ci_model output key -> result field
+V3_RESULT_FIELDS = dict(zip(OUTPUT_KEYS, RESULT_UNITS))
+
+
+class _Record:
+    # Fixed float slots named by UNITS; positional or keyword construction
+    __slots__ = ()
+    UNITS = {}
+
+    def __init__(self, *args, **kwargs):
+        fields = list(self.UNITS)
+        if len(args) > len(fields):
+            raise TypeError(f"{type(self).__name__} takes at most {len(fields)} values, got {len(args)}")
+        values = dict(zip(fields, args))
+        for k, v in kwargs.items():
+            if k not in self.UNITS:
+                raise TypeError(f"{type(self).__name__} has no field {k!r}")
+            if k in values:
+                raise TypeError(f"{type(self).__name__} got multiple values for {k!r}")
+            values[k] = v
+        missing = [k for k in fields if k not in values]
+        if missing:
+            raise TypeError(f"{type(self).__name__} missing fields: {', '.join(missing)}")
+        for k in fields:
+            setattr(self, k, float(values[k]))
+
+    def __iter__(self):
+        return (getattr(self, k) for k in self.UNITS)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and tuple(self) == tuple(other)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(f'{k}={getattr(self, k)!r}' for k in self.UNITS)})"
+
+    def as_dict(self):
+        return dict(zip(self.UNITS, self))
+
+    @classmethod
+    def dtype(cls, precision='f8'):
+        # Structured dtype with one float field per slot; 'f4' halves it again where
+        # single precision is enough (e.g. filtering millions of Monte Carlo results)
+        import numpy as np
+        return np.dtype([(k, precision) for k in cls.UNITS])
+
+    @classmethod
+    def empty(cls, n, precision='f8'):
+        import numpy as np
+        return np.zeros(n, dtype=cls.dtype(precision))
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(*(row[k] for k in cls.UNITS))
+
+
+class Scenario(_Record):
+    __slots__ = tuple(SCENARIO_UNITS)
+    UNITS = SCENARIO_UNITS
+
+    @classmethod
+    def from_dict(cls, inputs):
+        # Legacy calculate_ci_model input dict; extra keys are ignored
+        return cls(**{k: inputs[k] for k in INPUT_KEYS})
+
+    def to_dict(self):
+        return self.as_dict()
+
+    @classmethod
+    def to_array(cls, inputs, precision='f8'):
+        # Column dict, DataFrame or list of Scenario -> structured array
+        return _to_array(cls, inputs, {k: k for k in cls.UNITS}, precision)
+
+
+class Result(_Record):
+    __slots__ = tuple(RESULT_UNITS)
+    UNITS = RESULT_UNITS
+
+    @classmethod
+    def from_dict(cls, outputs):
+        # Legacy calculate_ci_model output dict ('CI', 'Tons CO2', ...)
+        return cls(**{field: outputs[key] for key, field in V3_RESULT_FIELDS.items()})
+
+    def to_dict(self):
+        return {key: getattr(self, field) for key, field in V3_RESULT_FIELDS.items()}
+
+    @classmethod
+    def from_tuple(cls, values):
+        # Legacy calculate_ci_model_v2 9-tuple; v2 has no demand savings
+        values = dict(zip(V2_OUTPUTS, values))
+        return cls(**values, total_revenue=values['lcfs_revenue'] + values['q45_revenue'], demand_savings=0.0)
+
+    def to_tuple(self):
+        return tuple(getattr(self, k) for k in V2_OUTPUTS)
+
+    @classmethod
+    def to_array(cls, outputs, precision='f8'):
+        # Batch outputs keyed like calculate_ci_model_batch or calculate_v2_batch, a DataFrame
+        # of either, or a list of Result -> structured array
+        if not isinstance(outputs, list) and 'CI' in outputs:
+            return _to_array(cls, outputs, {field: key for key, field in V3_RESULT_FIELDS.items()}, precision)
+        if not isinstance(outputs, list) and 'total_revenue' not in outputs:
+            outputs = {**{k: outputs[k] for k in V2_OUTPUTS}, 'demand_savings': 0.0,
+                       'total_revenue': outputs['lcfs_revenue'] + outputs['q45_revenue']}
+        return _to_array(cls, outputs, {k: k for k in cls.UNITS}, precision)
+
+    @staticmethod
+    def to_columns(array, legacy='v3'):
+        # Structured array -> column dict in the legacy key set ('v3' output keys or 'v2' names)
+        if legacy == 'v3':
+            return {key: array[field] for key, field in V3_RESULT_FIELDS.items()}
+        if legacy == 'v2':
+            return {k: array[k] for k in V2_OUTPUTS}
+        raise ValueError(f"legacy must be 'v3' or 'v2', got {legacy!r}")
+
+
+def _to_array(cls, data, source, precision):
+    import numpy as np
+    if isinstance(data, list):
+        array = cls.empty(len(data), precision)
+        for k, column in zip(cls.UNITS, zip(*data)):
+            array[k] = column
+        return array
+    columns = np.broadcast_arrays(*[np.asarray(data[source[k]], dtype=float) for k in cls.UNITS])
+    array = cls.empty(columns[0].size, precision)
+    for k, column in zip(cls.UNITS, columns):
+        array[k] = column.ravel()
+    return array
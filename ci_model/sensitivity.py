@@ -0,0 +1,55 @@
+import numpy as np
+
+from ci_model.batch import DASHBOARD_FLAGS, calculate_dashboard_batch
+
+TORNADO_OUTPUTS = ['final_ci', 'payback', 'cost_per_ton']
+
+# Inputs entered as percentages; their bounds are clipped to 0-100
+PERCENT_KEYS = ['solar_offset', 'tax_rate']
+
+
+def default_bounds(base, swing_pct=20):
+    bounds = {}
+    for key, value in base.items():
+        if key in DASHBOARD_FLAGS:
+            bounds[key] = (0.0, 1.0)
+            continue
+        low, high = sorted([value * (1 - swing_pct / 100), value * (1 + swing_pct / 100)])
+        if key.endswith('_pct') or key in PERCENT_KEYS:
+            low, high = max(low, 0.0), min(high, 100.0)
+        bounds[key] = (float(low), float(high))
+    return bounds
+
+
+def tornado(base, bounds, outputs=TORNADO_OUTPUTS, model=calculate_dashboard_batch):
+    # Row 2i holds input i at its low bound, row 2i + 1 at its high bound; everything
+    # else stays at the base value, so all 2N scenarios run in a single batched call
+    keys = list(bounds)
+    n = len(keys)
+    columns = {k: np.full(2 * n, float(v)) for k, v in base.items()}
+    for i, key in enumerate(keys):
+        columns[key][2 * i], columns[key][2 * i + 1] = bounds[key]
+    results = model(columns)
+    base_results = model(base)
+
+    ranked = {}
+    for output in outputs:
+        low = results[output][0::2]
+        high = results[output][1::2]
+        with np.errstate(invalid='ignore'):
+            swing = np.abs(high - low)
+        swing[np.isnan(swing)] = 0.0
+        order = np.argsort(-swing, kind='stable')
+        rows = [
+            {
+                'input': keys[i],
+                'low': bounds[keys[i]][0],
+                'high': bounds[keys[i]][1],
+                'low_value': float(low[i]),
+                'high_value': float(high[i]),
+                'swing': float(swing[i]),
+            }
+            for i in order
+        ]
+        ranked[output] = {'base': float(base_results[output]), 'rows': rows}
+    return ranked
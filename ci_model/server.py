@@ -0,0 +1,377 @@
+# Local HTTP service over the batch models for other internal tools (planning spreadsheets,
+# the scheduler). Stdlib asyncio only; binds to 127.0.0.1 unless told otherwise.
+#
+#   GET  /health                    models served
+#   GET  /metrics                   request counts, latency percentiles, batch sizes, throughput
+#   POST /models/<model>/evaluate   one scenario as a JSON object -> JSON object of outputs
+#   POST /models/<model>/batch      JSON {"scenarios": [...]} or {"columns": {...}} -> JSON columns,
+#                                   or an Arrow IPC stream (application/vnd.apache.arrow.stream)
+#
+# Concurrent /evaluate requests are coalesced into micro-batches and evaluated in one
+# vectorized call. Non-finite outputs (e.g. payback with no revenue) are returned as null.
+import asyncio
+import collections
+import json
+import math
+import sys
+import time
+
+import numpy as np
+
+from ci_model.batch import DASHBOARD_DEFAULTS, MODELS, V2_NUMERIC_INPUTS
+from ci_model.categories import CATEGORY_INPUTS
+from ci_model.core import INPUT_KEYS
+
+ARROW_TYPE = 'application/vnd.apache.arrow.stream'
+JSON_TYPE = 'application/json'
+# Inputs each model reads; other keys in a request are ignored
+NUMERIC_INPUTS = {'v2': V2_NUMERIC_INPUTS, 'v3': INPUT_KEYS, 'dashboard': list(DASHBOARD_DEFAULTS)}
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           413: 'Payload Too Large', 415: 'Unsupported Media Type', 500: 'Internal Server Error'}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def records_to_columns(model, records):
+    # Dashboard inputs are optional (defaults fill the gaps); other models need every key
+    keys = set().union(*records)
+    defaults = DASHBOARD_DEFAULTS if model == 'dashboard' else {}
+    columns = {}
+    for k in keys:
+        try:
+            columns[k] = [r[k] if k in r else defaults[k] for r in records]
+        except KeyError:
+            raise KeyError(k) from None
+    return check_columns(model, columns)
+
+
+def check_columns(model, columns):
+    # null and strings would otherwise reach the model as NaN and come back as null outputs;
+    # v2 options may be given by name or integer code. Flags may be true/false.
+    for k, values in columns.items():
+        categorical = model == 'v2' and k in CATEGORY_INPUTS
+        if not categorical and k not in NUMERIC_INPUTS[model]:
+            continue
+        for v in values if isinstance(values, list) else [values]:
+            if categorical:
+                if not isinstance(v, (str, int)) or isinstance(v, bool):
+                    raise ValueError(f"{k!r} must be an option name or code, got {json.dumps(v)}")
+            elif not isinstance(v, (int, float)) or v != v:
+                raise ValueError(f"{k!r} must be a number, got {json.dumps(v)}")
+    return columns
+
+
+def evaluate_columns(model, columns, n):
+    results = MODELS[model](columns)
+    return {k: np.broadcast_to(v, (n,)) for k, v in results.items()}
+
+
+def _json_value(x):
+    x = float(x)
+    return x if math.isfinite(x) else None
+
+
+def _input_error(exc):
+    if isinstance(exc, KeyError):
+        return HTTPError(400, f"missing input {exc.args[0]!r}")
+    return HTTPError(400, f"invalid input: {exc}")
+
+
+class Metrics:
+    # Lifetime counters plus the latency of the most recent requests per endpoint
+    def __init__(self, window=10_000):
+        self.started = time.time()
+        self.requests = collections.Counter()
+        self.errors = collections.Counter()
+        self.latency = collections.defaultdict(lambda: collections.deque(maxlen=window))
+        self.scenarios = 0
+        self.batches = 0
+        self.batched_requests = 0
+        self.max_batch = 0
+
+    def observe(self, endpoint, seconds, status):
+        self.requests[endpoint] += 1
+        if status >= 400:
+            self.errors[endpoint] += 1
+        self.latency[endpoint].append(seconds)
+
+    def batch(self, size):
+        self.batches += 1
+        self.batched_requests += size
+        self.max_batch = max(self.max_batch, size)
+
+    def snapshot(self):
+        uptime = time.time() - self.started
+        latency = {}
+        for endpoint, samples in self.latency.items():
+            ms = np.array(samples) * 1000
+            latency[endpoint] = {'p50_ms': float(np.percentile(ms, 50)), 'p99_ms': float(np.percentile(ms, 99))}
+        return {
+            'uptime_s': uptime,
+            'requests': dict(self.requests),
+            'errors': dict(self.errors),
+            'latency': latency,
+            'scenarios': self.scenarios,
+            'scenarios_per_s': self.scenarios / uptime if uptime else 0.0,
+            'micro_batches': {
+                'count': self.batches,
+                'mean_size': self.batched_requests / self.batches if self.batches else 0.0,
+                'max_size': self.max_batch,
+            },
+        }
+
+
+class MicroBatcher:
+    # Collects single-scenario requests for up to max_wait_ms (or max_batch requests) and
+    # evaluates them in one call on a worker thread; NumPy releases the GIL meanwhile
+    def __init__(self, model, max_batch=256, max_wait_ms=2.0, metrics=None):
+        self.model = model
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.metrics = metrics
+        self.queue = asyncio.Queue()
+        self.task = None
+
+    async def submit(self, scenario):
+        if self.task is None:
+            self.task = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((scenario, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(pending) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    pending.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            pending = [(s, f) for s, f in pending if not f.cancelled()]
+            if not pending:
+                continue
+            if self.metrics:
+                self.metrics.batch(len(pending))
+            try:
+                results = await loop.run_in_executor(None, self._evaluate, [s for s, _ in pending])
+            except Exception as exc:
+                # An unexpected model error fails this batch only; the loop keeps serving
+                results = [exc] * len(pending)
+            for (_, future), result in zip(pending, results):
+                if future.cancelled():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    def _evaluate(self, scenarios):
+        # One vectorized call; if any scenario is bad, fall back to one call each so
+        # only the offending requests fail
+        try:
+            columns = evaluate_columns(self.model, records_to_columns(self.model, scenarios), len(scenarios))
+            return [{k: _json_value(v[i]) for k, v in columns.items()} for i in range(len(scenarios))]
+        except (KeyError, ValueError, TypeError) as exc:
+            if len(scenarios) == 1:
+                return [_input_error(exc)]
+            return [self._evaluate([s])[0] for s in scenarios]
+
+    async def close(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+
+
+class ModelService:
+    def __init__(self, host='127.0.0.1', port=8765, max_batch=256, max_wait_ms=2.0, max_body_mb=256):
+        self.host = host
+        self.port = port
+        self.max_body = int(max_body_mb * 1024 * 1024)
+        self.metrics = Metrics()
+        self.batchers = {model: MicroBatcher(model, max_batch, max_wait_ms, self.metrics) for model in MODELS}
+        self.server = None
+
+    async def start(self):
+        # Port 0 picks a free port; the bound port is returned
+        self.server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def serve_forever(self):
+        if self.server is None:
+            await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def close(self):
+        for batcher in self.batchers.values():
+            await batcher.close()
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        # HTTP/1.1 with keep-alive; one request at a time per connection
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, version = request_line.decode('latin-1').split()
+                headers = {}
+                while (line := await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length', 0))
+
+                start = time.perf_counter()
+                endpoint = target.split('?')[0]
+                if length > self.max_body:
+                    status, content_type, body = self._error(HTTPError(413, "request body too large"))
+                    keep_alive = False
+                else:
+                    payload = await reader.readexactly(length) if length else b''
+                    status, content_type, body = await self._dispatch(method, endpoint, headers, payload)
+                    keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+                self.metrics.observe(endpoint, time.perf_counter() - start, status)
+
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS[status]}\r\nContent-Type: {content_type}\r\n"
+                    f"Content-Length: {len(body)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+                    .encode('latin-1') + body
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    def _error(self, exc):
+        return exc.status, JSON_TYPE, json.dumps({'error': str(exc)}).encode()
+
+    async def _dispatch(self, method, path, headers, payload):
+        try:
+            parts = path.strip('/').split('/')
+            if parts == ['health']:
+                return 200, JSON_TYPE, json.dumps({'status': 'ok', 'models': sorted(MODELS)}).encode()
+            if parts == ['metrics']:
+                return 200, JSON_TYPE, json.dumps(self.metrics.snapshot()).encode()
+            if len(parts) != 3 or parts[0] != 'models' or parts[2] not in ('evaluate', 'batch'):
+                raise HTTPError(404, f"no route for {path}")
+            model, action = parts[1], parts[2]
+            if model not in MODELS:
+                raise HTTPError(404, f"unknown model {model!r}; expected one of {sorted(MODELS)}")
+            if method != 'POST':
+                raise HTTPError(405, f"{path} only accepts POST")
+            if action == 'evaluate':
+                return await self._evaluate(model, payload)
+            if headers.get('content-type', JSON_TYPE).split(';')[0].strip() == ARROW_TYPE:
+                return await self._batch_arrow(model, payload)
+            return await self._batch_json(model, payload)
+        except HTTPError as exc:
+            return self._error(exc)
+        except Exception as exc:
+            return self._error(HTTPError(500, f"{type(exc).__name__}: {exc}"))
+
+    def _json(self, payload):
+        try:
+            return json.loads(payload)
+        except ValueError as exc:
+            raise HTTPError(400, f"invalid JSON: {exc}") from None
+
+    async def _evaluate(self, model, payload):
+        scenario = self._json(payload)
+        if not isinstance(scenario, dict):
+            raise HTTPError(400, "expected a JSON object with one scenario")
+        result = await self.batchers[model].submit(scenario)
+        self.metrics.scenarios += 1
+        return 200, JSON_TYPE, json.dumps(result).encode()
+
+    async def _batch_json(self, model, payload):
+        data = self._json(payload)
+        if isinstance(data, list):
+            data = {'scenarios': data}
+        if not isinstance(data, dict) or not ('scenarios' in data or 'columns' in data):
+            raise HTTPError(400, 'expected {"scenarios": [...]} or {"columns": {...}}')
+
+        def evaluate():
+            try:
+                if 'scenarios' in data:
+                    n = len(data['scenarios'])
+                    columns = records_to_columns(model, data['scenarios']) if n else {}
+                else:
+                    columns = data['columns']
+                    if not isinstance(columns, dict):
+                        raise ValueError('"columns" must be an object of input names')
+                    check_columns(model, columns)
+                    n = max((len(v) for v in columns.values() if isinstance(v, list)), default=1)
+                return n, evaluate_columns(model, columns, n) if n else {}
+            except (KeyError, ValueError, TypeError) as exc:
+                raise _input_error(exc) from None
+
+        n, results = await asyncio.get_running_loop().run_in_executor(None, evaluate)
+        self.metrics.scenarios += n
+        body = {'count': n, 'results': {k: [_json_value(x) for x in v] for k, v in results.items()}}
+        return 200, JSON_TYPE, json.dumps(body).encode()
+
+    async def _batch_arrow(self, model, payload):
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise HTTPError(415, "Arrow requests need pyarrow installed on the server") from None
+
+        def evaluate():
+            from ci_model.cli import evaluate_frame
+            try:
+                df = pa.ipc.open_stream(payload).read_all().to_pandas()
+            except pa.ArrowInvalid as exc:
+                raise HTTPError(400, f"invalid Arrow IPC stream: {exc}") from None
+            inputs = NUMERIC_INPUTS[model] + (CATEGORY_INPUTS if model == 'v2' else [])
+            nulls = [name for name in df.columns if name in inputs and df[name].isna().any()]
+            if nulls:
+                raise HTTPError(400, f"invalid input: {nulls[0]!r} has null values")
+            try:
+                out = evaluate_frame(model, df)
+            except (KeyError, ValueError, TypeError) as exc:
+                raise _input_error(exc) from None
+            table = pa.Table.from_pandas(out, preserve_index=False)
+            sink = pa.BufferOutputStream()
+            with pa.ipc.new_stream(sink, table.schema) as stream_writer:
+                stream_writer.write_table(table)
+            return len(df), sink.getvalue().to_pybytes()
+
+        n, body = await asyncio.get_running_loop().run_in_executor(None, evaluate)
+        self.metrics.scenarios += n
+        return 200, ARROW_TYPE, body
+
+
+def main(args):
+    service = ModelService(args.host, args.port, args.max_batch, args.max_wait_ms, args.max_body_mb)
+
+    async def serve():
+        port = await service.start()
+        print(f"Serving {', '.join(sorted(MODELS))} on http://{args.host}:{port} "
+              f"(micro-batches of up to {args.max_batch} requests / {args.max_wait_ms} ms)", file=sys.stderr)
+        try:
+            await service.serve_forever()
+        finally:
+            await service.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,133 @@
+# Variance-based (Sobol') global sensitivity. All inputs vary together over their bounds, and
+# each input's share of the output variance is estimated alone (first order) and including its
+# interactions (total order) from a quasi-random Saltelli design.
+import numpy as np
+from scipy.stats import qmc
+
+from ci_model.batch import DASHBOARD_FLAGS, calculate_dashboard_batch
+
+SOBOL_OUTPUTS = ['payback', 'net_cost', 'final_ci']
+
+
+def saltelli_design(bounds, n, seed=0):
+    # Scrambled Sobol' points in 2D dimensions split into the A and B matrices (n rows each,
+    # n rounded up to a power of two). Inputs are uniform over their bounds; on/off flags
+    # are on for the upper half of [0, 1).
+    keys = list(bounds)
+    d = len(keys)
+    m = max(int(np.ceil(np.log2(n))), 1)
+    u = qmc.Sobol(2 * d, scramble=True, seed=seed).random_base2(m)
+    low = np.array([bounds[k][0] for k in keys], dtype=float)
+    high = np.array([bounds[k][1] for k in keys], dtype=float)
+    flags = np.array([k in DASHBOARD_FLAGS for k in keys])
+    scaled = []
+    for half in (u[:, :d], u[:, d:]):
+        x = low + (high - low) * half
+        x[:, flags] = half[:, flags] >= 0.5
+        scaled.append(x)
+    return keys, scaled[0], scaled[1]
+
+
+def _design_rows(a, b, start, stop):
+    # Rows [start, stop) of the stacked design [A; B; AB_1; ...; AB_d], where AB_i is A with
+    # column i taken from B, built without materializing the (d + 2) * n design
+    n = len(a)
+    parts = []
+    for block in range(start // n, (stop - 1) // n + 1):
+        lo, hi = max(start - block * n, 0), min(stop - block * n, n)
+        if block < 2:
+            parts.append((a, b)[block][lo:hi])
+        else:
+            ab = a[lo:hi].copy()
+            ab[:, block - 2] = b[lo:hi, block - 2]
+            parts.append(ab)
+    return np.concatenate(parts)
+
+
+def _evaluate(base, keys, a, b, outputs, model, batch_size, progress=None):
+    # Every design row, in batches of at most batch_size scenarios; only the outputs are kept
+    runs = (len(keys) + 2) * len(a)
+    values = {o: np.empty(runs) for o in outputs}
+    for start in range(0, runs, batch_size):
+        stop = min(start + batch_size, runs)
+        chunk = _design_rows(a, b, start, stop)
+        inputs = dict(base)
+        inputs.update({k: chunk[:, i] for i, k in enumerate(keys)})
+        results = model(inputs)
+        for o in outputs:
+            values[o][start:stop] = np.broadcast_to(results[o], (stop - start,))
+        del chunk, inputs, results
+        if progress is not None:
+            progress(stop, runs)
+    return values
+
+
+def _indices(f_a, f_b, f_ab):
+    # Saltelli (2010) first-order and Jansen (1999) total-order estimators; the leading axes
+    # of the arrays are carried through, so bootstrap replicates are evaluated together. An
+    # output that does not vary has nothing to apportion: its indices are 0, not 0 / 0.
+    var = np.var(np.concatenate([f_a, f_b], axis=-1), axis=-1)[..., None]
+    first = np.mean(f_b[..., None, :] * (f_ab - f_a[..., None, :]), axis=-1)
+    total = 0.5 * np.mean((f_a[..., None, :] - f_ab) ** 2, axis=-1)
+    varies = np.broadcast_to(var > 0, first.shape)
+    first = np.divide(first, var, out=np.zeros_like(first), where=varies)
+    total = np.divide(total, var, out=np.zeros_like(total), where=varies)
+    return first, total
+
+
+def sobol_indices(base, bounds, n=2 ** 14, outputs=SOBOL_OUTPUTS, seed=0, bootstrap=200, confidence=0.95,
+                  batch_size=2 ** 18, model=calculate_dashboard_batch, progress=None):
+    # First- and total-order indices from n * (d + 2) model runs: A, B and one matrix per input
+    # with that column taken from B. The runs are generated and evaluated batch by batch, so
+    # memory grows with batch_size and the kept outputs, not with the design; progress(done,
+    # total) is called after each batch. Rows with a non-finite output in any matrix are dropped;
+    # with none left the indices and intervals are NaN. 'constant' marks an output that does
+    # not vary over the bounds (indices 0).
+    keys, a, b = saltelli_design(bounds, n, seed)
+    n, d = a.shape
+    values = _evaluate(base, keys, a, b, outputs, model, batch_size, progress)
+
+    rng = np.random.default_rng(seed)
+    alpha = (1 - confidence) / 2
+    results = {}
+    for o in outputs:
+        f = values[o].reshape(d + 2, n)
+        finite = np.isfinite(f).all(axis=0)
+        f = f[:, finite]
+        f_a, f_b, f_ab = f[0], f[1], f[2:]
+        if not f.shape[1]:
+            results[o] = {
+                'inputs': keys,
+                'first': np.full(d, np.nan),
+                'first_ci': np.full((2, d), np.nan),
+                'total': np.full(d, np.nan),
+                'total_ci': np.full((2, d), np.nan),
+                'variance': np.nan,
+                'constant': False,
+                'dropped': n,
+            }
+            continue
+        first, total = _indices(f_a, f_b, f_ab)
+        variance = float(np.var(np.concatenate([f_a, f_b])))
+
+        # Resample rows with replacement; replicates are processed in blocks to bound memory
+        first_boot, total_boot = [], []
+        block = max(1, 2 ** 22 // max(f.size, 1))
+        for start in range(0, bootstrap, block):
+            idx = rng.integers(0, f.shape[1], (min(block, bootstrap - start), f.shape[1]))
+            s1, st = _indices(f_a[idx], f_b[idx], np.moveaxis(f_ab[:, idx], 0, 1))
+            first_boot.append(s1)
+            total_boot.append(st)
+        first_boot, total_boot = np.concatenate(first_boot), np.concatenate(total_boot)
+
+        results[o] = {
+            'inputs': keys,
+            'first': first,
+            'first_ci': np.quantile(first_boot, [alpha, 1 - alpha], axis=0),
+            'total': total,
+            'total_ci': np.quantile(total_boot, [alpha, 1 - alpha], axis=0),
+            'variance': variance,
+            'constant': variance == 0,
+            'dropped': int((~finite).sum()),
+        }
+    return {'evaluations': (d + 2) * n, 'samples': n, 'outputs': results}
@@ -0,0 +1,207 @@
+# Local SQLite store of named scenarios and their results.
+#
+# Every call to save/save_batch is one row in `saves` (name, model, creation time and the key
+# order of the vectors) and one row per scenario in `scenarios`. Scenario rows hold the plant
+# and the indexed outputs (final CI, payback) as real columns and the input and output vectors
+# as float64 blobs. Inputs that are the same for every scenario of a save are kept once on the
+# save, so a million-row batch run that varies a handful of inputs stores only those per row.
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+STORE_PATH = os.environ.get(
+    'CI_MODEL_STORE', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'scenarios.db')
+)
+
+# Indexed columns and the output key each model uses for them
+INDEXED_OUTPUTS = {
+    'final_ci': ['final_ci', 'CI'],
+    'payback': ['payback', 'Payback', 'payback_years'],
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS saves (
+    id INTEGER PRIMARY KEY,
+    name TEXT,
+    model TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    input_keys TEXT NOT NULL,
+    constants TEXT NOT NULL,
+    output_keys TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS scenarios (
+    id INTEGER PRIMARY KEY,
+    save_id INTEGER NOT NULL REFERENCES saves(id),
+    plant TEXT,
+    final_ci REAL,
+    payback REAL,
+    inputs BLOB NOT NULL,
+    results BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_saves_created ON saves (created_at);
+CREATE INDEX IF NOT EXISTS idx_saves_name ON saves (name);
+CREATE INDEX IF NOT EXISTS idx_scenarios_plant ON scenarios (plant, final_ci, payback);
+CREATE INDEX IF NOT EXISTS idx_scenarios_ci ON scenarios (final_ci, payback);
+CREATE INDEX IF NOT EXISTS idx_scenarios_payback ON scenarios (payback);
+-- Newest first within a plant, without a sort
+CREATE INDEX IF NOT EXISTS idx_scenarios_plant_id ON scenarios (plant, id);
+CREATE INDEX IF NOT EXISTS idx_scenarios_save ON scenarios (save_id);
+"""
+
+
+# Up to this many matches a query finds them through an output index and sorts them; with
+# more it walks the scenarios newest first and stops at the limit
+SORT_MATCHES = 2000
+
+
+def _indexed_key(keys, column):
+    return next((k for k in INDEXED_OUTPUTS[column] if k in keys), None)
+
+
+def _nullable(values):
+    # NaN (no such output for this model) is stored as NULL
+    return [None if v != v else v for v in values.tolist()]
+
+
+class ScenarioStore:
+    def __init__(self, path=None):
+        self.path = path or STORE_PATH
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._connect() as db:
+            db.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        # One short-lived connection per call keeps the store safe to share between
+        # Streamlit sessions (threads) and worker processes
+        db = sqlite3.connect(self.path, timeout=30)
+        try:
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+            # Room for the index pages touched by a bulk insert (negative = KiB)
+            db.execute('PRAGMA cache_size=-262144')
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def save(self, name, plant, inputs, results, model='dashboard'):
+        # One scenario from the UI; returns its id
+        return self.save_batch({k: [v] for k, v in inputs.items()}, {k: [v] for k, v in results.items()},
+                               model=model, plant=plant, name=name)[0]
+
+    def save_batch(self, inputs, results, model='dashboard', plant=None, name=None, chunk_size=100_000):
+        # inputs/results: dicts of equal-length columns (or DataFrames); plant is a scalar for every
+        # row or a column. Inputs must be numeric. One transaction; returns the new scenario ids.
+        import numpy as np
+        output_keys = list(results)
+        y = np.column_stack([np.asarray(results[k], dtype=np.float64) for k in output_keys])
+        n = len(y)
+        columns = {k: np.broadcast_to(np.asarray(inputs[k], dtype=np.float64), (n,)) for k in inputs}
+        constants = {k: float(v[0]) for k, v in columns.items() if n and (v == v[0]).all()}
+        input_keys = [k for k in columns if k not in constants]
+        x = np.column_stack([columns[k] for k in input_keys]) if input_keys else np.empty((n, 0))
+        plants = np.broadcast_to(np.asarray(plant, dtype=object), (n,))
+        indexed = {}
+        for column in INDEXED_OUTPUTS:
+            key = _indexed_key(output_keys, column)
+            indexed[column] = y[:, output_keys.index(key)] if key else np.full(n, np.nan)
+        xw, yw = 8 * x.shape[1], 8 * y.shape[1]
+
+        with self._connect() as db:
+            save_id = db.execute(
+                'INSERT INTO saves (name, model, created_at, input_keys, constants, output_keys) VALUES (?, ?, ?, ?, ?, ?)',
+                (name, model, time.time(), json.dumps(input_keys), json.dumps(constants), json.dumps(output_keys)),
+            ).lastrowid
+            # Rows written inside this transaction get consecutive ids after the current maximum
+            first_id = db.execute('SELECT COALESCE(MAX(id), 0) + 1 FROM scenarios').fetchone()[0]
+            for start in range(0, n, chunk_size):
+                stop = min(start + chunk_size, n)
+                xb, yb = x[start:stop].tobytes(), y[start:stop].tobytes()
+                rows = zip(
+                    [save_id] * (stop - start), plants[start:stop].tolist(),
+                    _nullable(indexed['final_ci'][start:stop]), _nullable(indexed['payback'][start:stop]),
+                    (xb[i * xw:(i + 1) * xw] for i in range(stop - start)),
+                    (yb[i * yw:(i + 1) * yw] for i in range(stop - start)),
+                )
+                db.executemany(
+                    'INSERT INTO scenarios (save_id, plant, final_ci, payback, inputs, results) VALUES (?, ?, ?, ?, ?, ?)',
+                    rows,
+                )
+            if n >= chunk_size:
+                # Sampled planner statistics, so range filters pick the selective index
+                db.execute('PRAGMA analysis_limit=1000')
+                db.execute('ANALYZE scenarios')
+        return list(range(first_id, first_id + n))
+
+    def query(self, plant=None, max_ci=None, max_payback=None, since=None, name=None, limit=1000):
+        # Summary rows, newest first. SQLite cannot tell how many rows a range filter keeps, so
+        # the plan is picked here from a capped count through the index that covers the output
+        # filters: few matches are read through that index and sorted; with many, a walk newest
+        # first meets `limit` of them early and stops.
+        outputs = [(sql, value) for sql, value in [('s.plant = ?', plant), ('s.final_ci < ?', max_ci),
+                                                   ('s.payback < ?', max_payback)] if value is not None]
+        saves = [(sql, value) for sql, value in [('v.created_at >= ?', since), ('v.name = ?', name)]
+                 if value is not None]
+        index = ('idx_scenarios_plant' if plant is not None else 'idx_scenarios_ci' if max_ci is not None
+                 else 'idx_scenarios_payback')
+        with self._connect() as db:
+            db.row_factory = sqlite3.Row
+            top = None
+            if saves:
+                # Newest scenario of a matching save, where the walk starts
+                top = db.execute(
+                    'SELECT MAX((SELECT MAX(id) FROM scenarios WHERE save_id = v.id)) FROM saves v '
+                    f"WHERE {' AND '.join(sql for sql, _ in saves)}",
+                    [value for _, value in saves],
+                ).fetchone()[0]
+                if top is None:
+                    return []
+            few = outputs and db.execute(
+                f'SELECT COUNT(*) FROM (SELECT 1 FROM scenarios s INDEXED BY {index} '
+                f"WHERE {' AND '.join(sql for sql, _ in outputs)} LIMIT ?)",
+                [value for _, value in outputs] + [SORT_MATCHES],
+            ).fetchone()[0] < SORT_MATCHES
+            if few:
+                source, clauses = f'scenarios s INDEXED BY {index}', [sql for sql, _ in outputs]
+            else:
+                # The unary + keeps SQLite off the range indexes, so it walks the ids (within the plant)
+                source = 'scenarios s INDEXED BY idx_scenarios_plant_id' if plant is not None else 'scenarios s'
+                clauses = [sql if sql.startswith('s.plant') else '+' + sql for sql, _ in outputs]
+            clauses += [sql for sql, _ in saves] + (['s.id <= ?'] if top is not None else [])
+            params = [value for _, value in outputs + saves] + ([top] if top is not None else [])
+            where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+            rows = db.execute(
+                'SELECT s.id, v.name, s.plant, v.created_at, s.final_ci, s.payback '
+                f'FROM {source} JOIN saves v ON v.id = s.save_id {where} ORDER BY s.id DESC LIMIT ?',
+                [*params, limit],
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def load(self, scenario_id):
+        # Full input and output vectors of one saved scenario, or None
+        import numpy as np
+        with self._connect() as db:
+            row = db.execute(
+                'SELECT s.id, v.name, s.plant, v.created_at, v.model, v.input_keys, v.constants, v.output_keys, '
+                's.inputs, s.results FROM scenarios s JOIN saves v ON v.id = s.save_id WHERE s.id = ?',
+                (scenario_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        sid, name, plant, created_at, model, input_keys, constants, output_keys, inputs, results = row
+        return {
+            'id': sid, 'name': name, 'plant': plant, 'created_at': created_at, 'model': model,
+            'inputs': {**json.loads(constants), **dict(zip(json.loads(input_keys), np.frombuffer(inputs).tolist()))},
+            'results': dict(zip(json.loads(output_keys), np.frombuffer(results).tolist())),
+        }
+
+    def delete(self, scenario_id):
+        with self._connect() as db:
+            db.execute('DELETE FROM scenarios WHERE id = ?', (scenario_id,))
+
+    def count(self):
+        with self._connect() as db:
+            return db.execute('SELECT COUNT(*) FROM scenarios').fetchone()[0]
@@ -0,0 +1,130 @@
+import json
+import os
+import resource
+import sys
+import time
+
+import pandas as pd
+
+from ci_model.cli import evaluate_frame
+from ci_model.parallel import ShardedExecutor
+
+MANIFEST = '_progress.json'
+
+
+def iter_chunks(path, chunk_size, skip_chunks=0):
+    # Yields DataFrames of at most chunk_size rows without reading the whole file
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        batches = pq.ParquetFile(path).iter_batches(batch_size=chunk_size)
+    elif path.endswith(('.arrow', '.feather', '.ipc')):
+        import pyarrow as pa
+        reader = pa.ipc.open_file(pa.memory_map(path))
+        batches = _rebatch((reader.get_batch(i) for i in range(reader.num_record_batches)), chunk_size)
+    else:
+        # CSV rows of committed chunks are skipped without being parsed into frames; a callable
+        # keeps that O(1) in memory where a range would be expanded into a set
+        skipped = skip_chunks * chunk_size
+        skip = (lambda i: 0 < i <= skipped) if skip_chunks else None
+        # With every row skipped, pandas still yields one empty frame
+        yield from (df for df in pd.read_csv(path, chunksize=chunk_size, skiprows=skip) if len(df))
+        return
+    for i, batch in enumerate(batches):
+        if i >= skip_chunks:
+            yield batch.to_pandas()
+
+
+def _rebatch(batches, chunk_size):
+    import pyarrow as pa
+    pending, rows = [], 0
+    for batch in batches:
+        while batch.num_rows:
+            take = min(chunk_size - rows, batch.num_rows)
+            pending.append(batch.slice(0, take))
+            rows += take
+            batch = batch.slice(take)
+            if rows == chunk_size:
+                yield pa.Table.from_batches(pending).combine_chunks().to_batches()[0]
+                pending, rows = [], 0
+    if pending:
+        yield pa.Table.from_batches(pending).combine_chunks().to_batches()[0]
+
+
+def _write_atomic(path, write):
+    tmp = path + '.tmp'
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def _write_json(path, data):
+    with open(path, 'w') as f:
+        json.dump(data, f)
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _summary(rows, progress, elapsed):
+    return {
+        'rows': rows,
+        'total_rows': progress['rows'],
+        'chunks': progress['committed_chunks'],
+        'seconds': elapsed,
+        'rows_per_second': rows / elapsed if elapsed else 0.0,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def stream_evaluate(source, output_dir, model='v3', chunk_size=500_000, fmt='parquet', restart=False,
+                    log=sys.stderr, workers=1):
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST)
+    job = {'source': os.path.abspath(source), 'model': model, 'chunk_size': chunk_size, 'format': fmt}
+    progress = {**job, 'committed_chunks': 0, 'rows': 0}
+    if os.path.exists(manifest_path) and not restart:
+        with open(manifest_path) as f:
+            saved = json.load(f)
+        if {k: saved.get(k) for k in job} != job:
+            raise ValueError(f"{output_dir} holds results of a different job; pass restart=True to overwrite")
+        progress = saved
+        if saved.get('complete'):
+            print(f"Already complete: {saved['rows']:,} rows in {saved['committed_chunks']} chunks", file=log)
+            return _summary(0, progress, 0.0)
+        print(f"Resuming after chunk {saved['committed_chunks']} ({saved['rows']:,} rows)", file=log)
+
+    # One pool for the whole file: each chunk is sharded across the same warm workers
+    executor = ShardedExecutor(workers) if workers != 1 else None
+    start = time.perf_counter()
+    rows = 0
+    chunk = progress['committed_chunks']
+    try:
+        for df in iter_chunks(source, chunk_size, skip_chunks=progress['committed_chunks']):
+            out = pd.concat([df, evaluate_frame(model, df, executor)], axis=1)
+            part = os.path.join(output_dir, f'part-{chunk:05d}.{fmt}')
+            if fmt == 'parquet':
+                _write_atomic(part, lambda p: out.to_parquet(p, index=False))
+            else:
+                _write_atomic(part, lambda p: out.to_csv(p, index=False))
+
+            # The manifest is only advanced once the part file is in place, so a crash
+            # at any point resumes from the last fully written chunk
+            chunk += 1
+            rows += len(df)
+            progress.update(committed_chunks=chunk, rows=progress['rows'] + len(df))
+            _write_atomic(manifest_path, lambda p: _write_json(p, progress))
+            elapsed = time.perf_counter() - start
+            print(f"  chunk {chunk} committed – {progress['rows']:,} rows total, "
+                  f"{rows / elapsed:,.0f} rows/s, peak RSS {peak_rss_mb():,.0f} MB", file=log)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    # Reruns of a finished job return early instead of reading the input again
+    progress['complete'] = True
+    _write_atomic(manifest_path, lambda p: _write_json(p, progress))
+
+    elapsed = time.perf_counter() - start
+    summary = _summary(rows, progress, elapsed)
+    print(f"Streamed {rows:,} rows in {elapsed:.2f}s ({summary['rows_per_second']:,.0f} rows/s), "
+          f"peak RSS {summary['peak_rss_mb']:,.0f} MB; results in {output_dir}", file=log)
+    return summary
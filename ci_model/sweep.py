@@ -0,0 +1,50 @@
+import numpy as np
+
+from ci_model.batch import calculate_dashboard_batch
+
+SWEEP_OUTPUTS = ['payback', 'net_cost', 'final_ci']
+
+# Viridis-like color stops for heatmap_rgb
+_STOPS = np.array([
+    [68, 1, 84],
+    [59, 82, 139],
+    [33, 145, 140],
+    [94, 201, 98],
+    [253, 231, 37],
+], dtype=float)
+
+
+def sweep_2d(base, x_key, x_values, y_key, y_values, output='payback', max_cells=250_000,
+             model=calculate_dashboard_batch):
+    if x_key == y_key:
+        raise ValueError("Sweep inputs must be different")
+    x = np.asarray(x_values, dtype=float)
+    y = np.asarray(y_values, dtype=float)
+    grid = np.empty((len(y), len(x)))
+
+    # Evaluate whole rows of the grid at a time so no chunk holds more than max_cells
+    # scenarios; the other inputs stay scalars and are broadcast by the model
+    rows = max(1, max_cells // len(x))
+    for start in range(0, len(y), rows):
+        inputs = dict(base)
+        inputs[x_key] = x[None, :]
+        inputs[y_key] = y[start:start + rows, None]
+        grid[start:start + rows] = model(inputs)[output]
+    return grid
+
+
+def heatmap_rgb(grid, vmin=None, vmax=None):
+    finite = np.isfinite(grid)
+    if vmin is None or vmax is None:
+        values = grid[finite]
+        lo, hi = np.percentile(values, [2, 98]) if values.size else (0.0, 1.0)
+        vmin = lo if vmin is None else vmin
+        vmax = hi if vmax is None else vmax
+    scaled = np.clip((grid - vmin) / ((vmax - vmin) or 1.0), 0, 1)
+    scaled[~finite] = 0
+    pos = scaled * (len(_STOPS) - 1)
+    i = np.minimum(pos.astype(int), len(_STOPS) - 2)
+    frac = (pos - i)[..., None]
+    rgb = _STOPS[i] * (1 - frac) + _STOPS[i + 1] * frac
+    rgb[~finite] = 128  # grey where payback / cost per ton is infinite
+    return rgb.astype(np.uint8)
@@ -1,50 +1,47 @@
 
+import numpy as np
+import pandas as pd
 import streamlit as st
 
-def calculate_ci_model(capacity_mgy, solar_pct, dryer_pct, chp_pct, chp_fuel, ccs_scope, sequestration_type,
-                       capex_solar, capex_dryers, capex_chp, capex_ccs, opex_pct, lcfs_credit, q45_credit):
-    baseline_ci = 65
-    ci_solar = -0.25 * solar_pct
-    ci_dryers = -0.10 * dryer_pct
-    ci_chp = -0.15 * chp_pct
+from ci_model.categories import load_categories
+from ci_model.combinations import combination_total, evaluate_combinations
+from ci_model.core import V2_OUTPUTS, calculate_ci_model_v2
+from ci_model.pareto import combination_count, enumerate_pareto
+from ci_model.plants import load_plants, plant_label
 
-    fuel_impact = {"RNG": -10, "Biogas": -7, "Biomass": -6, "NG": -3}
-    ci_fuel = fuel_impact.get(chp_fuel, 0)
-
-    scope_impact = {"Full-Plant": -20, "Fermentation Only": -10}
-    ci_ccs_scope = scope_impact.get(ccs_scope, 0)
+st.title("CI Model for Ethanol Plants – v2 with Cost & Payback")
 
-    sequestration_impact = {"Class VI Onsite": -5, "45Q Partner": -3, "Offsite": -2}
-    ci_sequestration = sequestration_impact.get(sequestration_type, 0)
 
-    final_ci = baseline_ci + ci_solar + ci_dryers + ci_chp + ci_fuel + ci_ccs_scope + ci_sequestration
-    tons_co2_avoided = (baseline_ci - final_ci) * capacity_mgy * 3780 / 1000
+@st.cache_data(max_entries=16)
+def pareto_frontier(base, pct_step, categories):
+    # Seconds at fine steps, so reruns that leave its inputs alone reuse the last frontier;
+    # the category tables are part of the key so edits to data/categories.csv show up
+    return enumerate_pareto(base, pct_step)
 
-    lcfs_revenue = tons_co2_avoided * lcfs_credit
-    q45_revenue = tons_co2_avoided * q45_credit
 
-    total_revenue = lcfs_revenue + q45_revenue
-    total_capex = capex_solar + capex_dryers + capex_chp + capex_ccs
-    total_opex = total_capex * (opex_pct / 100)
-    total_cost = total_capex + total_opex
+# A pass costs about 60 bytes and 85 ns per combination; at the model's own cap (20M) that is over
+# 1 GB of the shared server process
+MAX_COMBINATIONS = 2_000_000
 
-    payback_years = total_cost / total_revenue if total_revenue > 0 else float('inf')
-    cost_per_ton = total_cost / tons_co2_avoided if tons_co2_avoided > 0 else float('inf')
 
-    return final_ci, tons_co2_avoided, lcfs_revenue, q45_revenue, total_capex, total_opex, total_cost, payback_years, cost_per_ton
+@st.cache_data(max_entries=16)
+def ranked_combinations(base, ranges, rank_by, top, categories):
+    # Cached like the frontier, so reruns for other widgets reuse the last ranking
+    return evaluate_combinations(base, ranges, rank_by=rank_by, top=top, max_rows=MAX_COMBINATIONS)
 
-st.title("CI Model for Ethanol Plants – v2 with Cost & Payback")
 
-plant = st.selectbox("Select Plant", ["Arkalon (110 MGY)", "Bonanza (65 MGY)"])
-capacity = 110 if "Arkalon" in plant else 65
+plants = load_plants()
+categories = load_categories()
+plant = st.selectbox("Select Plant", list(plants), format_func=lambda name: plant_label(plants[name]))
+capacity = plants[plant]['capacity_mgy']
 
 st.header("CI Reduction Inputs")
 solar_pct = st.slider("Solar Contribution (%)", 0, 100, 60)
 dryer_pct = st.slider("Dryer Electrification (%)", 0, 100, 100)
 chp_pct = st.slider("CHP Contribution (%)", 0, 100, 85)
-chp_fuel = st.selectbox("CHP Fuel Type", ["RNG", "Biogas", "Biomass", "NG"])
-ccs_scope = st.selectbox("Carbon Capture Scope", ["Full-Plant", "Fermentation Only"])
-sequestration_type = st.selectbox("Sequestration Type", ["Class VI Onsite", "45Q Partner", "Offsite"])
+chp_fuel = st.selectbox("CHP Fuel Type", list(categories['chp_fuel']))
+ccs_scope = st.selectbox("Carbon Capture Scope", list(categories['ccs_scope']))
+sequestration_type = st.selectbox("Sequestration Type", list(categories['sequestration_type']))
 
 st.header("Credit Prices")
 lcfs_credit = st.number_input("LCFS Credit ($/ton)", value=125)
@@ -59,8 +56,8 @@ capex_ccs = st.number_input("Carbon Capture CapEx", value=20000000)
 opex_pct = st.number_input("Annual O&M (% of CapEx)", value=3.0)
 
 if st.button("Run CI Model"):
-    results = calculate_ci_model(capacity, solar_pct, dryer_pct, chp_pct, chp_fuel, ccs_scope, sequestration_type,
-                                 capex_solar, capex_dryers, capex_chp, capex_ccs, opex_pct, lcfs_credit, q45_credit)
+    results = calculate_ci_model_v2(capacity, solar_pct, dryer_pct, chp_pct, chp_fuel, ccs_scope, sequestration_type,
+                                    capex_solar, capex_dryers, capex_chp, capex_ccs, opex_pct, lcfs_credit, q45_credit)
     
     ci, tons, lcfs, q45, capex, opex, total_cost, payback, abatement_cost = results
 
@@ -74,3 +71,41 @@ if st.button("Run CI Model"):
     st.metric("Total Cost (CapEx + OpEx)", f"${total_cost:,.0f}")
     st.metric("Payback Period (yrs)", f"{payback:.2f}")
     st.metric("Cost per Ton CO₂ Avoided", f"${abatement_cost:,.2f}")
+
+st.header("Pareto Frontier: CI vs Net Cost")
+pct_step = st.select_slider("Adoption Step (%)", options=[1, 2, 5, 10, 20, 25, 50], value=10)
+st.caption(f"Enumerating {combination_count(pct_step):,} strategy combinations (solar, dryers, CHP + fuel, CCS scope + sequestration).")
+frontier = pareto_frontier({
+    'capacity_mgy': capacity, 'capex_solar': capex_solar, 'capex_dryers': capex_dryers,
+    'capex_chp': capex_chp, 'capex_ccs': capex_ccs, 'opex_pct': opex_pct,
+    'lcfs_credit': lcfs_credit, 'q45_credit': q45_credit,
+}, pct_step, categories)
+frontier_df = pd.DataFrame({k: v for k, v in frontier.items() if k != 'combinations'})
+st.scatter_chart(frontier_df, x='final_ci', y='net_cost')
+st.dataframe(frontier_df, hide_index=True)
+
+st.header("Strategy Combinations")
+st.caption("Ranks every CHP fuel × capture scope × sequestration option (from data/categories.csv) "
+           "crossed with the adoption ranges below, evaluated in one vectorized pass.")
+with st.form("combinations"):
+    # Range edits apply on submit, not on every slider move
+    col1, col2, col3 = st.columns(3)
+    ranges = {}
+    for col, key, label in [(col1, 'solar_pct', "Solar"), (col2, 'dryer_pct', "Dryers"), (col3, 'chp_pct', "CHP")]:
+        low, high = col.slider(f"{label} Range (%)", 0, 100, (0, 100), key=f"{key}_range")
+        step = col.number_input(f"{label} Step (%)", min_value=1, max_value=100, value=25, key=f"{key}_step")
+        ranges[key] = np.arange(low, high + 1, step)
+    rank_by = st.selectbox("Rank By", V2_OUTPUTS, index=V2_OUTPUTS.index('cost_per_ton'))
+    top_n = st.number_input("Show Top", min_value=1, value=20)
+    st.form_submit_button("Rank Combinations")
+total = combination_total(ranges)
+if total > MAX_COMBINATIONS:
+    st.error(f"{total:,} combinations exceed the limit of {MAX_COMBINATIONS:,}; narrow the ranges or raise the steps.")
+else:
+    ranked = ranked_combinations({
+        'capacity_mgy': capacity, 'capex_solar': capex_solar, 'capex_dryers': capex_dryers,
+        'capex_chp': capex_chp, 'capex_ccs': capex_ccs, 'opex_pct': opex_pct,
+        'lcfs_credit': lcfs_credit, 'q45_credit': q45_credit,
+    }, ranges, rank_by, int(top_n), categories)
+    st.write(f"{ranked['combinations']:,} combinations evaluated")
+    st.dataframe(pd.DataFrame({k: v for k, v in ranked.items() if k != 'combinations'}).set_index('rank'))
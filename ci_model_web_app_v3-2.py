@@ -1,60 +1,14 @@
 
 import streamlit as st
 
-def calculate_ci_model(inputs):
-    baseline_ci = 65
-
-    ci_reductions = {
-        'solar': -inputs['solar_ci'] * (inputs['solar_pct'] / 100),
-        'dryer': -inputs['dryer_ci'] * (inputs['dryer_pct'] / 100),
-        'chp': -inputs['chp_ci'] * (inputs['chp_pct'] / 100),
-        'boiler_elec': -inputs['boiler_ci'] * (inputs['boiler_pct'] / 100),
-        'ccs': inputs['ccs_ci']
-    }
-
-    total_ci = baseline_ci + sum(ci_reductions.values())
-    tons_co2_avoided = (baseline_ci - total_ci) * inputs['capacity_mgy'] * 3780 / 1000
-
-    lcfs_revenue = tons_co2_avoided * inputs['lcfs_price']
-    q45_revenue = tons_co2_avoided * inputs['q45_price']
-    total_revenue = lcfs_revenue + q45_revenue
-
-    annual_demand_charge = inputs['monthly_demand_charge'] * 12
-    demand_savings = annual_demand_charge * (inputs['solar_pct'] / 100) * (inputs['demand_reduction_pct'] / 100)
-
-    capex = {
-        'solar': inputs['solar_cost_per_kw'] * inputs['solar_kw'] / 100,
-        'dryer': inputs['dryer_cost_per_unit'] * inputs['dryer_units'],
-        'chp': inputs['chp_cost_per_mmbtu'] * inputs['chp_mmbtu'],
-        'boiler_elec': inputs['boiler_cost_per_mmbtu'] * inputs['boiler_mmbtu'],
-        'ccs': inputs['ccs_capex']
-    }
-
-    total_capex = sum(capex.values())
-    total_opex = total_capex * (inputs['opex_pct'] / 100)
-    total_cost = total_capex + total_opex - demand_savings
-
-    payback = total_cost / total_revenue if total_revenue > 0 else float('inf')
-    abatement_cost = total_cost / tons_co2_avoided if tons_co2_avoided > 0 else float('inf')
-
-    return {
-        'CI': total_ci,
-        'Tons CO2': tons_co2_avoided,
-        'LCFS': lcfs_revenue,
-        '45Q': q45_revenue,
-        'Revenue': total_revenue,
-        'CapEx': total_capex,
-        'OpEx': total_opex,
-        'Demand Savings': demand_savings,
-        'Total Cost': total_cost,
-        'Payback': payback,
-        'Abatement Cost': abatement_cost
-    }
+from ci_model.core import calculate_ci_model
+from ci_model.plants import load_plants, plant_label
 
 st.title("Ethanol Plant CI Model – v3")
 
-plant = st.selectbox("Select Plant", ["Arkalon (110 MGY)", "Bonanza (65 MGY)"])
-capacity = 110 if "Arkalon" in plant else 65
+plants = load_plants()
+plant = st.selectbox("Select Plant", list(plants), format_func=lambda name: plant_label(plants[name]))
+capacity = plants[plant]['capacity_mgy']
 
 st.header("Utility (CMS)")
 monthly_demand_charge = st.number_input("Monthly CMS Demand Charge ($)", value=50000)
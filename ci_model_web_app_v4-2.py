@@ -1,6 +1,9 @@
 
 import streamlit as st
 
+from ci_model.optimizer import optimize_strategy
+from ci_model.plants import load_plants, plant_label
+
 st.set_page_config(page_title="CI Model v4", layout="wide")
 
 def ci_reduction(ci_value, pct):
@@ -11,9 +14,12 @@ def format_ci(x): return f"-{x:.2f} gCO₂e/MJ"
 st.title("🌽 CI Model for Ethanol Plants – v4 (Full)")
 
 # Inputs
+plants = load_plants()
+plant = st.selectbox("Select Plant", list(plants), format_func=lambda name: plant_label(plants[name]))
+
 st.header("🎯 CI Target")
 ci_goal = st.number_input("CI Goal (gCO₂e/MJ)", value=-3.0)
-baseline_ci = 65
+baseline_ci = plants[plant]['baseline_ci']
 
 st.header("📉 Strategy Inputs & CI Reductions")
 
@@ -47,7 +53,7 @@ with col2:
 
 # CMS Utility
 st.header("⚡ CMS Demand Charge Savings")
-monthly_demand_charge = st.number_input("Monthly Demand Charge ($)", value=50000)
+monthly_demand_charge = st.number_input("Monthly Demand Charge ($)", value=plants[plant]['cms_charge'])
 solar_demand_offset_pct = st.slider("Solar Offset of Demand (%)", 0, 100, 40)
 
 # Financial
@@ -57,6 +63,15 @@ lcfs_credit = st.number_input("LCFS Credit ($/ton)", value=125)
 q45_credit = st.number_input("45Q Credit ($/ton)", value=85)
 tax_rate = st.number_input("Effective Tax Rate (%)", value=21.0)
 
+strategy_params = {
+    'capacity_mgy': plants[plant]['capacity_mgy'], 'baseline_ci': baseline_ci, 'ci_goal': ci_goal,
+    'solar_ci': solar_ci, 'solar_capex': solar_capex, 'itc_pct': 30.0 if apply_itc else 0.0,
+    'dryer_ci': dryer_ci, 'dryer_capex': dryer_capex, 'chp_ci': chp_ci, 'chp_capex': chp_capex,
+    'boiler_ci': boiler_ci, 'boiler_capex': boiler_capex, 'ccs_ci': ccs_ci, 'ccs_capex': ccs_capex,
+    'cms_charge': monthly_demand_charge, 'solar_offset': solar_demand_offset_pct,
+    'opex_pct': opex_pct, 'lcfs_price': lcfs_credit, 'q45_price': q45_credit,
+}
+
 # CI math
 solar_reduction = ci_reduction(solar_ci, solar_pct)
 dryer_reduction = ci_reduction(dryer_ci, dryer_pct)
@@ -78,7 +93,7 @@ total_opex = total_capex * (opex_pct / 100)
 cms_savings = monthly_demand_charge * 12 * (solar_pct / 100) * (solar_demand_offset_pct / 100)
 
 # CO2 avoided and revenue
-capacity_mgy = 110
+capacity_mgy = plants[plant]['capacity_mgy']
 tons_co2_avoided = (baseline_ci - final_ci) * capacity_mgy * 3780 / 1000
 lcfs_revenue = tons_co2_avoided * lcfs_credit
 q45_revenue = tons_co2_avoided * q45_credit if ccs_enabled else 0
@@ -110,3 +125,32 @@ st.header("💰 Revenue Summary")
 st.metric("LCFS Revenue", f"${lcfs_revenue:,.0f}")
 st.metric("45Q Revenue", f"${q45_revenue:,.0f}")
 st.metric("Total Annual Revenue", f"${total_revenue:,.0f}")
+
+st.header("🧮 Least-Cost Strategy Optimizer")
+objective = st.radio("Objective", ["Minimize Net Cost", "Maximize NPV"], horizontal=True)
+min_adoption = st.slider("Minimum Adoption if Strategy Chosen (%)", 0, 100, 0)
+if objective == "Maximize NPV":
+    discount_rate = st.number_input("Discount Rate (%)", value=8.0)
+    project_years = st.number_input("Project Life (yrs)", value=20, step=1)
+else:
+    discount_rate, project_years = 8.0, 20
+
+if st.button("Optimize Strategy Mix"):
+    best = optimize_strategy(
+        strategy_params, objective="npv" if objective == "Maximize NPV" else "net_cost",
+        min_pct=min_adoption, discount_rate=discount_rate, years=int(project_years),
+    )
+    if best["status"] != "optimal":
+        st.error(f"No strategy mix reaches the CI goal. Lowest achievable CI is {best['min_final_ci']:.2f} gCO₂e/MJ.")
+    else:
+        col1, col2 = st.columns(2)
+        with col1:
+            for name, label in [("solar", "Solar"), ("dryer", "Dryers"), ("chp", "CHP"), ("boiler", "Boiler Electrification")]:
+                st.metric(label, f"{best['pct'][name]:.0f}%" if best["adopt"][name] else "Not adopted")
+            st.metric("CCS", "Enabled" if best["adopt"]["ccs"] else "Not adopted")
+        with col2:
+            st.metric("Final CI", f"{best['final_ci']:.2f} gCO₂e/MJ")
+            st.metric("Total CapEx", f"${best['total_capex']:,.0f}")
+            st.metric("Net Cost (CapEx + OpEx - CMS)", f"${best['net_cost']:,.0f}")
+            st.metric("Payback (yrs)", f"{best['payback']:.2f}")
+            st.metric("NPV", f"${best['npv']:,.0f}")
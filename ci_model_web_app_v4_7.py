@@ -1,13 +1,19 @@
 
 import streamlit as st
 
+from ci_model.core import DASHBOARD_OUTPUTS, calculate_dashboard
+from ci_model.plants import load_plants, plant_label
+
 st.set_page_config(page_title="CI Model v4.7", layout="wide")
 
 tab1, tab2, tab3 = st.tabs(["Dashboard", "Assumptions", "Editable Calculations"])
 
 with tab2:
     st.title("Assumptions")
-    baseline_ci = st.number_input("Baseline CI", value=65.0)
+    plants = load_plants()
+    plant = st.selectbox("Select Plant", list(plants), format_func=lambda name: plant_label(plants[name]))
+    capacity_mgy = plants[plant]['capacity_mgy']
+    baseline_ci = st.number_input("Baseline CI", value=plants[plant]['baseline_ci'])
     mj_per_gal = st.number_input("MJ per gallon", value=3780.0)
     tax_rate = st.number_input("Tax Rate (%)", value=21.0)
     lcfs_price = st.number_input("LCFS Credit ($/ton)", value=125)
@@ -17,7 +23,7 @@ with tab2:
     cp_ci = st.number_input("CapturePoint Grid CI (gCO₂e/MJ)", value=10.0)
     opex_pct = st.number_input("OpEx (% of CapEx)", value=3.0)
     itc_pct = st.number_input("Solar ITC (%)", value=30.0) / 100
-    cms_charge = st.number_input("Monthly CMS Demand Charge ($)", value=50000)
+    cms_charge = st.number_input("Monthly CMS Demand Charge ($)", value=plants[plant]['cms_charge'])
     solar_offset = st.slider("Solar Offset of CMS Demand (%)", 0, 100, 40)
 
 with tab3:
@@ -53,33 +59,19 @@ with tab1:
     cp_enabled = st.checkbox("Connect to CapturePoint Grid?", value=False)
     cp_pct = st.slider("CapturePoint Grid Supply %", 0, 100, 25) if cp_enabled else 0
 
-    if itc_pct:
-        solar_capex *= (1 - itc_pct)
-
-    ci_reduction = (
-        solar_pct * solar_ci +
-        dryer_pct * dryer_ci +
-        chp_pct * chp_ci +
-        boiler_pct * boiler_ci
-    ) / 100 + (ccs_ci if ccs_enabled else 0)
-
-    ng_penalty = ((ng_boiler_pct + ng_dryer_pct) / 2) * ng_ci / 100 if use_ng else 0
-    rng_offset = rng_plant_pct * (baseline_ci - rng_ci) / 100 if use_rng else 0
-    cp_offset = cp_pct * (baseline_ci - cp_ci) / 100 if cp_enabled else 0
-
-    final_ci = baseline_ci - ci_reduction + ng_penalty - rng_offset - cp_offset
-    tons_avoided = (baseline_ci - final_ci) * 110 * mj_per_gal / 1000
-
-    lcfs_revenue = tons_avoided * lcfs_price
-    q45_revenue = tons_avoided * q45_price if ccs_enabled else 0
-    total_revenue = lcfs_revenue + q45_revenue
-
-    total_capex = solar_capex + dryer_capex + chp_capex + boiler_capex + (ccs_capex if ccs_enabled else 0)
-    opex = total_capex * (opex_pct / 100)
-    cms_savings = cms_charge * 12 * solar_pct * solar_offset / 10000
-    net_cost = total_capex + opex - cms_savings
-    payback = net_cost / total_revenue if total_revenue > 0 else float("inf")
-    cost_per_ton = net_cost / tons_avoided if tons_avoided > 0 else float("inf")
+    results = calculate_dashboard({
+        'capacity_mgy': capacity_mgy, 'baseline_ci': baseline_ci, 'mj_per_gal': mj_per_gal,
+        'lcfs_price': lcfs_price, 'q45_price': q45_price, 'ng_ci': ng_ci, 'rng_ci': rng_ci, 'cp_ci': cp_ci,
+        'tax_rate': tax_rate, 'opex_pct': opex_pct, 'itc_pct': itc_pct * 100, 'cms_charge': cms_charge,
+        'solar_offset': solar_offset, 'solar_ci': solar_ci, 'dryer_ci': dryer_ci, 'chp_ci': chp_ci,
+        'boiler_ci': boiler_ci, 'ccs_ci': ccs_ci, 'solar_capex': solar_capex, 'dryer_capex': dryer_capex,
+        'chp_capex': chp_capex, 'boiler_capex': boiler_capex, 'ccs_capex': ccs_capex,
+        'solar_pct': solar_pct, 'dryer_pct': dryer_pct, 'chp_pct': chp_pct, 'boiler_pct': boiler_pct,
+        'ccs_enabled': ccs_enabled, 'use_ng': use_ng, 'ng_boiler_pct': ng_boiler_pct, 'ng_dryer_pct': ng_dryer_pct,
+        'use_rng': use_rng, 'rng_pct': rng_plant_pct, 'use_cp': cp_enabled, 'cp_pct': cp_pct,
+    })
+    (final_ci, tons_avoided, lcfs_revenue, q45_revenue, total_revenue, cms_savings,
+     total_capex, opex, net_cost, payback, cost_per_ton) = (results[k] for k in DASHBOARD_OUTPUTS)
 
     st.subheader("Results Summary")
     st.metric("Final CI", f"{final_ci:.2f} gCO₂e/MJ")
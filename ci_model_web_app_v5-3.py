@@ -1,78 +1,254 @@
 
+import os
+
+import altair as alt
+import numpy as np
+import pandas as pd
 import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from ci_model.backtest import PRICE_SERIES, backtest, combine_prices, load_prices, read_prices, summarize
+from ci_model.batch import DASHBOARD_DEFAULTS, DASHBOARD_FLAGS
+from ci_model.cache import MODEL_CACHE
+from ci_model.cashflow import evaluate_cashflows
+from ci_model.core import DASHBOARD_OUTPUTS
+from ci_model.fleet import evaluate_fleet
+from ci_model.graph import dashboard_graph
+from ci_model.hourly import cms_savings_curve, read_profile, synthetic_solar_profile, with_hourly_cms
+from ci_model.instrument import RerunProfiler
+from ci_model.monte_carlo import DEFAULT_DISTRIBUTIONS, run_monte_carlo
+from ci_model.parallel import get_executor
+from ci_model.plants import load_plants, plant_label
+from ci_model.profiles import get_profile
+from ci_model.sensitivity import TORNADO_OUTPUTS, default_bounds, tornado
+from ci_model.sobol import SOBOL_OUTPUTS, sobol_indices
+from ci_model.store import ScenarioStore
+from ci_model.sweep import SWEEP_OUTPUTS, heatmap_rgb, sweep_2d
 
 st.set_page_config(page_title="CI Model v5", layout="wide")
 
-tab1, tab2, tab3, tab4 = st.tabs(["Dashboard", "Assumptions", "Editable Calculations", "Formulas + Explanations"])
+# Opt-in rerun profiling: CI_MODEL_PROFILE=1 times and traces memory for the whole server;
+# ?debug=1 in the URL only times this session (tracemalloc would slow every session)
+ctx = get_script_run_ctx()
+profile_server = os.environ.get("CI_MODEL_PROFILE") == "1"
+profiler = RerunProfiler(
+    ctx.session_id if ctx else "bare",
+    enabled=profile_server or st.query_params.get("debug") == "1",
+    trace_memory=profile_server,
+)
+
+# Large batches (sweeps, Monte Carlo, Sobol, backtests) are sharded across one process pool
+# shared by every session; small ones still run inline
+EXECUTOR = get_executor()
+DASHBOARD_MODEL = EXECUTOR.model('dashboard')
+
+# Every model input lives in session state under its scenario key. Widgets bind to those keys,
+# so values survive tabs that are not rendered (lazy tabs skip their widgets) and forms only
+# write them on submit.
+NUMBER_INPUTS = [
+    'baseline_ci', 'mj_per_gal', 'lcfs_price', 'q45_price', 'ng_ci', 'rng_ci', 'cp_ci', 'tax_rate',
+    'opex_pct', 'itc_pct', 'cms_charge', 'solar_ci', 'dryer_ci', 'chp_ci', 'boiler_ci', 'ccs_ci',
+    'solar_capex', 'dryer_capex', 'chp_capex', 'boiler_capex', 'ccs_capex',
+]
+plants = load_plants()
+if 'plant' not in st.session_state:
+    st.session_state.plant = next(iter(plants))
+    for key, value in DASHBOARD_DEFAULTS.items():
+        st.session_state[key] = float(value) if key in NUMBER_INPUTS else value
+    st.session_state.update(cms_method="Flat formula", solar_kw=3000.0, load_upload=None, solar_upload=None,
+                            load_error=None, solar_error=None)
+    st.session_state.update({k: plants[st.session_state.plant][k] for k in ['baseline_ci', 'cms_charge']})
+# Keep widget values alive across reruns where their widget is not drawn
+for key in ['plant', 'cms_method', 'solar_kw', *DASHBOARD_DEFAULTS]:
+    st.session_state[key] = st.session_state[key]
+
+
+def apply_plant():
+    # Switching plant resets the plant-specific assumptions to the registry values
+    st.session_state.update({k: plants[st.session_state.plant][k] for k in ['baseline_ci', 'cms_charge']})
+
+
+def apply_profile_upload(kind):
+    # Runs when a file is added or removed: parse it once, or drop the stale profile. Lazy tabs
+    # unmount the uploader without firing this, so switching tabs keeps the upload.
+    upload = st.session_state[f"{kind}_file"]
+    st.session_state[f"{kind}_error"] = None
+    try:
+        st.session_state[f"{kind}_upload"] = read_profile(upload) if upload is not None else None
+    except ValueError as e:
+        st.session_state[f"{kind}_upload"] = None
+        st.session_state[f"{kind}_error"] = f"Could not read {upload.name}: {e}"
+
+
+def load_saved(scenario_id):
+    # Copies a saved scenario back into the inputs; runs as a callback, before any widget is drawn
+    saved = scenario_store().load(scenario_id)
+    if saved['plant'] in plants:
+        st.session_state.plant = saved['plant']
+    for key, value in saved['inputs'].items():
+        if key in DASHBOARD_FLAGS:
+            st.session_state[key] = bool(value)
+        elif key in NUMBER_INPUTS:
+            st.session_state[key] = value
+        elif key in DASHBOARD_DEFAULTS and key != 'capacity_mgy':
+            st.session_state[key] = int(value)
+
+
+@st.cache_resource
+def scenario_store():
+    return ScenarioStore()
+
+
+@st.cache_data(ttl=60, max_entries=64)
+def saved_scenarios(plant, max_ci, max_payback):
+    # Per filter, so dashboard reruns skip the store; cleared on save, and expires so saves from
+    # the CLI or other sessions show up
+    saved = pd.DataFrame(scenario_store().query(plant, max_ci, max_payback, limit=200))
+    if not saved.empty:
+        saved['created_at'] = pd.to_datetime(saved['created_at'], unit='s')
+    return saved
+
+
+def current_scenario():
+    state = st.session_state
+    scenario = {k: state[k] for k in DASHBOARD_DEFAULTS}
+    scenario['capacity_mgy'] = plants[state.plant]['capacity_mgy']
+    for flag, keys in [('use_ng', ['ng_boiler_pct', 'ng_dryer_pct']), ('use_rng', ['rng_pct']), ('use_cp', ['cp_pct'])]:
+        if not state[flag]:
+            scenario.update(dict.fromkeys(keys, 0))
+    return scenario
+
+
+def current_profiles():
+    # Uploads take precedence over profiles imported into the local profile store
+    state = st.session_state
+    if state.cms_method != "Hourly simulation (8760)":
+        return None, None
+    load_profile = state.load_upload if state.load_upload is not None else get_profile(state.plant, 'load')
+    solar_profile = state.solar_upload if state.solar_upload is not None else get_profile(state.plant, 'solar')
+    return load_profile, synthetic_solar_profile() if solar_profile is None else solar_profile
+
+
+# Tabs track the active tab and rerun on switch, so only the open tab's content is computed
+tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8, tab9 = st.tabs([
+    "Dashboard", "Assumptions", "Editable Calculations", "Formulas + Explanations",
+    "Monte Carlo", "Sensitivity", "Sweep", "Fleet", "Backtest",
+], key="active_tab", on_change="rerun")
+
+with st.sidebar.expander("Model Cache"):
+    st.json(MODEL_CACHE.stats())
+
+profiler.lap("Layout")
 
 # Assumptions
-with tab2:
-    st.title("Assumptions")
-    baseline_ci = st.number_input("Baseline CI", value=65.0)
-    mj_per_gal = st.number_input("MJ per gallon", value=3780.0)
-    lcfs_price = st.number_input("LCFS Credit ($/ton)", value=125)
-    q45_price = st.number_input("45Q Credit ($/ton)", value=85)
-    ng_ci = st.number_input("Natural Gas CI (gCO₂e/MJ)", value=78.4)
-    rng_ci = st.number_input("RNG CI (gCO₂e/MJ)", value=15.0)
-    cp_ci = st.number_input("CapturePoint Grid CI (gCO₂e/MJ)", value=10.0)
-    tax_rate = st.number_input("Tax Rate (%)", value=21.0)
-    opex_pct = st.number_input("OpEx (% of CapEx)", value=3.0)
-    itc_pct = st.number_input("Solar ITC (%)", value=30.0) / 100
-    cms_charge = st.number_input("Monthly CMS Demand Charge ($)", value=50000.0)
-    solar_offset = st.slider("Solar Offset of CMS Demand (%)", 0, 100, 40)
+if tab2.open:
+    with tab2:
+        st.title("Assumptions")
+        st.selectbox("Select Plant", list(plants), format_func=lambda name: plant_label(plants[name]),
+                     key="plant", on_change=apply_plant)
+        st.radio("CMS Savings Method", ["Flat formula", "Hourly simulation (8760)"], horizontal=True, key="cms_method")
+        if st.session_state.cms_method == "Hourly simulation (8760)":
+            for kind, label in [("load", "Plant Load Profile (8760 hourly kW, CSV)"),
+                                ("solar", "Solar Profile (8760 hourly kW per kW installed, CSV, optional)")]:
+                st.file_uploader(label, type="csv", key=f"{kind}_file", on_change=apply_profile_upload, args=(kind,))
+                if st.session_state[f"{kind}_error"]:
+                    st.error(st.session_state[f"{kind}_error"])
+                elif st.session_state[f"{kind}_upload"] is not None and st.session_state.get(f"{kind}_file") is None:
+                    col1, col2 = st.columns([3, 1])
+                    col1.caption(f"Using the {kind} profile uploaded earlier in this session.")
+                    col2.button("Clear", key=f"{kind}_clear", on_click=st.session_state.update,
+                                kwargs={f"{kind}_upload": None})
+            if current_profiles()[0] is None:
+                st.info("Upload a load profile (or import one with `python -m ci_model profiles import`) "
+                        "to run the hourly simulation; the flat formula is used until then.")
+
+        # Edits are batched: nothing reruns until the form is submitted
+        with st.form("assumptions"):
+            st.number_input("Baseline CI", key="baseline_ci")
+            st.number_input("MJ per gallon", key="mj_per_gal")
+            st.number_input("LCFS Credit ($/ton)", key="lcfs_price")
+            st.number_input("45Q Credit ($/ton)", key="q45_price")
+            st.number_input("Natural Gas CI (gCO₂e/MJ)", key="ng_ci")
+            st.number_input("RNG CI (gCO₂e/MJ)", key="rng_ci")
+            st.number_input("CapturePoint Grid CI (gCO₂e/MJ)", key="cp_ci")
+            st.number_input("Tax Rate (%)", key="tax_rate")
+            st.number_input("OpEx (% of CapEx)", key="opex_pct")
+            st.number_input("Solar ITC (%)", key="itc_pct")
+            st.number_input("Monthly CMS Demand Charge ($)", key="cms_charge")
+            st.slider("Solar Offset of CMS Demand (%)", 0, 100, key="solar_offset")
+            if st.session_state.cms_method == "Hourly simulation (8760)":
+                st.number_input("Installed Solar Capacity (kW)", key="solar_kw")
+            st.form_submit_button("Apply Assumptions")
+
+profiler.lap("Inputs: Assumptions")
 
 # Editable Calculations
-with tab3:
-    st.title("Editable Calculations")
-    solar_ci = st.number_input("CI Reduction from Solar", value=25.0)
-    dryer_ci = st.number_input("CI Reduction from Dryers", value=10.0)
-    chp_ci = st.number_input("CI Reduction from CHP", value=15.0)
-    boiler_ci = st.number_input("CI Reduction from Boiler Electrification", value=12.0)
-    ccs_ci = st.number_input("CI Reduction from CCS", value=25.0)
-    solar_capex = st.number_input("Solar CapEx ($)", value=5000000)
-    dryer_capex = st.number_input("Dryer CapEx ($)", value=3000000)
-    chp_capex = st.number_input("CHP CapEx ($)", value=10000000)
-    boiler_capex = st.number_input("Boiler CapEx ($)", value=5000000)
-    ccs_capex = st.number_input("CCS CapEx ($)", value=20000000)
+if tab3.open:
+    with tab3:
+        st.title("Editable Calculations")
+        with st.form("editable"):
+            st.number_input("CI Reduction from Solar", key="solar_ci")
+            st.number_input("CI Reduction from Dryers", key="dryer_ci")
+            st.number_input("CI Reduction from CHP", key="chp_ci")
+            st.number_input("CI Reduction from Boiler Electrification", key="boiler_ci")
+            st.number_input("CI Reduction from CCS", key="ccs_ci")
+            st.number_input("Solar CapEx ($)", key="solar_capex", step=1.0, format="%.0f")
+            st.number_input("Dryer CapEx ($)", key="dryer_capex", step=1.0, format="%.0f")
+            st.number_input("CHP CapEx ($)", key="chp_capex", step=1.0, format="%.0f")
+            st.number_input("Boiler CapEx ($)", key="boiler_capex", step=1.0, format="%.0f")
+            st.number_input("CCS CapEx ($)", key="ccs_capex", step=1.0, format="%.0f")
+            st.form_submit_button("Apply Calculations")
+
+profiler.lap("Inputs: Editable Calculations")
+
+scenario = current_scenario()
+load_profile, solar_profile = current_profiles()
+# In hourly CMS mode every tab prices CMS savings from the same simulation: one curve of savings
+# per $1 of demand charge over solar adoption, wrapped around the batch model
+cms_curve = None
+dashboard_model = DASHBOARD_MODEL
+if load_profile is not None:
+    curve_inputs = [load_profile, solar_profile, st.session_state.solar_kw]
+    cms_curve = MODEL_CACHE.get_or_compute(curve_inputs, lambda: cms_savings_curve(*curve_inputs), 'hourly_cms')
+    dashboard_model = with_hourly_cms(DASHBOARD_MODEL, cms_curve)
+
+
+@st.fragment
+def dashboard():
+    # Slider and checkbox changes rerun only this fragment, not the other tabs
+    ctx = get_script_run_ctx()
+    fragment_rerun = bool(ctx and ctx.fragment_ids_this_run)
+    timer = RerunProfiler(profiler.session_id, enabled=profiler.enabled, trace_memory=profiler.trace_memory) \
+        if fragment_rerun else profiler
 
-# Dashboard Logic
-with tab1:
     st.title("CI Model Dashboard")
-    solar_pct = st.slider("Solar Adoption (%)", 0, 100, 100)
-    dryer_pct = st.slider("Dryer Conversion (%)", 0, 100, 100)
-    chp_pct = st.slider("CHP Integration (%)", 0, 100, 100)
-    boiler_pct = st.slider("Boiler Electrification (%)", 0, 100, 100)
-    ccs_enabled = st.checkbox("Enable CCS?", value=True)
-    use_ng = st.checkbox("Use Natural Gas?", value=True)
-    ng_boiler_pct = st.slider("NG % Boilers", 0, 100, 50) if use_ng else 0
-    ng_dryer_pct = st.slider("NG % Dryers", 0, 100, 50) if use_ng else 0
-    use_rng = st.checkbox("Use RNG?", value=True)
-    rng_pct = st.slider("RNG % Plant Energy", 0, 100, 30) if use_rng else 0
-    use_cp = st.checkbox("Connect to CapturePoint?", value=True)
-    cp_pct = st.slider("CapturePoint % of Grid", 0, 100, 25) if use_cp else 0
-
-    if itc_pct:
-        solar_capex *= (1 - itc_pct)
-
-    ci_reduction = (solar_pct * solar_ci + dryer_pct * dryer_ci + chp_pct * chp_ci + boiler_pct * boiler_ci) / 100
-    if ccs_enabled:
-        ci_reduction += ccs_ci
-
-    ng_penalty = ((ng_boiler_pct + ng_dryer_pct) / 2) * ng_ci / 100 if use_ng else 0
-    rng_offset = rng_pct * (baseline_ci - rng_ci) / 100 if use_rng else 0
-    cp_offset = cp_pct * (baseline_ci - cp_ci) / 100 if use_cp else 0
-
-    final_ci = baseline_ci - ci_reduction + ng_penalty - rng_offset - cp_offset
-    tons_avoided = (baseline_ci - final_ci) * 110 * mj_per_gal / 1000
-    lcfs_revenue = tons_avoided * lcfs_price
-    q45_revenue = tons_avoided * q45_price if ccs_enabled else 0
-    total_revenue = lcfs_revenue + q45_revenue
-    cms_savings = cms_charge * 12 * solar_pct * solar_offset / 10000
-    total_capex = solar_capex + dryer_capex + chp_capex + boiler_capex + (ccs_capex if ccs_enabled else 0)
-    opex = total_capex * (opex_pct / 100)
-    net_cost = total_capex + opex - cms_savings
-    payback = net_cost / total_revenue if total_revenue > 0 else float("inf")
-    cost_per_ton = net_cost / tons_avoided if tons_avoided > 0 else float("inf")
+    st.slider("Solar Adoption (%)", 0, 100, key="solar_pct")
+    st.slider("Dryer Conversion (%)", 0, 100, key="dryer_pct")
+    st.slider("CHP Integration (%)", 0, 100, key="chp_pct")
+    st.slider("Boiler Electrification (%)", 0, 100, key="boiler_pct")
+    st.checkbox("Enable CCS?", key="ccs_enabled")
+    if st.checkbox("Use Natural Gas?", key="use_ng"):
+        st.slider("NG % Boilers", 0, 100, key="ng_boiler_pct")
+        st.slider("NG % Dryers", 0, 100, key="ng_dryer_pct")
+    if st.checkbox("Use RNG?", key="use_rng"):
+        st.slider("RNG % Plant Energy", 0, 100, key="rng_pct")
+    if st.checkbox("Connect to CapturePoint?", key="use_cp"):
+        st.slider("CapturePoint % of Grid", 0, 100, key="cp_pct")
+    scenario = current_scenario()
+    timer.lap("Dashboard: inputs")
+
+    # Only nodes downstream of inputs that changed since the last rerun are recomputed
+    if 'dashboard_graph' not in st.session_state:
+        st.session_state.dashboard_graph = dashboard_graph()
+    graph = st.session_state.dashboard_graph
+    cms_savings_hourly = None
+    if cms_curve is not None:
+        # The curve point for this adoption, as the batch tabs use it
+        cms_savings_hourly = float(scenario['cms_charge'] * np.interp(scenario['solar_pct'], *cms_curve))
+    results = graph.update({**scenario, 'cms_savings_hourly': cms_savings_hourly})
+    (final_ci, tons_avoided, lcfs_revenue, q45_revenue, total_revenue, cms_savings,
+     total_capex, opex, net_cost, payback, cost_per_ton) = (results[k] for k in DASHBOARD_OUTPUTS)
+    timer.lap("Dashboard: calculation")
 
     st.subheader("Results Summary")
     st.metric("Final CI", f"{final_ci:.2f}")
@@ -86,11 +262,73 @@ with tab1:
     st.metric("Net Cost", f"${net_cost:,.0f}")
     st.metric("Payback Period", f"{payback:.2f} yrs")
     st.metric("Cost per Ton", f"${cost_per_ton:.2f}")
+    st.caption(f"Recomputed: {', '.join(graph.recomputed) or 'None – no inputs changed'}")
+    timer.lap("Dashboard: rendering")
+
+    with st.expander("Multi-Year Cash Flow"):
+        col1, col2 = st.columns(2)
+        with col1:
+            project_years = st.slider("Project Life (yrs)", 1, 40, 20)
+            discount_rate = st.number_input("Discount Rate (%)", value=8.0)
+        with col2:
+            credit_escalator = st.number_input("Credit Price Escalator (%/yr)", value=0.0)
+            opex_escalator = st.number_input("OpEx Escalator (%/yr)", value=2.0)
+            cms_escalator = st.number_input("CMS Savings Escalator (%/yr)", value=0.0)
+        cf = evaluate_cashflows(
+            results, project_years, discount_rate, credit_escalator, opex_escalator, cms_escalator
+        )
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("NPV", f"${cf['npv'][0]:,.0f}")
+        col2.metric("IRR", f"{cf['irr'][0]:.1f}%" if np.isfinite(cf['irr'][0]) else "n/a")
+        col3.metric("Discounted Payback", f"{cf['discounted_payback'][0]:.2f} yrs")
+        col4.metric("LCOA", f"${cf['lcoa'][0]:,.2f}/ton")
+        st.line_chart(pd.DataFrame({"Cumulative Cash ($)": np.cumsum(cf['cash_flows'][0])}))
+    timer.lap("Dashboard: cash flow")
+
+    with st.expander("Saved Scenarios"):
+        with st.form("save_scenario", clear_on_submit=True):
+            scenario_name = st.text_input("Scenario Name")
+            if st.form_submit_button("Save Scenario"):
+                scenario_id = scenario_store().save(
+                    scenario_name or None, st.session_state.plant, scenario, {k: results[k] for k in DASHBOARD_OUTPUTS}
+                )
+                saved_scenarios.clear()
+                st.success(f"Saved scenario #{scenario_id}")
+        col1, col2, col3 = st.columns(3)
+        this_plant = col1.checkbox("This plant only", value=True)
+        max_ci = col2.number_input("Final CI below", value=None)
+        max_payback = col3.number_input("Payback below (yrs)", value=None)
+        saved = saved_scenarios(st.session_state.plant if this_plant else None, max_ci, max_payback)
+        if saved.empty:
+            st.caption("No saved scenarios match.")
+        else:
+            st.dataframe(saved, hide_index=True)
+            col1, col2 = st.columns([3, 1])
+            selected = col1.selectbox("Saved Scenario", saved['id'], format_func=lambda i: (
+                f"#{i} {saved.loc[saved['id'] == i, 'name'].iloc[0] or ''}"
+            ))
+            if col2.button("Load Into Inputs", on_click=load_saved, args=(int(selected),)):
+                # Full rerun so every tab picks up the loaded plant and inputs
+                st.rerun()
+    timer.lap("Dashboard: saved scenarios")
+
+    # Fragment reruns skip the rest of the script, so they log their own profile record
+    if fragment_rerun:
+        record = timer.finish()
+        if record:
+            st.caption(f"Fragment rerun: {record['total_ms']:.1f} ms")
+
+
+# Dashboard Logic
+if tab1.open:
+    with tab1:
+        dashboard()
 
 # Explanations Tab
-with tab4:
-    st.title("Formulas + Explanations")
-    st.markdown("""
+if tab4.open:
+    with tab4:
+        st.title("Formulas + Explanations")
+        st.markdown("""
 ### Final CI Calculation:
 Final CI = Baseline CI - CI Reductions + NG Penalty - RNG Offset - CapturePoint Offset
 
@@ -108,7 +346,321 @@ Tons = (Baseline CI - Final CI) × MGY × MJ/gal ÷ 1000
 - CapEx = Total strategy costs
 - OpEx = CapEx × OpEx %
 - CMS Savings = Monthly CMS × 12 × Solar % × Offset %
+  (hourly mode: Σ months of demand rate × (peak load − peak of load net of solar))
 - Net Cost = CapEx + OpEx - CMS Savings
 - Payback = Net Cost / Revenue
 - Cost per Ton = Net Cost / Tons CO₂ Avoided
+
+### Multi-Year Cash Flow:
+- Year 0 = −CapEx; Year t = Revenue + CMS Savings − OpEx, each grown by its escalator
+- NPV = Σ Cash Flowₜ ÷ (1 + Discount Rate)ᵗ
+- IRR = Discount rate at which NPV = 0
+- LCOA = PV(CapEx + OpEx − CMS Savings) ÷ PV(Tons CO₂ Avoided)
 """)
+
+profiler.lap("Tab: Formulas + Explanations")
+
+# Monte Carlo Tab
+if tab5.open:
+    with tab5:
+        st.title("Monte Carlo Uncertainty")
+        st.caption("Credit prices are sampled from normal distributions, CI reductions from triangular ±spread around the Editable Calculations values.")
+        with st.form("monte_carlo"):
+            col1, col2 = st.columns(2)
+            with col1:
+                lcfs_sd = st.number_input("LCFS Price Std Dev ($/ton)", value=30.0)
+                q45_sd = st.number_input("45Q Price Std Dev ($/ton)", value=10.0)
+                price_corr = st.slider("LCFS / 45Q Correlation", -1.0, 1.0, 0.5)
+                ci_spread = st.slider("CI Reduction Spread (±%)", 0, 100, 20)
+            with col2:
+                mc_seed = st.number_input("Random Seed", value=0, step=1)
+                mc_max_draws = st.number_input("Max Draws", min_value=1, value=1000000, step=100000)
+                mc_tol = st.number_input("Convergence Tolerance (relative)", value=0.001, format="%.4f")
+            run_mc = st.form_submit_button("Run Monte Carlo")
+
+        distributions = {
+            'lcfs_price': ('normal', scenario['lcfs_price'], lcfs_sd),
+            'q45_price': ('normal', scenario['q45_price'], q45_sd),
+        }
+        for key in DEFAULT_DISTRIBUTIONS:
+            value = scenario[key]
+            if key.endswith('_ci') and ci_spread and value:
+                low, high = sorted([value * (1 - ci_spread / 100), value * (1 + ci_spread / 100)])
+                distributions[key] = ('triangular', low, value, high)
+
+        if run_mc:
+            mc_settings = {
+                'scenario': scenario, 'distributions': distributions, 'price_corr': price_corr,
+                'seed': mc_seed, 'max_draws': mc_max_draws, 'tol': mc_tol, 'cms_curve': cms_curve,
+            }
+            mc = MODEL_CACHE.get_or_compute(mc_settings, lambda: run_monte_carlo(
+                scenario, distributions, {('lcfs_price', 'q45_price'): price_corr},
+                seed=int(mc_seed), max_draws=int(mc_max_draws), tol=mc_tol, model=dashboard_model,
+            ), 'monte_carlo')
+            st.write(f"{mc['draws']:,} draws – {'converged' if mc['converged'] else 'max draws reached'}")
+            st.table(pd.DataFrame(mc['percentiles']).rename(columns={'payback': 'Payback (yrs)', 'cost_per_ton': 'Cost per Ton ($)'}))
+            for metric, label in [('payback', 'Payback Period (yrs)'), ('cost_per_ton', 'Cost per Ton ($)')]:
+                values = mc['values'][metric]
+                values = values[np.isfinite(values)]
+                counts, edges = np.histogram(values, bins=50)
+                st.subheader(label)
+                st.bar_chart(pd.DataFrame({'Draws': counts}, index=np.round((edges[:-1] + edges[1:]) / 2, 2)))
+
+profiler.lap("Tab: Monte Carlo")
+
+# Sensitivity Tab
+@st.fragment
+def sensitivity(scenario):
+    st.title("Tornado Sensitivity")
+    swing_pct = st.slider("Default Swing (±%)", 0, 100, 20)
+    bounds_df = pd.DataFrame(default_bounds(scenario, swing_pct), index=["Low", "High"]).T
+    bounds_df = st.data_editor(bounds_df, key=f"bounds_{swing_pct}")
+    tornado_output = st.selectbox("Output", TORNADO_OUTPUTS)
+
+    ranked = tornado(scenario, {k: (row["Low"], row["High"]) for k, row in bounds_df.iterrows()},
+                     model=dashboard_model)[tornado_output]
+    rows = pd.DataFrame(ranked["rows"])
+    rows["Low Bound Δ"] = rows["low_value"] - ranked["base"]
+    rows["High Bound Δ"] = rows["high_value"] - ranked["base"]
+    chart_df = rows.melt(id_vars=["input", "swing"], value_vars=["Low Bound Δ", "High Bound Δ"], var_name="Bound", value_name="Change")
+    chart_df = chart_df[np.isfinite(chart_df["Change"])]
+    st.altair_chart(
+        alt.Chart(chart_df).mark_bar().encode(
+            x=alt.X("Change:Q", title=f"Change in {tornado_output} (base {ranked['base']:,.2f})"),
+            y=alt.Y("input:N", sort=rows["input"].tolist(), title=None),
+            color="Bound:N",
+        ),
+        width="stretch",
+    )
+    st.dataframe(rows[["input", "low", "high", "low_value", "high_value", "swing"]], hide_index=True)
+
+    st.subheader("Global Sensitivity (Sobol)")
+    st.caption("Varies every input at once over the bounds above (flags on/off with equal odds). First-order "
+               "indices measure an input's effect alone; total-order adds its interactions with the others.")
+    with st.form("sobol"):
+        col1, col2 = st.columns(2)
+        # Sizes up to about 1.25M evaluations (2**15 samples with the dashboard's 35 inputs)
+        sizes = [2 ** k for k in range(10, 18) if k == 10 or 2 ** k * (len(bounds_df) + 2) <= 1_250_000]
+        sobol_n = col1.select_slider("Base Samples", options=sizes, value=min(2 ** 14, sizes[-1]))
+        sobol_seed = col2.number_input("Random Seed", value=0, step=1, key="sobol_seed")
+        st.caption(f"{sobol_n * (len(bounds_df) + 2):,} model evaluations")
+        run_sobol = st.form_submit_button("Run Sobol Analysis")
+    if run_sobol:
+        sobol_bounds = {k: (row["Low"], row["High"]) for k, row in bounds_df.iterrows()}
+        bar = st.progress(0.0, text="Evaluating Sobol design")
+
+        def batch_done(done, total):
+            bar.progress(done / total, text=f"{done:,} / {total:,} evaluations")
+
+        sobol = MODEL_CACHE.get_or_compute(
+            [scenario, sobol_bounds, sobol_n, sobol_seed, cms_curve],
+            lambda: sobol_indices(scenario, sobol_bounds, n=sobol_n, seed=int(sobol_seed),
+                                  model=dashboard_model, progress=batch_done), 'sobol',
+        )
+        bar.empty()
+        for output in SOBOL_OUTPUTS:
+            res = sobol['outputs'][output]
+            indices = pd.DataFrame({
+                "input": res['inputs'],
+                "First Order": res['first'], "First Low": res['first_ci'][0], "First High": res['first_ci'][1],
+                "Total Order": res['total'], "Total Low": res['total_ci'][0], "Total High": res['total_ci'][1],
+            }).sort_values("Total Order", ascending=False)
+            shown = indices[indices["Total Order"] > 0.005]
+            bars = shown.melt(id_vars="input", value_vars=["First Order", "Total Order"], var_name="Index", value_name="Value")
+            st.markdown(f"**{output}**" + (f" – {res['dropped']:,} non-finite samples dropped" if res['dropped'] else ""))
+            if res['dropped'] == sobol['samples']:
+                st.warning(f"No finite {output} samples; indices are undefined")
+                continue
+            if res['constant']:
+                st.info(f"{output} is constant over these bounds; every index is 0")
+                continue
+            st.altair_chart(
+                alt.Chart(bars).mark_bar().encode(
+                    x=alt.X("Value:Q", title="Sobol index (95% bootstrap CI in table)"),
+                    y=alt.Y("input:N", sort=shown["input"].tolist(), title=None),
+                    color="Index:N", yOffset="Index:N",
+                ),
+                width="stretch",
+            )
+            st.dataframe(indices.round(4), hide_index=True)
+
+
+if tab6.open:
+    with tab6:
+        sensitivity(scenario)
+
+profiler.lap("Tab: Sensitivity")
+
+# Sweep Tab
+@st.fragment
+def sweep(scenario):
+    st.title("2-D Parameter Sweep")
+    sweep_keys = [k for k in scenario if k not in DASHBOARD_FLAGS]
+    sweep_bounds = default_bounds(scenario, 50)
+    col1, col2 = st.columns(2)
+    with col1:
+        x_key = st.selectbox("X Input", sweep_keys, index=sweep_keys.index("solar_pct"))
+        x_low = st.number_input("X Low", value=float(sweep_bounds[x_key][0]), key=f"x_low_{x_key}")
+        x_high = st.number_input("X High", value=float(sweep_bounds[x_key][1]), key=f"x_high_{x_key}")
+    with col2:
+        y_key = st.selectbox("Y Input", sweep_keys, index=sweep_keys.index("lcfs_price"))
+        y_low = st.number_input("Y Low", value=float(sweep_bounds[y_key][0]), key=f"y_low_{y_key}")
+        y_high = st.number_input("Y High", value=float(sweep_bounds[y_key][1]), key=f"y_high_{y_key}")
+    sweep_output = st.selectbox("Heatmap Output", SWEEP_OUTPUTS)
+    resolution = st.slider("Resolution (cells per axis)", 10, 2000, 200)
+
+    if x_key == y_key:
+        st.warning("Pick two different inputs to sweep.")
+    else:
+        sweep_settings = [scenario, x_key, x_low, x_high, y_key, y_low, y_high, sweep_output, resolution, cms_curve]
+        grid = MODEL_CACHE.get_or_compute(sweep_settings, lambda: sweep_2d(
+            scenario, x_key, np.linspace(x_low, x_high, resolution),
+            y_key, np.linspace(y_low, y_high, resolution), sweep_output, model=dashboard_model,
+        ), 'sweep')
+        finite = grid[np.isfinite(grid)]
+        # Flip rows so the Y axis increases upwards
+        st.image(heatmap_rgb(grid)[::-1], width="stretch")
+        st.caption(
+            f"X: {x_key} {x_low:,.2f} → {x_high:,.2f} (left to right) · "
+            f"Y: {y_key} {y_low:,.2f} → {y_high:,.2f} (bottom to top) · "
+            f"{sweep_output} range {finite.min() if finite.size else float('nan'):,.2f} – "
+            f"{finite.max() if finite.size else float('nan'):,.2f} (grey = infinite)"
+        )
+
+
+if tab7.open:
+    with tab7:
+        sweep(scenario)
+
+profiler.lap("Tab: Sweep")
+
+# Fleet Tab
+if tab8.open:
+    with tab8:
+        st.title("Fleet Summary")
+        st.caption("Applies the current strategy package to every plant in the registry (capacity, baseline CI and CMS charge per plant).")
+        if cms_curve is not None:
+            st.caption("CMS savings use the flat formula here: the hourly simulation needs each plant's own load "
+                       "profile and installed solar capacity.")
+        fleet = evaluate_fleet(scenario)
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Fleet Tons CO₂ Avoided", f"{fleet['total']['tons_avoided']:,.0f}")
+        col2.metric("Fleet Revenue", f"${fleet['total']['total_revenue']:,.0f}")
+        col3.metric("Fleet Net Cost", f"${fleet['total']['net_cost']:,.0f}")
+        col4.metric("Fleet Payback", f"{fleet['total']['payback']:.2f} yrs")
+        st.dataframe(pd.DataFrame(fleet['plants']), hide_index=True)
+
+profiler.lap("Tab: Fleet")
+
+
+# Backtest Tab
+@st.fragment
+def price_backtest(scenario):
+    st.title("Historical Price Backtest")
+    st.caption("Replays the strategy package month by month against historical prices. Price files live in "
+               "data/prices (or CI_MODEL_PRICES): a month or date column plus lcfs_price / q45_price / cms_charge "
+               "columns, or a single price column in a file named after the input. Inputs without a series keep "
+               "their current value.")
+    uploads = st.file_uploader("Add Price Files (CSV)", type="csv", accept_multiple_files=True)
+    try:
+        frames = [df for df in [load_prices()] if not df.empty]
+        frames += [read_prices(f, name=f.name) for f in uploads or []]
+        prices = combine_prices(frames)
+    except ValueError as e:
+        st.error(f"Could not read price files: {e}")
+        return
+    if prices.empty:
+        st.info("No price history found. Add CSV files to data/prices or upload them above.")
+        return
+    months = prices.index.astype(str).tolist()
+    st.caption(f"{len(prices)} months ({months[0]} to {months[-1]}): {', '.join(prices.columns)}")
+
+    col1, col2 = st.columns(2)
+    horizon = col1.slider("Window Length (months)", 1, len(prices), min(60, len(prices)))
+    rolling = col2.slider("Rolling Window (months)", 1, min(36, len(prices)), min(12, len(prices)))
+    series = {k: prices[k].to_numpy() for k in prices}
+    result = MODEL_CACHE.get_or_compute(
+        [scenario, series, months, horizon, rolling, cms_curve],
+        lambda: backtest(scenario, prices, horizon, rolling, model=dashboard_model), 'backtest',
+    )
+    row = summarize(result).iloc[0]
+
+    col1, col2, col3, col4 = st.columns(4)
+    payback = row['payback_months']
+    col1.metric("Payback", f"{payback:.0f} months" if np.isfinite(payback) else "Not reached")
+    col2.metric("Final Cash Position", f"${row['final_position']:,.0f}")
+    col3.metric("Max Drawdown", f"${row['max_drawdown']:,.0f}",
+                f"{row['drawdown_start']} to {row['drawdown_end']}" if row['drawdown_start'] else None,
+                delta_color="off")
+    worst = row['worst_window_payback']
+    col4.metric(f"Worst {result['horizon']}-Month Window", f"{worst:.0f} months" if np.isfinite(worst) else "No payback",
+                f"starting {row['worst_payback_start']}", delta_color="off")
+
+    history = pd.DataFrame({
+        "Cash Position ($)": result['cash_position'][0],
+        "Monthly Revenue ($)": result['revenue'][0],
+    }, index=prices.index.to_timestamp())
+    st.line_chart(history[["Cash Position ($)"]])
+    trailing = pd.Series(np.nan, index=history.index)
+    trailing.iloc[rolling - 1:] = result['rolling_revenue'][0]
+    st.line_chart(pd.DataFrame({
+        "Monthly Revenue ($)": history["Monthly Revenue ($)"],
+        f"Trailing {rolling}-Month Revenue ($)": trailing,
+    }))
+    st.markdown("**Price history with rolling mean and range**")
+    price_stats = pd.concat({
+        "price": prices, "mean": prices.rolling(rolling).mean(),
+        "std": prices.rolling(rolling).std(), "min": prices.rolling(rolling).min(), "max": prices.rolling(rolling).max(),
+    }, axis=1)
+    price_stats.index = price_stats.index.to_timestamp()
+    for k in prices:
+        st.line_chart(price_stats.xs(k, axis=1, level=1)[["price", "mean", "min", "max"]], y_label=k)
+    st.dataframe(pd.DataFrame(
+        {f"Trailing {rolling}-Month Revenue ($)": [row[f'rolling_{s}'] for s in ["mean", "std", "min", "max"]]},
+        index=["Mean", "Std Dev", "Min", "Max"],
+    ))
+    st.markdown(f"**Months to payback by window start ({result['horizon']}-month windows)**")
+    windows = pd.DataFrame({
+        "Months to Payback": result['window_payback'][0],
+        "Window Revenue ($)": result['window_revenue'][0],
+    }, index=prices.index[:result['window_payback'].shape[1]].to_timestamp())
+    st.bar_chart(windows[["Months to Payback"]].replace(np.inf, np.nan))
+    st.caption("Missing bars: the window ends before its operating cash covers CapEx.")
+
+    with st.expander("Backtest a Strategy Sweep"):
+        sweep_keys = [k for k in scenario if k not in DASHBOARD_FLAGS and k not in PRICE_SERIES]
+        sweep_bounds = default_bounds(scenario, 50)
+        with st.form("backtest_sweep"):
+            col1, col2, col3, col4 = st.columns(4)
+            key = col1.selectbox("Input", sweep_keys, index=sweep_keys.index("ccs_capex"))
+            low = col2.number_input("Low", value=None, help="Default: 50% below the current value")
+            high = col3.number_input("High", value=None, help="Default: 50% above the current value")
+            count = col4.number_input("Scenarios", 2, 100_000, 10_000, step=1000)
+            submitted = st.form_submit_button("Run Sweep Backtest")
+        if submitted:
+            low = sweep_bounds[key][0] if low is None else low
+            high = sweep_bounds[key][1] if high is None else high
+            values = np.linspace(low, high, int(count))
+            swept = MODEL_CACHE.get_or_compute(
+                [scenario, series, months, horizon, rolling, key, values, cms_curve],
+                lambda: summarize(backtest({**scenario, key: values}, prices, horizon, rolling, model=dashboard_model)),
+                'backtest',
+            ).assign(**{key: values})
+            swept = swept.replace(np.inf, np.nan)
+            st.line_chart(swept.set_index(key)[["payback_months", "worst_window_payback"]])
+            st.caption("Gaps: payback not reached in the history / in the worst window.")
+            st.dataframe(swept.describe().T, width="stretch")
+
+
+if tab9.open:
+    with tab9:
+        price_backtest(scenario)
+
+profiler.lap("Tab: Backtest")
+
+rerun_profile = profiler.finish()
+if rerun_profile:
+    with st.sidebar.expander("Rerun Profile", expanded=True):
+        st.metric("Rerun Time", f"{rerun_profile['total_ms']:.1f} ms")
+        st.dataframe(pd.DataFrame(rerun_profile['sections']).round(1), hide_index=True)
+        st.caption(f"Session {rerun_profile['session_id']} – logged to {profiler.log_path}")
@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+
+from ci_model.batch import calculate_ci_model_batch, calculate_dashboard_batch, calculate_v2_batch
+from ci_model.categories import CATEGORY_INPUTS, load_categories
+from ci_model.core import (
+    DASHBOARD_DEFAULTS, DASHBOARD_FLAGS, DASHBOARD_OUTPUTS, INPUT_KEYS, OUTPUT_KEYS, V2_OUTPUTS,
+    calculate_ci_model, calculate_dashboard, calculate_ci_model_v2,
+)
+
+N = 200
+
+
+def _row(columns, i):
+    return {k: v[i].item() for k, v in columns.items()}
+
+
+def _assert_rows_match(batch, scalar_rows, keys):
+    for i, expected in enumerate(scalar_rows):
+        for k in keys:
+            # inf payback/cost per ton must match exactly; finite values to rounding
+            assert np.isclose(batch[k][i], expected[k], rtol=1e-12, atol=1e-6, equal_nan=True), (i, k)
+
+
+def test_v3_batch_matches_scalar():
+    rng = np.random.default_rng(1)
+    columns = {k: rng.uniform(0, 100, N) for k in INPUT_KEYS}
+    # No credit prices, so no revenue: payback is inf in both models
+    columns['lcfs_price'][:20] = 0
+    columns['q45_price'][:20] = 0
+    batch = calculate_ci_model_batch(columns)
+    scalar = [calculate_ci_model(_row(columns, i)) for i in range(N)]
+    _assert_rows_match(batch, scalar, OUTPUT_KEYS)
+    assert np.isinf(batch['Payback'][:20]).all()
+
+
+def test_dashboard_batch_matches_scalar():
+    rng = np.random.default_rng(2)
+    columns = {k: rng.uniform(0.5, 1.5, N) * v for k, v in DASHBOARD_DEFAULTS.items() if k not in DASHBOARD_FLAGS}
+    columns.update({k: rng.random(N) < 0.5 for k in DASHBOARD_FLAGS})
+    columns['lcfs_price'][:20] = 0
+    columns['q45_price'][:20] = 0
+    batch = calculate_dashboard_batch(columns)
+    scalar = [calculate_dashboard(_row(columns, i)) for i in range(N)]
+    _assert_rows_match(batch, scalar, DASHBOARD_OUTPUTS)
+    assert np.isinf(batch['payback'][:20]).all()
+
+
+def test_dashboard_batch_defaults_match_scalar():
+    batch = calculate_dashboard_batch({})
+    expected = calculate_dashboard({})
+    assert all(np.isclose(batch[k], expected[k]) for k in DASHBOARD_OUTPUTS)
+
+
+@pytest.mark.parametrize('codes', [False, True])
+def test_v2_batch_matches_scalar(codes):
+    rng = np.random.default_rng(3)
+    categories = load_categories()
+    numeric = {
+        'capacity_mgy': rng.uniform(50, 200, N), 'solar_pct': rng.uniform(0, 100, N),
+        'dryer_pct': rng.uniform(0, 100, N), 'chp_pct': rng.uniform(0, 100, N),
+        'capex_solar': rng.uniform(0, 1e7, N), 'capex_dryers': rng.uniform(0, 1e7, N),
+        'capex_chp': rng.uniform(0, 1e7, N), 'capex_ccs': rng.uniform(0, 3e7, N),
+        'opex_pct': rng.uniform(0, 10, N), 'lcfs_credit': rng.uniform(0, 200, N), 'q45_credit': rng.uniform(0, 100, N),
+    }
+    numeric['lcfs_credit'][:20] = 0
+    numeric['q45_credit'][:20] = 0
+    # Unknown options (and None) have no CI impact
+    names = {k: rng.choice(list(categories[k]) + ['Unknown', None], N) for k in CATEGORY_INPUTS}
+    inputs = dict(numeric)
+    for k in CATEGORY_INPUTS:
+        options = list(categories[k])
+        inputs[k] = np.array([options.index(v) if v in options else -1 for v in names[k]]) if codes else names[k]
+    batch = calculate_v2_batch(inputs)
+    scalar = []
+    for i in range(N):
+        row = _row(numeric, i)
+        result = calculate_ci_model_v2(
+            row['capacity_mgy'], row['solar_pct'], row['dryer_pct'], row['chp_pct'],
+            names['chp_fuel'][i], names['ccs_scope'][i], names['sequestration_type'][i],
+            row['capex_solar'], row['capex_dryers'], row['capex_chp'], row['capex_ccs'], row['opex_pct'],
+            row['lcfs_credit'], row['q45_credit'],
+        )
+        scalar.append(dict(zip(V2_OUTPUTS, result)))
+    _assert_rows_match(batch, scalar, V2_OUTPUTS)
+    assert np.isinf(batch['payback_years'][:20]).all()
+
+
+def test_v2_batch_rejects_out_of_range_codes():
+    with pytest.raises(ValueError):
+        calculate_v2_batch({
+            'capacity_mgy': 100, 'solar_pct': 50, 'dryer_pct': 50, 'chp_pct': 50, 'capex_solar': 1, 'capex_dryers': 1,
+            'capex_chp': 1, 'capex_ccs': 1, 'opex_pct': 3, 'lcfs_credit': 125, 'q45_credit': 85,
+            'chp_fuel': np.array([99]), 'ccs_scope': np.array([0]), 'sequestration_type': np.array([0]),
+        })
+
+
+def test_dashboard_batch_hourly_cms_matches_scalar():
+    # Hourly CMS savings replace the flat formula; NaN rows keep it, as None does in the scalar model
+    rng = np.random.default_rng(4)
+    columns = {'solar_pct': rng.uniform(0, 100, N), 'cms_charge': rng.uniform(0, 1e5, N),
+               'cms_savings_hourly': rng.uniform(0, 1e5, N)}
+    columns['cms_savings_hourly'][:20] = np.nan
+    batch = calculate_dashboard_batch(columns)
+    scalar = []
+    for i in range(N):
+        row = _row(columns, i)
+        if np.isnan(row['cms_savings_hourly']):
+            row['cms_savings_hourly'] = None
+        scalar.append(calculate_dashboard(row))
+    _assert_rows_match(batch, scalar, DASHBOARD_OUTPUTS)
+    np.testing.assert_array_equal(batch['cms_savings'][20:], columns['cms_savings_hourly'][20:])
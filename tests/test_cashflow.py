@@ -0,0 +1,20 @@
+import numpy as np
+
+from ci_model.cashflow import irr
+
+
+def test_irr_exact_root_at_starting_guess():
+    # 10% is irr's starting guess, where NPV is exactly zero
+    for flows in ([-100, 110], [-1000, 100, 1100], [-100, 10, 10, 110]):
+        assert np.isclose(irr(np.array(flows, dtype=float)), 10.0)
+
+
+def test_irr_matches_npv_root():
+    flows = np.array([[-500.0, 120, 150, 200, 250], [-100.0, 30, 30, 30, 30]])
+    rates = irr(flows) / 100
+    npv = [np.sum(f / (1 + r) ** np.arange(len(f))) for f, r in zip(flows, rates)]
+    assert np.allclose(npv, 0, atol=1e-6)
+
+
+def test_irr_without_sign_change_is_nan():
+    assert np.isnan(irr(np.array([100.0, 10, 10])))
@@ -0,0 +1,32 @@
+import numpy as np
+
+from ci_model.batch import calculate_dashboard_batch
+from ci_model.hourly import cms_savings_curve, hourly_cms_savings, synthetic_solar_profile, with_hourly_cms
+
+
+def _load():
+    rng = np.random.default_rng(0)
+    hours = np.arange(8760)
+    return 20_000 + 5_000 * rng.random(8760) + 8_000 * np.sin(hours / 24 * 2 * np.pi) ** 2
+
+
+def test_curve_matches_simulation_at_whole_percentages():
+    load, solar = _load(), synthetic_solar_profile()
+    pct, per_dollar = cms_savings_curve(load, solar, 3000.0)
+    for adoption, charge in [(0, 50_000.0), (37, 50_000.0), (100, 20_000.0), (150, 80_000.0)]:
+        expected = hourly_cms_savings(load, solar, 3000.0 * adoption / 100, charge)[0]
+        assert np.isclose(charge * per_dollar[adoption], expected, rtol=1e-12)
+    assert per_dollar[0] == 0 and (np.diff(per_dollar) >= 0).all()
+
+
+def test_with_hourly_cms_prices_every_scenario_from_the_curve():
+    curve = cms_savings_curve(_load(), synthetic_solar_profile(), 3000.0)
+    model = with_hourly_cms(calculate_dashboard_batch, curve)
+    solar_pct = np.array([[0.0], [40.0], [100.0]])
+    cms_charge = np.array([[40_000.0, 50_000.0]])
+    results = model({'solar_pct': solar_pct, 'cms_charge': cms_charge})
+    np.testing.assert_allclose(results['cms_savings'], cms_charge * np.interp(solar_pct, *curve))
+    flat = calculate_dashboard_batch({'solar_pct': solar_pct, 'cms_charge': cms_charge})
+    np.testing.assert_allclose(results['net_cost'] + results['cms_savings'], flat['net_cost'] + flat['cms_savings'])
+    # Missing inputs fall back to the dashboard defaults, as in the model itself
+    assert np.isclose(model({})['cms_savings'], 50_000.0 * curve[1][100])
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from ci_model.batch import calculate_dashboard_batch, calculate_v2_batch
+from ci_model.categories import CATEGORY_INPUTS, load_categories
+from ci_model.parallel import ShardedExecutor
+
+
+@pytest.fixture(scope='module')
+def executor():
+    # Thresholds lowered so a few thousand rows are sharded across real worker processes
+    executor = ShardedExecutor(workers=2, min_parallel=1000, min_rows=256)
+    yield executor
+    executor.shutdown()
+
+
+def test_sharded_matches_inline(executor):
+    rng = np.random.default_rng(0)
+    n = 5000
+    inputs = {'solar_pct': rng.uniform(0, 100, n), 'lcfs_price': rng.uniform(0, 250, n), 'use_ng': rng.random(n) < 0.5,
+              'q45_price': 85}
+    shards = []
+    results = executor.evaluate('dashboard', inputs, progress=shards.append)
+    expected = calculate_dashboard_batch(inputs)
+    assert set(results) == set(expected)
+    for k in expected:
+        np.testing.assert_array_equal(results[k], expected[k])
+    assert len(shards) > 1
+    assert min(s['start'] for s in shards) == 0
+    assert sum(s['stop'] - s['start'] for s in shards) == n
+    assert shards[-1]['done'] == n
+
+
+def test_sharded_broadcasts_and_keeps_shape(executor):
+    x = np.linspace(0, 100, 50)[:, None]
+    y = np.linspace(50, 250, 60)[None, :]
+    results = executor.model('dashboard')({'solar_pct': x, 'lcfs_price': y})
+    expected = calculate_dashboard_batch({'solar_pct': x, 'lcfs_price': y})
+    assert results['payback'].shape == (50, 60)
+    np.testing.assert_array_equal(results['payback'], expected['payback'])
+
+
+def test_sharded_passes_category_names(executor):
+    # Object columns go to the workers by value, one slice per shard
+    rng = np.random.default_rng(1)
+    n = 3000
+    categories = load_categories()
+    inputs = {k: rng.choice(list(categories[k]), n) for k in CATEGORY_INPUTS}
+    inputs.update({'capacity_mgy': 110, 'solar_pct': rng.uniform(0, 100, n), 'dryer_pct': 50, 'chp_pct': 50,
+                   'capex_solar': 5e6, 'capex_dryers': 3e6, 'capex_chp': 1.2e7, 'capex_ccs': 2e7, 'opex_pct': 3,
+                   'lcfs_credit': 125, 'q45_credit': 85})
+    results = executor.evaluate('v2', inputs)
+    expected = calculate_v2_batch(inputs)
+    for k in expected:
+        np.testing.assert_array_equal(results[k], expected[k])
+
+
+def test_small_batches_run_inline():
+    executor = ShardedExecutor(workers=2)
+    results = executor.evaluate('dashboard', {'solar_pct': np.array([10.0, 20.0])})
+    assert executor._pool is None
+    np.testing.assert_array_equal(results['final_ci'], calculate_dashboard_batch({'solar_pct': np.array([10.0, 20.0])})['final_ci'])
@@ -0,0 +1,59 @@
+import asyncio
+import json
+
+import pytest
+
+from ci_model.server import ModelService
+
+V2 = {'capacity_mgy': 100, 'solar_pct': 50, 'dryer_pct': 50, 'chp_pct': 50, 'chp_fuel': 'RNG',
+      'ccs_scope': 'Full-Plant', 'sequestration_type': '45Q Partner', 'capex_solar': 1e6, 'capex_dryers': 2e6,
+      'capex_chp': 3e6, 'capex_ccs': 4e6, 'opex_pct': 3, 'lcfs_credit': 125, 'q45_credit': 85}
+
+
+def _post(path, body):
+    async def post():
+        service = ModelService(port=0)
+        port = await service.start()
+        try:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            data = json.dumps(body).encode()
+            writer.write(f"POST {path} HTTP/1.1\r\nContent-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode() + data)
+            response = await asyncio.wait_for(reader.read(), 5)
+            writer.close()
+        finally:
+            await service.close()
+        head, _, payload = response.partition(b'\r\n\r\n')
+        return int(head.split()[1]), json.loads(payload)
+
+    return asyncio.run(post())
+
+
+@pytest.mark.parametrize('path, body', [
+    ('/models/dashboard/evaluate', {'solar_pct': None}),
+    ('/models/dashboard/evaluate', {'solar_pct': 'fifty'}),
+    ('/models/v2/evaluate', {**V2, 'solar_pct': None}),
+    ('/models/dashboard/batch', {'scenarios': [{'solar_pct': 40}, {'solar_pct': None}]}),
+    ('/models/dashboard/batch', {'columns': {'solar_pct': [40, None]}}),
+    ('/models/dashboard/batch', {'columns': {'solar_pct': None}}),
+])
+def test_null_or_text_input_is_rejected(path, body):
+    # Used to evaluate as NaN and return a 200 with null outputs
+    status, payload = _post(path, body)
+    assert status == 400
+    assert "'solar_pct'" in payload['error']
+
+
+def test_v2_option_must_be_name_or_code():
+    status, payload = _post('/models/v2/evaluate', {**V2, 'chp_fuel': None})
+    assert status == 400 and "'chp_fuel'" in payload['error']
+
+
+@pytest.mark.parametrize('path, body', [
+    ('/models/dashboard/evaluate', {'solar_pct': 40, 'use_ng': True, 'note': None}),
+    ('/models/v2/evaluate', V2),
+    ('/models/dashboard/batch', {'columns': {'solar_pct': [40, 60], 'lcfs_price': 125}}),
+])
+def test_valid_input_is_evaluated(path, body):
+    status, payload = _post(path, body)
+    assert status == 200
+    assert payload
@@ -0,0 +1,111 @@
+import sqlite3
+from contextlib import contextmanager
+
+import numpy as np
+import pytest
+
+from ci_model.store import ScenarioStore
+
+PLANTS = ['Arkalon', 'Bonanza', 'Liberal']
+
+
+@pytest.fixture(scope='module')
+def store(tmp_path_factory):
+    store = ScenarioStore(str(tmp_path_factory.mktemp('store') / 'scenarios.db'))
+    rng = np.random.default_rng(0)
+    for name in ['first', 'second']:
+        n = 20_000
+        store.save_batch({'x': rng.random(n), 'y': rng.random(n)},
+                         {'final_ci': rng.uniform(0, 100, n), 'payback': rng.uniform(0, 20, n)},
+                         plant=rng.choice(PLANTS, n), name=name)
+    return store
+
+
+def _statements(store, monkeypatch):
+    # Every statement the store runs, with its parameters bound
+    statements = []
+    connect = store._connect
+
+    @contextmanager
+    def traced():
+        with connect() as db:
+            db.set_trace_callback(statements.append)
+            yield db
+
+    monkeypatch.setattr(store, '_connect', traced)
+    return statements
+
+
+def _plan(store, statement):
+    with sqlite3.connect(store.path) as db:
+        return ' / '.join(row[-1] for row in db.execute('EXPLAIN QUERY PLAN ' + statement))
+
+
+@pytest.mark.parametrize('filters', [
+    {'max_ci': 20}, {'plant': 'Arkalon'}, {'plant': 'Arkalon', 'max_ci': 20, 'max_payback': 5},
+    {'max_ci': 0.05}, {'max_payback': 0.01}, {'plant': 'Liberal', 'max_ci': 0.2},
+    {'max_ci': 30, 'name': 'first'}, {'plant': 'Bonanza', 'name': 'missing'}, {},
+])
+def test_query_matches_full_scan(store, filters):
+    clauses, params = [], []
+    for key, sql in [('plant', 's.plant = ?'), ('max_ci', 's.final_ci < ?'), ('max_payback', 's.payback < ?'),
+                     ('name', 'v.name = ?')]:
+        if key in filters:
+            clauses.append(sql)
+            params.append(filters[key])
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+    with sqlite3.connect(store.path) as db:
+        expected = [row[0] for row in db.execute(
+            f'SELECT s.id FROM scenarios s NOT INDEXED JOIN saves v ON v.id = s.save_id {where} '
+            'ORDER BY s.id DESC LIMIT 100', params)]
+    assert [row['id'] for row in store.query(**filters, limit=100)] == expected
+
+
+@pytest.mark.parametrize('filters', [{'max_ci': 20}, {'plant': 'Arkalon'}, {'plant': 'Arkalon', 'max_ci': 50, 'max_payback': 10}])
+def test_query_with_many_matches_walks_newest_first(store, monkeypatch, filters):
+    # Sorting every match before the LIMIT is what made broad filters take seconds
+    statements = _statements(store, monkeypatch)
+    store.query(**filters, limit=100)
+    plan = _plan(store, statements[-1])
+    assert 'TEMP B-TREE' not in plan
+
+
+@pytest.mark.parametrize('filters', [{'max_ci': 0.05}, {'max_payback': 0.01}, {'plant': 'Liberal', 'max_ci': 0.2}])
+def test_query_with_few_matches_uses_output_index(store, monkeypatch, filters):
+    statements = _statements(store, monkeypatch)
+    store.query(**filters, limit=100)
+    plan = _plan(store, statements[-1])
+    assert 'USING INDEX idx_scenarios_' in plan and 'idx_scenarios_plant_id' not in plan
+
+
+def test_save_batch_round_trip(tmp_path):
+    store = ScenarioStore(str(tmp_path / 'scenarios.db'))
+    inputs = {'solar_pct': np.array([10.0, 20.0, 30.0]), 'lcfs_price': 125.0, 'use_ng': np.array([1.0, 0.0, 1.0])}
+    results = {'final_ci': np.array([40.0, 35.0, np.nan]), 'payback': np.array([3.0, np.inf, 7.5]), 'npv': np.array([1.0, 2.0, 3.0])}
+    ids = store.save_batch(inputs, results, plant=np.array(['Arkalon', 'Bonanza', 'Arkalon']), name='batch')
+    assert ids == list(range(ids[0], ids[0] + 3))
+    assert store.count() == 3
+
+    saved = store.load(ids[1])
+    assert saved['name'] == 'batch' and saved['plant'] == 'Bonanza' and saved['model'] == 'dashboard'
+    # Constant inputs are stored once on the save and restored on every row
+    assert saved['inputs'] == {'lcfs_price': 125.0, 'solar_pct': 20.0, 'use_ng': 0.0}
+    assert saved['results'] == {'final_ci': 35.0, 'payback': np.inf, 'npv': 2.0}
+    assert np.isnan(store.load(ids[2])['results']['final_ci'])
+
+    # NaN final CI is stored as NULL, so it never matches a CI filter
+    assert [row['id'] for row in store.query(plant='Arkalon')] == [ids[2], ids[0]]
+    assert [row['id'] for row in store.query(max_ci=50)] == [ids[1], ids[0]]
+    assert [row['id'] for row in store.query(max_payback=5)] == [ids[0]]
+
+    store.delete(ids[0])
+    assert store.load(ids[0]) is None
+    assert store.count() == 2
+
+
+def test_save_single_scenario(tmp_path):
+    store = ScenarioStore(str(tmp_path / 'scenarios.db'))
+    scenario_id = store.save('base', 'Arkalon', {'solar_pct': 60, 'ccs_enabled': True}, {'final_ci': 12.5, 'payback': 4.0})
+    saved = store.load(scenario_id)
+    assert saved['inputs'] == {'solar_pct': 60.0, 'ccs_enabled': 1.0}
+    assert store.query(name='base')[0]['final_ci'] == 12.5
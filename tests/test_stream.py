@@ -0,0 +1,71 @@
+import glob
+import io
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import ci_model.stream as stream
+from ci_model.batch import calculate_ci_model_batch
+from ci_model.core import INPUT_KEYS
+
+
+@pytest.fixture
+def source(tmp_path):
+    rng = np.random.default_rng(0)
+    path = str(tmp_path / 'scenarios.csv')
+    pd.DataFrame({k: rng.uniform(0, 100, 25) for k in INPUT_KEYS}).to_csv(path, index=False)
+    return path
+
+
+def _parts(output_dir):
+    return sorted(glob.glob(os.path.join(output_dir, 'part-*.csv')))
+
+
+def test_resume_after_failed_chunk(source, tmp_path, monkeypatch):
+    output_dir = str(tmp_path / 'out')
+    evaluate_frame = stream.evaluate_frame
+    calls = []
+
+    def fail_on_second_chunk(model, df, executor=None):
+        calls.append(len(df))
+        if len(calls) == 2:
+            raise RuntimeError("worker died")
+        return evaluate_frame(model, df, executor)
+
+    monkeypatch.setattr(stream, 'evaluate_frame', fail_on_second_chunk)
+    with pytest.raises(RuntimeError):
+        stream.stream_evaluate(source, output_dir, chunk_size=10, fmt='csv', log=io.StringIO())
+    assert [os.path.basename(p) for p in _parts(output_dir)] == ['part-00000.csv']
+
+    monkeypatch.setattr(stream, 'evaluate_frame', evaluate_frame)
+    log = io.StringIO()
+    summary = stream.stream_evaluate(source, output_dir, chunk_size=10, fmt='csv', log=log)
+    assert 'Resuming after chunk 1' in log.getvalue()
+    assert (summary['rows'], summary['total_rows'], summary['chunks']) == (15, 25, 3)
+
+    out = pd.concat([pd.read_csv(p) for p in _parts(output_dir)], ignore_index=True)
+    expected = calculate_ci_model_batch(pd.read_csv(source))
+    np.testing.assert_allclose(out['CI'], expected['CI'])
+    np.testing.assert_allclose(out[INPUT_KEYS], pd.read_csv(source)[INPUT_KEYS])
+
+
+def test_rerun_of_finished_job_is_a_no_op(source, tmp_path):
+    output_dir = str(tmp_path / 'out')
+    stream.stream_evaluate(source, output_dir, chunk_size=10, fmt='csv', log=io.StringIO())
+    parts = _parts(output_dir)
+    log = io.StringIO()
+    summary = stream.stream_evaluate(source, output_dir, chunk_size=10, fmt='csv', log=log)
+    assert 'Already complete' in log.getvalue()
+    assert summary['rows'] == 0 and summary['total_rows'] == 25
+    assert _parts(output_dir) == parts
+
+
+def test_different_job_needs_restart(source, tmp_path):
+    output_dir = str(tmp_path / 'out')
+    stream.stream_evaluate(source, output_dir, chunk_size=10, fmt='csv', log=io.StringIO())
+    with pytest.raises(ValueError):
+        stream.stream_evaluate(source, output_dir, chunk_size=5, fmt='csv', log=io.StringIO())
+    summary = stream.stream_evaluate(source, output_dir, chunk_size=5, fmt='csv', restart=True, log=io.StringIO())
+    assert summary['chunks'] == 5